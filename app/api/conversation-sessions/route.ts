@@ -0,0 +1,37 @@
+import { NextRequest, NextResponse } from 'next/server'
+import fs from 'fs'
+import path from 'path'
+
+export const runtime = 'nodejs'
+export const dynamic = 'force-dynamic'
+
+// Precomputed by scripts/sessionize.py: top sessions per year by intensity and length
+const RANKINGS = ['intensity', 'length']
+
+export async function GET(request: NextRequest) {
+  try {
+    const filePath = path.join(process.cwd(), 'data', 'conversation-sessions.json')
+
+    if (!fs.existsSync(filePath)) {
+      return NextResponse.json({ error: 'Conversation sessions not found. Run scripts/sessionize.py' }, { status: 404 })
+    }
+
+    const data = JSON.parse(fs.readFileSync(filePath, 'utf-8'))
+    const year = request.nextUrl.searchParams.get('year')
+    const by = request.nextUrl.searchParams.get('by') || 'intensity'
+    if (!RANKINGS.includes(by)) {
+      return NextResponse.json({ error: `Invalid 'by': expected ${RANKINGS.join(' or ')}` }, { status: 400 })
+    }
+    const limit = parseInt(request.nextUrl.searchParams.get('limit') || '10')
+
+    if (year) {
+      const sessions = ((Object.hasOwn(data.years, year) && data.years[year][by]) || []).slice(0, limit)
+      return NextResponse.json({ year, by, sessions, total: sessions.length })
+    }
+
+    return NextResponse.json(data)
+  } catch (error) {
+    console.error('Error reading conversation sessions:', error)
+    return NextResponse.json({ error: 'Failed to load conversation sessions' }, { status: 500 })
+  }
+}
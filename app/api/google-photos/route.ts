@@ -15,7 +15,8 @@ export async function GET(request: NextRequest) {
         for (const item of mediaItems as any[]) {
           photos.push({
             id: (item as any).id,
-            url: (item as any).baseUrl + '=w400-h300-c',
+            // Local thumbnail from scripts/google_photos_sync.py; baseUrls expire after an hour
+            url: (item as any).thumbnail || (item as any).baseUrl + '=w400-h300-c',
             date,
             description: (item as any).filename,
             tags: [],
@@ -1,11 +1,102 @@
 import { NextRequest, NextResponse } from 'next/server'
 import fs from 'fs'
 import path from 'path'
+import { Readable } from 'stream'
 
 export const runtime = 'nodejs'
 
+const CONTENT_TYPES: Record<string, string> = {
+  '.jpg': 'image/jpeg',
+  '.jpeg': 'image/jpeg',
+  '.png': 'image/png',
+  '.webp': 'image/webp',
+  '.tif': 'image/tiff',
+  '.tiff': 'image/tiff',
+  '.heic': 'image/heic',
+  '.heif': 'image/heif',
+}
+
+// Parsed JSON files keyed by path, reused until the file's mtime changes
+const jsonCache = new Map<string, { mtimeMs: number; value: any }>()
+
+function loadJsonCached<T>(file: string, parse: (data: any) => T): T | null {
+  const stat = fs.statSync(file, { throwIfNoEntry: false })
+  if (!stat) return null
+  const cached = jsonCache.get(file)
+  if (cached && cached.mtimeMs === stat.mtimeMs) return cached.value
+  const value = parse(JSON.parse(fs.readFileSync(file, 'utf8')))
+  jsonCache.set(file, { mtimeMs: stat.mtimeMs, value })
+  return value
+}
+
+interface PhotoIndex {
+  photos: any[]
+  byId: Map<string, any>
+}
+
+// Written by scripts/photo_index.py
+function loadPhotoIndex(): PhotoIndex | null {
+  return loadJsonCached(path.join(process.cwd(), 'data/photo-index.json'), (data) => ({
+    photos: data.photos,
+    byId: new Map(data.photos.map((p: any) => [p.id, p])),
+  }))
+}
+
+// Written by scripts/photo_derivatives.py
+function loadDerivatives(): Record<string, any> {
+  return loadJsonCached(path.join(process.cwd(), 'data/photo-derivatives.json'), (data) => data.photos) || {}
+}
+
+function servePhotoFile(index: PhotoIndex, id: string) {
+  // Only paths recorded in the index are ever read
+  const photo = index.byId.get(id)
+  const stat = photo && fs.statSync(photo.path, { throwIfNoEntry: false })
+  if (!stat) {
+    return NextResponse.json({ error: 'Photo not found' }, { status: 404 })
+  }
+  const contentType = CONTENT_TYPES[path.extname(photo.path).toLowerCase()] || 'application/octet-stream'
+  const body = Readable.toWeb(fs.createReadStream(photo.path)) as ReadableStream<Uint8Array>
+  return new NextResponse(body, {
+    headers: {
+      'Content-Type': contentType,
+      'Content-Length': String(stat.size),
+      'Cache-Control': 'public, max-age=86400',
+    },
+  })
+}
+
 export async function GET(request: NextRequest) {
   try {
+    const index = loadPhotoIndex()
+    const fileId = request.nextUrl.searchParams.get('file')
+
+    if (index && fileId) {
+      return servePhotoFile(index, fileId)
+    }
+
+    if (index) {
+      const derivatives = loadDerivatives()
+      const photos = index.photos.map((photo) => {
+        const sources: any[] = derivatives[photo.id]?.sources || []
+        // Smallest derivative that fills a 640px-wide card, else the original
+        const preferred = sources.find((s) => s.width >= 640) || sources[sources.length - 1]
+        return {
+          id: photo.id,
+          url: preferred ? preferred.webp : `/api/local-photos?file=${photo.id}`,
+          ...(sources.length ? {
+            srcSet: sources.map((s) => `${s.webp} ${s.width}w`).join(', '),
+            fallbackUrl: preferred.jpeg,
+          } : {}),
+          date: photo.date,
+          description: path.basename(photo.path),
+          tags: photo.groupSize > 1 ? ['local', `burst-${photo.groupSize}`] : ['local'],
+          source: 'local-photos',
+          ...(photo.location ? { location: photo.location } : {}),
+        }
+      })
+      return NextResponse.json({ photos, total: photos.length, message: `Loaded ${photos.length} photos from the local photo index` })
+    }
+
     const messageDatesFile = path.join(process.cwd(), 'data/message-dates.json')
 
     if (!fs.existsSync(messageDatesFile)) {
@@ -46,4 +137,4 @@ export async function GET(request: NextRequest) {
     console.error('Error loading local photos:', error)
     return NextResponse.json({ error: 'Failed to load local photos' }, { status: 500 })
   }
-} 
\ No newline at end of file
+}
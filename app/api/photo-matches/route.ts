@@ -0,0 +1,51 @@
+import { NextRequest, NextResponse } from 'next/server'
+import fs from 'fs'
+import path from 'path'
+
+export const runtime = 'nodejs'
+export const dynamic = 'force-dynamic'
+
+// Parsed matches, reused until the file's mtime changes
+let cache: { mtimeMs: number; data: any } | null = null
+
+function loadMatches(filePath: string): any {
+  const stat = fs.statSync(filePath, { throwIfNoEntry: false })
+  if (!stat) return null
+  if (cache && cache.mtimeMs === stat.mtimeMs) return cache.data
+  cache = { mtimeMs: stat.mtimeMs, data: JSON.parse(fs.readFileSync(filePath, 'utf-8')) }
+  return cache.data
+}
+
+// Precomputed by scripts/photo_message_join.py
+export async function GET(request: NextRequest) {
+  try {
+    const data = loadMatches(path.join(process.cwd(), 'data', 'photo-message-matches.json'))
+
+    if (!data) {
+      return NextResponse.json({ error: 'Photo matches not found. Run scripts/photo_message_join.py' }, { status: 404 })
+    }
+
+    const messageId = request.nextUrl.searchParams.get('messageId')
+    const photoId = request.nextUrl.searchParams.get('photoId')
+    const minConfidence = parseFloat(request.nextUrl.searchParams.get('minConfidence') || '0')
+
+    if (messageId) {
+      const photos = ((Object.hasOwn(data.messages, messageId) && data.messages[messageId]) || []).filter((p: any) => p.confidence >= minConfidence)
+      return NextResponse.json({ messageId, photos, total: photos.length })
+    }
+
+    if (photoId) {
+      const photo = Object.hasOwn(data.photos, photoId) && data.photos[photoId]
+      if (!photo) {
+        return NextResponse.json({ photoId, matches: [], total: 0 })
+      }
+      const matches = photo.matches.filter((m: any) => m.confidence >= minConfidence)
+      return NextResponse.json({ photoId, ...photo, matches, total: matches.length })
+    }
+
+    return NextResponse.json(data)
+  } catch (error) {
+    console.error('Error reading photo matches:', error)
+    return NextResponse.json({ error: 'Failed to load photo matches' }, { status: 500 })
+  }
+}
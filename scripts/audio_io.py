@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Shared audio file helpers for the generators.
+
+Audio is written to a temp file in the target directory, fsynced and renamed
+into place, so a crash can never leave a truncated WAV behind. The expected
+size and duration of every generated file are recorded in the audio metadata
+file so later scans can tell a complete file from a damaged one.
+
+Each save appends one line to a log next to the metadata file
+(data/audio-metadata.log.jsonl) instead of rewriting the whole file, under a
+file lock so concurrent generator processes don't lose each other's entries.
+Readers replay the log over the snapshot; once the log passes
+METADATA_LOG_MAX_BYTES it is folded into the snapshot and emptied.
+"""
+
+import hashlib
+import io
+import json
+import os
+import struct
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: the thread lock alone
+    fcntl = None
+
+AUDIO_METADATA_FILE = "data/audio-metadata.json"
+
+# Log size (about 3,000 entries) at which it is folded into the snapshot
+METADATA_LOG_MAX_BYTES = 1024 * 1024
+
+_metadata_lock = threading.Lock()
+
+
+def atomic_write_bytes(path, data):
+    """
+    Write bytes to `path` via a temp file + fsync + rename
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # Persist the rename itself
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def atomic_write_json(path, data, indent=2):
+    """
+    Serialize `data` as JSON and write it atomically
+    """
+    atomic_write_bytes(path, json.dumps(data, indent=indent, ensure_ascii=False).encode("utf-8"))
+
+
+def parse_wav_header(f, file_size):
+    """
+    Parse RIFF/WAVE chunk headers from a binary file object by seeking from
+    chunk to chunk; sample data is never read.
+    """
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        return {"valid": False, "error": "Not a RIFF/WAVE file", "file_size": file_size}
+
+    riff_size = struct.unpack("<I", header[4:8])[0]
+    info = {
+        "valid": True,
+        "error": None,
+        "file_size": file_size,
+        "riff_size": riff_size,
+        "channels": None,
+        "sample_rate": None,
+        "byte_rate": None,
+        "bits_per_sample": None,
+        "data_offset": None,
+        "data_size": None,
+        "duration": None,
+    }
+
+    offset = 12
+    while offset + 8 <= file_size:
+        f.seek(offset)
+        chunk_header = f.read(8)
+        if len(chunk_header) < 8:
+            break
+        chunk_id = chunk_header[:4]
+        chunk_size = struct.unpack("<I", chunk_header[4:8])[0]
+        body_offset = offset + 8
+
+        if chunk_id == b"fmt ":
+            fmt = f.read(16)
+            if len(fmt) < 16:
+                info.update(valid=False, error="Truncated fmt chunk")
+                return info
+            _, channels, sample_rate, byte_rate, _, bits = struct.unpack("<HHIIHH", fmt)
+            info.update(channels=channels, sample_rate=sample_rate, byte_rate=byte_rate, bits_per_sample=bits)
+        elif chunk_id == b"data":
+            info.update(data_offset=body_offset, data_size=chunk_size)
+            # Streaming encoders write 0 or 0xFFFFFFFF when the size is unknown
+            if chunk_size in (0, 0xFFFFFFFF):
+                info["data_size"] = file_size - body_offset
+            break
+
+        # Chunks are padded to an even number of bytes
+        offset = body_offset + chunk_size + (chunk_size & 1)
+
+    if info["byte_rate"] is None:
+        info.update(valid=False, error="Missing fmt chunk")
+    elif info["data_offset"] is None:
+        info.update(valid=False, error="Missing data chunk")
+    elif info["byte_rate"]:
+        info["duration"] = info["data_size"] / info["byte_rate"]
+    return info
+
+
+def read_wav_header(path):
+    """
+    Read WAV header info from a file on disk
+    """
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        return parse_wav_header(f, file_size)
+
+
+def wav_info_from_bytes(audio_bytes):
+    """
+    Read WAV header info from an in-memory payload
+    """
+    return parse_wav_header(io.BytesIO(audio_bytes), len(audio_bytes))
+
+
+def check_wav_integrity(info, expected=None, duration_tolerance=0.05):
+    """
+    Compare header fields against the file on disk and, if given, against the
+    recorded metadata. Returns a list of problem descriptions (empty if OK).
+    """
+    if not info["valid"]:
+        return [info["error"]]
+
+    problems = []
+    file_size = info["file_size"]
+    # Streaming encoders may leave the RIFF size as a 0/0xFFFFFFFF placeholder
+    if info["riff_size"] not in (0, 0xFFFFFFFF) and info["riff_size"] + 8 != file_size:
+        problems.append(f"RIFF header says {info['riff_size'] + 8} bytes, file has {file_size}")
+    if info["data_offset"] + info["data_size"] > file_size:
+        problems.append(f"Data chunk runs past end of file ({info['data_offset'] + info['data_size']} > {file_size})")
+
+    if expected:
+        if expected.get("bytes") is not None and expected["bytes"] != file_size:
+            problems.append(f"Recorded size {expected['bytes']} bytes, file has {file_size}")
+        if expected.get("duration") is not None and info["duration"] is not None:
+            if abs(expected["duration"] - info["duration"]) > duration_tolerance:
+                problems.append(f"Recorded duration {expected['duration']:.2f}s, header says {info['duration']:.2f}s")
+    return problems
+
+
+def is_complete_audio(path, expected=None):
+    """
+    True if `path` exists and is an intact WAV (header-level check only)
+    """
+    if not os.path.exists(path):
+        return False
+    if not path.endswith(".wav"):
+        return os.path.getsize(path) > 0
+    try:
+        return not check_wav_integrity(read_wav_header(path), expected)
+    except OSError:
+        return False
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """
+    SHA-256 of a file's contents, read in chunks
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def metadata_log_path(metadata_file=AUDIO_METADATA_FILE):
+    return os.path.splitext(metadata_file)[0] + ".log.jsonl"
+
+
+@contextmanager
+def metadata_lock(metadata_file=AUDIO_METADATA_FILE):
+    """Exclusive access to the metadata snapshot and log, across threads and processes"""
+    with _metadata_lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(metadata_file)), exist_ok=True)
+        with open(f"{metadata_file}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def load_audio_metadata(metadata_file=AUDIO_METADATA_FILE):
+    """
+    Load recorded metadata for generated audio, keyed by filename: the
+    snapshot with the log replayed over it
+    """
+    metadata = {}
+    if os.path.exists(metadata_file):
+        with open(metadata_file, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+    log_file = metadata_log_path(metadata_file)
+    if os.path.exists(log_file):
+        with open(log_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    filename, entry = json.loads(line)
+                except ValueError:
+                    continue  # a line still being appended
+                metadata.setdefault(filename, {}).update(entry)
+    return metadata
+
+
+def save_audio_metadata(metadata, metadata_file=AUDIO_METADATA_FILE):
+    """
+    Replace the recorded metadata wholesale (folding in and emptying the log).
+    Callers that load, change and save should hold metadata_lock() throughout.
+    """
+    atomic_write_json(metadata_file, metadata)
+    log_file = metadata_log_path(metadata_file)
+    if os.path.exists(log_file):
+        open(log_file, "w").close()
+
+
+def record_audio_metadata(filename, entry, metadata_file=AUDIO_METADATA_FILE):
+    """
+    Merge `entry` into the recorded metadata for `filename` by appending it to
+    the log. Returns `entry`.
+    """
+    log_file = metadata_log_path(metadata_file)
+    line = json.dumps([filename, entry], ensure_ascii=False) + "\n"
+    with metadata_lock(metadata_file):
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(line)
+        if os.path.getsize(log_file) > METADATA_LOG_MAX_BYTES:
+            save_audio_metadata(load_audio_metadata(metadata_file), metadata_file)
+    return entry
+
+
+def save_generated_audio(output_dir, filename, audio_bytes, reported_duration=None,
+                         metadata_file=AUDIO_METADATA_FILE):
+    """
+    Atomically write a generated audio file and record its expected size and
+    duration. Returns the recorded metadata entry.
+    """
+    output_path = os.path.join(output_dir, filename)
+    info = wav_info_from_bytes(audio_bytes) if filename.endswith(".wav") else None
+    if info is not None:
+        # A header promising more audio than arrived means a cut-off response
+        problems = check_wav_integrity(info)
+        if problems:
+            raise ValueError(f"API returned an invalid WAV payload: {'; '.join(problems)}")
+
+    atomic_write_bytes(output_path, audio_bytes)
+
+    entry = {
+        "bytes": len(audio_bytes),
+        "sha256": hashlib.sha256(audio_bytes).hexdigest(),
+        "duration": info["duration"] if info else reported_duration,
+        "reported_duration": reported_duration,
+        "generated_at": datetime.now().isoformat(),
+    }
+    if info:
+        entry.update(
+            sample_rate=info["sample_rate"],
+            channels=info["channels"],
+            data_size=info["data_size"],
+        )
+    return record_audio_metadata(filename, entry, metadata_file)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Per-year audio manifests for the web tier.
+
+public/audio/love-notes-manifests/{year}.json maps each note's message ID to
+its audio file, timestamp, duration, size and content hash, in the
+{ year, entries: [{ csv_id, filename, ... }] } shape that loadManifest() in
+lib/audio-file-manager.ts reads. The generator updates the manifest
+incrementally and atomically as each file lands; post-processing adds the
+encoded web formats. Running this script rebuilds manifests from the CSVs and
+what is on disk (useful for bootstrapping or after manual changes).
+
+Usage: python3 scripts/audio_manifest.py [--years 2015,2016,...]
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+from audio_io import (
+    AUDIO_METADATA_FILE, atomic_write_json, file_sha256, is_complete_audio, load_audio_metadata,
+    read_wav_header,
+)
+from love_notes import AUDIO_DIR, find_year_csvs, load_year_rows, parse_timestamp, row_filename
+
+MANIFEST_DIR = "public/audio/love-notes-manifests"
+
+FILENAME_RE = re.compile(r"david-(\d{4})-love-note-(.+)\.(wav|mp3|ogg)$")
+
+_manifest_lock = threading.Lock()
+
+
+def manifest_path(year, manifest_dir=MANIFEST_DIR):
+    """Path to a year's manifest"""
+    return os.path.join(manifest_dir, f"{year}.json")
+
+
+def parse_audio_filename(filename):
+    """(year, message_id) from a love-note audio filename, or (None, None)"""
+    match = FILENAME_RE.match(os.path.basename(filename))
+    if not match:
+        return None, None
+    return int(match.group(1)), match.group(2)
+
+
+def load_manifest(year, manifest_dir=MANIFEST_DIR):
+    """Load a year's manifest, or an empty one"""
+    path = manifest_path(year, manifest_dir)
+    if not os.path.exists(path):
+        return {"year": int(year), "entries": []}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, manifest_dir=MANIFEST_DIR):
+    """Write a manifest atomically, entries in chronological order"""
+    manifest["entries"].sort(key=lambda e: (e.get("timestamp") or 0, str(e.get("csv_id"))))
+    manifest["updated_at"] = datetime.now().isoformat()
+    manifest["count"] = sum(1 for e in manifest["entries"] if e.get("hasAudio"))
+    atomic_write_json(manifest_path(manifest["year"], manifest_dir), manifest)
+
+
+def web_filename(wav_filename, metadata_entry):
+    """
+    The file the web tier should play: the MP3 from post-processing when it
+    exists (that's what the storage bucket serves), otherwise the WAV
+    """
+    outputs = ((metadata_entry or {}).get("postprocess") or {}).get("outputs") or {}
+    if "mp3" in outputs:
+        return outputs["mp3"]["filename"]
+    return wav_filename
+
+
+def build_entry(year, csv_id, date, wav_filename, metadata_entry, has_audio=True, guid=None):
+    """Manifest entry for one note"""
+    metadata_entry = metadata_entry or {}
+    outputs = (metadata_entry.get("postprocess") or {}).get("outputs") or {}
+    return {
+        "year": int(year),
+        "csv_id": str(csv_id),
+        "guid": guid or None,
+        "date": date or None,
+        "timestamp": parse_timestamp(date),
+        "filename": web_filename(wav_filename, metadata_entry) if has_audio else None,
+        "wav": wav_filename,
+        "hasAudio": has_audio,
+        "duration": metadata_entry.get("duration"),
+        "bytes": metadata_entry.get("bytes"),
+        "sha256": metadata_entry.get("sha256"),
+        "formats": {fmt: {"filename": o["filename"], "bytes": o["bytes"]} for fmt, o in outputs.items()},
+    }
+
+
+def update_manifest_entry(year, csv_id, fields, manifest_dir=MANIFEST_DIR, wav=None):
+    """
+    Insert or update a single entry (matched on csv_id, or on its WAV
+    filename when `wav` is given) and rewrite the manifest atomically.
+    With csv_id None an unmatched note is left for the next rebuild.
+    """
+    with _manifest_lock:
+        manifest = load_manifest(year, manifest_dir)
+        for entry in manifest["entries"]:
+            if (entry.get("wav") == wav) if wav else (entry.get("csv_id") == str(csv_id)):
+                entry.update(fields)
+                break
+        else:
+            if csv_id is None:
+                return
+            manifest["entries"].append(dict(fields, year=int(year), csv_id=str(csv_id)))
+        save_manifest(manifest, manifest_dir)
+
+
+def record_generated_note(row, filename, metadata_entry, manifest_dir=MANIFEST_DIR):
+    """
+    Called by the generator when a note's audio lands on disk
+    """
+    year, file_id = parse_audio_filename(filename)
+    if year is None:
+        return
+    csv_id = row.get("id") or file_id
+    update_manifest_entry(year, csv_id, build_entry(year, csv_id, row.get("date"), filename, metadata_entry,
+                                                        guid=row.get("guid")),
+                          manifest_dir)
+
+
+def record_postprocessed_note(filename, metadata_entry, manifest_dir=MANIFEST_DIR):
+    """
+    Called by post-processing once web formats exist for a note. Matched on
+    the WAV filename, since the CSV row ID needn't match the one in the name.
+    """
+    year, _ = parse_audio_filename(filename)
+    if year is None:
+        return
+    outputs = (metadata_entry.get("postprocess") or {}).get("outputs") or {}
+    update_manifest_entry(year, None, {
+        "filename": web_filename(filename, metadata_entry),
+        "wav": filename,
+        "hasAudio": True,
+        "formats": {fmt: {"filename": o["filename"], "bytes": o["bytes"]} for fmt, o in outputs.items()},
+    }, manifest_dir, wav=filename)
+
+
+def rebuild_manifest(year, csv_file, audio_dir=AUDIO_DIR, metadata=None, manifest_dir=MANIFEST_DIR):
+    """
+    Rebuild a year's manifest from its CSV and the audio on disk. Size,
+    duration and hash come from recorded metadata, or from the file itself
+    for audio generated before metadata was tracked.
+    """
+    metadata = metadata if metadata is not None else load_audio_metadata()
+    manifest = {"year": int(year), "entries": []}
+
+    for i, row in enumerate(load_year_rows(csv_file)):
+        filename = row_filename(row, i)
+        csv_id = row.get("id") or parse_audio_filename(filename)[1] or str(i + 1)
+        path = os.path.join(audio_dir, filename)
+        entry = metadata.get(filename)
+        has_audio = is_complete_audio(path, entry)
+
+        if has_audio and not (entry and entry.get("sha256")):
+            info = read_wav_header(path)
+            entry = dict(entry or {}, bytes=os.path.getsize(path), duration=info.get("duration"),
+                         sha256=file_sha256(path))
+
+        manifest["entries"].append(build_entry(year, csv_id, row.get("date"), filename, entry, has_audio,
+                                                   guid=row.get("guid")))
+
+    with _manifest_lock:
+        save_manifest(manifest, manifest_dir)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild per-year love-note audio manifests")
+    parser.add_argument("--years", help="Comma-separated years (default: every year CSV)")
+    parser.add_argument("--dir", default=AUDIO_DIR, help="Directory of generated WAV files")
+    parser.add_argument("--metadata", default=AUDIO_METADATA_FILE, help="Recorded audio metadata file")
+    args = parser.parse_args()
+
+    years = {int(y) for y in args.years.split(",")} if args.years else None
+    metadata = load_audio_metadata(args.metadata)
+
+    print("🗂️  Building love-note audio manifests")
+    print("=" * 50)
+    for year, csv_file in find_year_csvs():
+        if years and year not in years:
+            continue
+        manifest = rebuild_manifest(year, csv_file, args.dir, metadata)
+        print(f"✅ {year}: {manifest['count']}/{len(manifest['entries'])} notes with audio → {manifest_path(year)}")
+
+
+if __name__ == "__main__":
+    main()
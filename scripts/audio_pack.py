@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Per-year audio packs: one container file per year with a byte-range index.
+
+Concatenates a year's encoded notes (the MP3s from postprocess_audio.py by
+default) into public/audio/love-notes-packs/{year}-{hash}.pack and writes a
+{year}.json index of each note's offset and length. A client plays any note
+with a single HTTP Range request against one cacheable object instead of one
+request per file, and can preload neighbours with one wider range since notes
+are stored in CSV (chronological) order.
+
+The pack name includes its content hash, so the pack itself can be served
+immutable; only the small index changes. Packs are updated incrementally:
+new or re-encoded notes are appended to a copy of the previous pack, and the
+pack is only rewritten from scratch (restoring chronological order) once
+replaced bytes exceed COMPACT_RATIO of the file, or with --rebuild.
+
+Usage: python3 scripts/audio_pack.py [--years 2015,2016,...] [--format mp3] [--rebuild]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+
+from audio_io import atomic_write_json, load_audio_metadata
+from love_notes import find_year_csvs, load_year_rows, row_filename
+from postprocess_audio import OUTPUT_FORMATS
+
+PACK_DIR = "public/audio/love-notes-packs"
+
+CONTENT_TYPES = {"mp3": "audio/mpeg", "opus": "audio/ogg"}
+
+# Rewrite the pack once this fraction of it is superseded audio
+COMPACT_RATIO = 0.25
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def index_path(year, pack_dir=PACK_DIR):
+    """Path to a year's pack index"""
+    return os.path.join(pack_dir, f"{year}.json")
+
+
+def load_pack_index(year, pack_dir=PACK_DIR):
+    """Load a year's pack index, or None if the year hasn't been packed"""
+    path = index_path(year, pack_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def collect_notes(csv_file, fmt, metadata):
+    """
+    Encoded notes available for a year CSV, in CSV order: a list of dicts
+    with csv_id, filename, path, bytes, mtime and duration
+    """
+    output_dir, extension, _ = OUTPUT_FORMATS[fmt]
+    notes = []
+    for i, row in enumerate(load_year_rows(csv_file)):
+        wav_filename = row_filename(row, i)
+        filename = os.path.splitext(wav_filename)[0] + extension
+        path = os.path.join(output_dir, filename)
+        if not os.path.exists(path):
+            continue
+        stat = os.stat(path)
+        postprocess = (metadata.get(wav_filename) or {}).get("postprocess") or {}
+        notes.append({
+            "csv_id": str(row.get("id") or i + 1),
+            "filename": filename,
+            "path": path,
+            "bytes": stat.st_size,
+            "mtime": stat.st_mtime,
+            "duration": postprocess.get("duration"),
+        })
+    return notes
+
+
+def copy_into(dst, src_path, hasher):
+    """Append a file to an open pack, updating the pack hash. Returns the file's sha256."""
+    file_hasher = hashlib.sha256()
+    with open(src_path, "rb") as src:
+        for chunk in iter(lambda: src.read(COPY_CHUNK_SIZE), b""):
+            dst.write(chunk)
+            hasher.update(chunk)
+            file_hasher.update(chunk)
+    return file_hasher.hexdigest()
+
+
+def build_pack(year, csv_file, fmt="mp3", pack_dir=PACK_DIR, metadata=None, rebuild=False):
+    """
+    Create or incrementally update a year's pack. Returns (index, action)
+    where action is "unchanged", "appended" or "rebuilt".
+    """
+    metadata = metadata if metadata is not None else load_audio_metadata()
+    notes = collect_notes(csv_file, fmt, metadata)
+    old_index = load_pack_index(year, pack_dir)
+    old_pack = os.path.join(pack_dir, old_index["pack"]) if old_index else None
+    if not notes and not old_index:
+        return {"year": int(year), "format": fmt, "entries": []}, "unchanged"
+
+    # Entries whose source file is unchanged can stay where they are in the old pack
+    reusable = {}
+    if old_index and old_index.get("format") == fmt and os.path.exists(old_pack):
+        for entry in old_index["entries"]:
+            reusable[entry["csv_id"]] = entry
+    kept = {}
+    for note in notes:
+        entry = reusable.get(note["csv_id"])
+        if entry and entry["filename"] == note["filename"] and entry["length"] == note["bytes"] \
+                and entry["source_mtime"] == note["mtime"]:
+            kept[note["csv_id"]] = entry
+    pending = [note for note in notes if note["csv_id"] not in kept]
+
+    if old_index and not rebuild and not pending and len(kept) == len(old_index["entries"]) == len(notes) \
+            and old_index.get("format") == fmt:
+        return old_index, "unchanged"
+
+    if old_index and not rebuild and kept:
+        live_bytes = sum(entry["length"] for entry in kept.values())
+        superseded = old_index["bytes"] - live_bytes
+        rebuild = superseded / max(1, old_index["bytes"] + sum(n["bytes"] for n in pending)) > COMPACT_RATIO
+    else:
+        rebuild = True
+
+    os.makedirs(pack_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{year}.", suffix=".tmp", dir=pack_dir)
+    hasher = hashlib.sha256()
+    entries = {}
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if rebuild:
+                to_write = notes
+            else:
+                # Carry the old pack over byte for byte; kept offsets stay valid
+                with open(old_pack, "rb") as src:
+                    for chunk in iter(lambda: src.read(COPY_CHUNK_SIZE), b""):
+                        f.write(chunk)
+                        hasher.update(chunk)
+                entries.update(kept)
+                to_write = pending
+
+            for note in to_write:
+                offset = f.tell()
+                sha256 = copy_into(f, note["path"], hasher)
+                entries[note["csv_id"]] = {
+                    "csv_id": note["csv_id"],
+                    "filename": note["filename"],
+                    "offset": offset,
+                    "length": note["bytes"],
+                    "sha256": sha256,
+                    "duration": note["duration"],
+                    "source_mtime": note["mtime"],
+                }
+            f.flush()
+            os.fsync(f.fileno())
+            pack_bytes = f.tell()
+
+        pack_sha256 = hasher.hexdigest()
+        pack_name = f"{year}-{pack_sha256[:12]}.pack"
+        os.replace(tmp_path, os.path.join(pack_dir, pack_name))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    index = {
+        "year": int(year),
+        "format": fmt,
+        "content_type": CONTENT_TYPES.get(fmt, "application/octet-stream"),
+        "pack": pack_name,
+        "bytes": pack_bytes,
+        "sha256": pack_sha256,
+        "updated_at": datetime.now().isoformat(),
+        # CSV order, so neighbouring notes are adjacent in the index
+        "entries": [entries[note["csv_id"]] for note in notes],
+    }
+    atomic_write_json(index_path(year, pack_dir), index)
+
+    # The index now points at the new pack; drop the previous one
+    if old_pack and os.path.basename(old_pack) != pack_name and os.path.exists(old_pack):
+        os.remove(old_pack)
+
+    return index, "rebuilt" if rebuild else "appended"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack each year's encoded love-note audio into one range-indexed file")
+    parser.add_argument("--years", help="Comma-separated years (default: every year CSV)")
+    parser.add_argument("--format", default="mp3", choices=sorted(OUTPUT_FORMATS), help="Encoded format to pack")
+    parser.add_argument("--dir", default=PACK_DIR, help="Output directory for packs and indexes")
+    parser.add_argument("--rebuild", action="store_true", help="Rewrite packs from scratch in chronological order")
+    args = parser.parse_args()
+
+    years = {int(y) for y in args.years.split(",")} if args.years else None
+    metadata = load_audio_metadata()
+
+    print("📦 Love Notes Audio Packer")
+    print("=" * 50)
+    for year, csv_file in find_year_csvs():
+        if years and year not in years:
+            continue
+        index, action = build_pack(year, csv_file, args.format, args.dir, metadata, args.rebuild)
+        if not index["entries"]:
+            print(f"⏭️  {year}: no {args.format} files yet - run postprocess_audio.py first")
+            continue
+        icon = {"unchanged": "✅", "appended": "➕", "rebuilt": "🔄"}[action]
+        print(f"{icon} {year}: {len(index['entries'])} notes, {index['bytes'] / 1024 / 1024:.1f} MB "
+              f"→ {index['pack']} ({action})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Waveform peaks and exact durations for the audio player.
+
+For every generated WAV, computes downsampled peak arrays at several
+resolutions and the exact duration, in a process pool, and writes them to
+compact per-year sidecars at public/audio/love-notes-peaks/{year}.json so the
+player can draw waveforms and show durations without downloading audio.
+
+Peaks describe the audio the player actually plays: when a note has been
+post-processed, the recorded silence trim and loudness gain are applied first.
+Each resolution is stored as base64 of unsigned bytes (0-255 = 0 to full
+scale), about a third the size of a JSON number array.
+
+Only files whose content hash (or post-processing) changed since the last run
+are recomputed.
+
+Usage: python3 scripts/audio_peaks.py [--years 2015,2016,...] [--workers N] [--force]
+"""
+
+import argparse
+import base64
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+
+from audio_io import AUDIO_METADATA_FILE, atomic_write_json, file_sha256, load_audio_metadata
+from audio_manifest import parse_audio_filename
+from love_notes import AUDIO_DIR
+from postprocess_audio import read_wav_samples
+
+PEAKS_DIR = "public/audio/love-notes-peaks"
+
+# Highest first; each lower resolution is derived from the one above it
+RESOLUTIONS = (1024, 256, 64)
+
+
+def peaks_path(year, peaks_dir=PEAKS_DIR):
+    """Path to a year's peaks sidecar"""
+    return os.path.join(peaks_dir, f"{year}.json")
+
+
+def load_peaks(year, peaks_dir=PEAKS_DIR):
+    """Load a year's peaks sidecar, or an empty one"""
+    path = peaks_path(year, peaks_dir)
+    if not os.path.exists(path):
+        return {"year": int(year), "resolutions": list(RESOLUTIONS), "entries": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compute_peaks(samples, resolutions=RESOLUTIONS):
+    """
+    Max absolute amplitude per bin for each resolution, as uint8 arrays.
+    Lower resolutions are max-pooled from the highest, so the samples are
+    scanned once.
+    """
+    mono = np.abs(samples).max(axis=1) if samples.ndim == 2 else np.abs(samples)
+    top = resolutions[0]
+    if len(mono) < top:
+        mono = np.pad(mono, (0, top - len(mono)))
+    edges = np.linspace(0, len(mono), top + 1).astype(np.int64)[:-1]
+    current = np.maximum.reduceat(mono, edges)
+
+    peaks = {top: current}
+    for resolution in resolutions[1:]:
+        factor = len(current) // resolution
+        current = current[:resolution * factor].reshape(resolution, factor).max(axis=1)
+        peaks[resolution] = current
+    return {r: np.clip(np.round(p * 255.0), 0, 255).astype(np.uint8) for r, p in peaks.items()}
+
+
+def encode_peaks(values):
+    """uint8 array -> base64 string"""
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def analyze_file(path, postprocess=None):
+    """
+    Duration and peaks for one file. Runs in a worker process.
+    """
+    samples, sample_rate = read_wav_samples(path)
+    wav_duration = len(samples) / sample_rate
+
+    # Match the post-processed file the player serves
+    if postprocess:
+        start = int(round(postprocess.get("trimmed_start", 0) * sample_rate))
+        end = len(samples) - int(round(postprocess.get("trimmed_end", 0) * sample_rate))
+        samples = samples[start:max(start, end)]
+        samples = np.clip(samples * (10.0 ** (postprocess.get("gain_db", 0.0) / 20.0)), -1.0, 1.0)
+
+    return {
+        "duration": round(len(samples) / sample_rate, 3),
+        "wav_duration": round(wav_duration, 3),
+        "sample_rate": sample_rate,
+        "peaks": {str(r): encode_peaks(p) for r, p in compute_peaks(samples).items()},
+    }
+
+
+def source_key(sha256, postprocess):
+    """What a sidecar entry was computed from; a change means recompute"""
+    return {"sha256": sha256, "postprocessed_at": (postprocess or {}).get("processed_at")}
+
+
+def collect_files(audio_dir, metadata, years=None):
+    """
+    WAVs grouped by year: {year: [(filename, message_id, path, source, postprocess)]}.
+    Hashes come from recorded metadata when the size still matches.
+    """
+    by_year = {}
+    for filename in sorted(os.listdir(audio_dir)):
+        if not filename.endswith(".wav") or filename.startswith("."):
+            continue
+        year, message_id = parse_audio_filename(filename)
+        if year is None or (years and year not in years):
+            continue
+        path = os.path.join(audio_dir, filename)
+        entry = metadata.get(filename) or {}
+        if entry.get("sha256") and entry.get("bytes") == os.path.getsize(path):
+            sha256 = entry["sha256"]
+        else:
+            sha256 = file_sha256(path)
+        postprocess = entry.get("postprocess")
+        if postprocess and postprocess.get("source_bytes") != os.path.getsize(path):
+            postprocess = None  # stale: the WAV changed after post-processing
+        by_year.setdefault(year, []).append((filename, message_id, path, source_key(sha256, postprocess), postprocess))
+    return by_year
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute waveform peaks and durations for love-note audio")
+    parser.add_argument("--years", help="Comma-separated years (default: all)")
+    parser.add_argument("--dir", default=AUDIO_DIR, help="Directory of generated WAV files")
+    parser.add_argument("--metadata", default=AUDIO_METADATA_FILE, help="Recorded audio metadata file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Worker processes")
+    parser.add_argument("--force", action="store_true", help="Recompute every file")
+    args = parser.parse_args()
+
+    years = {int(y) for y in args.years.split(",")} if args.years else None
+    metadata = load_audio_metadata(args.metadata)
+    by_year = collect_files(args.dir, metadata, years)
+
+    print("〰️  Love Notes Waveform Peaks")
+    print("=" * 50)
+
+    sidecars = {}
+    changed = set()
+    pending = []
+    for year, files in by_year.items():
+        sidecar = load_peaks(year)
+        if sidecar.get("resolutions") != list(RESOLUTIONS):
+            sidecar = {"year": int(year), "resolutions": list(RESOLUTIONS), "entries": {}}
+        present = {message_id for _, message_id, *_ in files}
+        # Drop entries whose audio no longer exists
+        kept = {k: v for k, v in sidecar["entries"].items() if k in present}
+        if len(kept) != len(sidecar["entries"]):
+            changed.add(year)
+        sidecar["entries"] = kept
+        sidecars[year] = sidecar
+        for filename, message_id, path, source, postprocess in files:
+            existing = sidecar["entries"].get(message_id)
+            if args.force or not existing or existing.get("source") != source:
+                pending.append((year, filename, message_id, path, source, postprocess))
+                changed.add(year)
+
+    total = sum(len(files) for files in by_year.values())
+    print(f"📝 {len(pending)} of {total} files need analysis")
+
+    errors = 0
+    if pending:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = {
+                pool.submit(analyze_file, path, postprocess): (year, filename, message_id, source)
+                for year, filename, message_id, path, source, postprocess in pending
+            }
+            for future in as_completed(futures):
+                year, filename, message_id, source = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"   ❌ {filename}: {e}")
+                    errors += 1
+                    continue
+                sidecars[year]["entries"][message_id] = dict(result, filename=filename, source=source)
+
+    for year in sorted(changed):
+        sidecar = sidecars[year]
+        sidecar["updated_at"] = datetime.now().isoformat()
+        atomic_write_json(peaks_path(year), sidecar, indent=None)
+        size = os.path.getsize(peaks_path(year))
+        print(f"✅ {year}: {len(sidecar['entries'])} files → {peaks_path(year)} ({size / 1024:.0f} KB)")
+
+    if errors:
+        print(f"❌ Errors: {errors} files")
+
+
+if __name__ == "__main__":
+    main()
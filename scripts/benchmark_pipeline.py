@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+End-to-end pipeline benchmarks against a synthetic Messages database.
+
+Generates a chat.db with scripts/synthetic_chat_db.py (or uses --db), then
+runs each pipeline stage on it in a throwaway workspace:
+
+    extract_davids_backup   extract_from_davids_backup.extract_from_backup_db
+    extract_backup          extract_from_backup.BackupMessageExtractor
+    merge_and_deduplicate   merging both extractions (every GUID twice)
+    supabase_export         ultimate_comprehensive_with_davids_backup export
+    sessionize              conversation sessions and the session database
+    tts_text                the TTS text pre-pass over year CSVs of long notes
+    generation_plan         the generation plan over the same CSVs
+    save_audio              atomic WAV writes with metadata (synthetic audio)
+    rebuild_manifest        per-year manifests from the saved audio
+
+Every stage runs once under tracemalloc for its peak Python memory, then
+--repeat times untraced for wall-clock timing. Results go to
+data/benchmarks/<timestamp>.json and are compared against the previous run
+with the same message count; stages more than --threshold slower are flagged.
+
+Usage: python3 scripts/benchmark_pipeline.py [--messages 100000] [--repeat 3] [--stages extract_backup,sessionize]
+"""
+
+import argparse
+import contextlib
+import csv
+import glob
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+from datetime import datetime, timedelta
+
+from audio_io import atomic_write_json, load_audio_metadata, metadata_log_path, save_generated_audio
+from audio_manifest import rebuild_manifest
+from extract_from_backup import BackupMessageExtractor
+from extract_from_davids_backup import extract_from_backup_db
+from generation_plan import build_plan
+from love_notes import AUDIO_DIR, DATA_DIR, find_year_csvs, load_year_rows, note_filename, stable_note_ids, year_csv_path
+from sessionize import message_arrays, sessionize_chat, write_sessions
+from synthetic_chat_db import END_DATE, START_DATE, generate
+from tts_text import TEXT_CACHE_FILE, prepare_all_notes
+from ultimate_comprehensive_with_davids_backup import create_supabase_export, merge_and_deduplicate
+
+RESULTS_DIR = "data/benchmarks"
+METADATA_FILE = "data/benchmark-audio-metadata.json"
+DEFAULT_THRESHOLD = 0.10
+NOTE_MIN_CHARS = 120
+WAV_SECONDS = 1.0
+
+
+def synthetic_wav(seconds=WAV_SECONDS, sample_rate=24000):
+    """A silent mono 16-bit WAV payload, the shape the TTS API returns"""
+    out = io.BytesIO()
+    with wave.open(out, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(b"\x00\x00" * int(seconds * sample_rate))
+    return out.getvalue()
+
+
+def write_year_csvs(messages, data_dir=DATA_DIR):
+    """
+    Year CSVs in the generators' format from the long messages David sent.
+    Returns the number of notes written.
+    """
+    by_year = {}
+    for message in messages:
+        if message.get("is_from_me") == "David" and len(message.get("text") or "") >= NOTE_MIN_CHARS:
+            by_year.setdefault(message["date"][:4], []).append(message)
+    os.makedirs(data_dir, exist_ok=True)
+    for year, notes in by_year.items():
+        rows = [{"text": m["text"], "date": m["date"], "guid": m["guid"]} for m in notes]
+        for row, note_id in zip(rows, stable_note_ids(year, rows)):
+            row.update(id=note_id, emotion="love", filename=note_filename(year, note_id))
+        with open(year_csv_path(year, data_dir), "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["id", "text", "date", "emotion", "filename", "guid"])
+            writer.writeheader()
+            writer.writerows(rows)
+    return sum(len(notes) for notes in by_year.values())
+
+
+class CheckFailed(Exception):
+    """A stage produced wrong output; its timings would be meaningless"""
+
+
+def check_dates(messages, start, end):
+    """
+    Raise CheckFailed if any extracted date falls outside [start, end]: a
+    mis-decoded Apple date lands in 2001 or far in the future. Dates are
+    local time, so a day's slack either side.
+    """
+    low = (start - timedelta(days=1)).strftime("%Y-%m-%d")
+    high = (end + timedelta(days=1)).strftime("%Y-%m-%d")
+    outside = [m["readable_date"] for m in messages if m.get("readable_date") and not low <= m["readable_date"][:10] <= high]
+    if outside:
+        raise CheckFailed(f"{len(outside):,} of {len(messages):,} messages dated outside {low}..{high}, e.g. {outside[0]}")
+
+
+class Pipeline:
+    """
+    The stages, sharing their outputs: each stage reads what earlier stages
+    left in self.state. Stage methods return the number of items processed;
+    reset_<stage> methods (untimed) undo a stage's effects between repeats,
+    and check_<stage> methods (untimed) raise CheckFailed on wrong output.
+    """
+
+    STAGES = [
+        "extract_davids_backup", "extract_backup", "merge_and_deduplicate", "supabase_export",
+        "sessionize", "tts_text", "generation_plan", "save_audio", "rebuild_manifest",
+    ]
+
+    def __init__(self, db_path, audio_notes, date_range=None):
+        self.db_path = db_path
+        self.audio_notes = audio_notes
+        # (start, end) of the synthetic messages; None for a real --db
+        self.date_range = date_range
+        self.state = {}
+
+    def extract_davids_backup(self):
+        self.state["davids_backup"] = extract_from_backup_db(self.db_path, "synthetic")
+        return len(self.state["davids_backup"])
+
+    def check_extract_davids_backup(self):
+        if self.date_range:
+            check_dates(self.state["davids_backup"], *self.date_range)
+
+    def extract_backup(self):
+        extractor = BackupMessageExtractor.__new__(BackupMessageExtractor)
+        extractor.backup_path = self.db_path
+        self.state["backup"] = extractor.extract_direct_nitzan_messages("extract_backup.json") or []
+        return len(self.state["backup"])
+
+    def check_extract_backup(self):
+        if self.date_range:
+            check_dates(self.state["backup"], *self.date_range)
+
+    def merge_and_deduplicate(self):
+        self.state["merged"] = merge_and_deduplicate({
+            "davids_backup": self.state.get("davids_backup", []),
+            "backup": self.state.get("backup", []),
+        })
+        return sum(len(self.state.get(name, [])) for name in ("davids_backup", "backup"))
+
+    def supabase_export(self):
+        json_file, csv_file = create_supabase_export(self.state["merged"])
+        os.remove(json_file)
+        os.remove(csv_file)
+        return len(self.state["merged"])
+
+    def sessionize(self):
+        sessions, members = [], []
+        for chat, arrays in message_arrays(self.state["davids_backup"]).items():
+            chat_sessions, chat_members = sessionize_chat(chat, arrays)
+            sessions.extend(chat_sessions)
+            members.extend(chat_members)
+        write_sessions(sessions, members)
+        return len(members)
+
+    def reset_tts_text(self):
+        if not find_year_csvs():
+            self.state["notes"] = write_year_csvs(self.state["davids_backup"])
+        if os.path.exists(TEXT_CACHE_FILE):
+            os.remove(TEXT_CACHE_FILE)
+
+    def tts_text(self):
+        _, report = prepare_all_notes()
+        return report["notes"]
+
+    def generation_plan(self):
+        build_plan(metadata_file=METADATA_FILE)
+        return self.state["notes"]
+
+    def reset_save_audio(self):
+        shutil.rmtree(AUDIO_DIR, ignore_errors=True)
+        os.makedirs(AUDIO_DIR)
+        for path in (METADATA_FILE, metadata_log_path(METADATA_FILE)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def save_audio(self):
+        payload = synthetic_wav()
+        saved = 0
+        for _, csv_file in find_year_csvs():
+            for row in load_year_rows(csv_file):
+                if saved >= self.audio_notes:
+                    return saved
+                save_generated_audio(AUDIO_DIR, row["filename"], payload, WAV_SECONDS, METADATA_FILE)
+                saved += 1
+        return saved
+
+    def rebuild_manifest(self):
+        metadata = load_audio_metadata(METADATA_FILE)
+        entries = 0
+        for year, csv_file in find_year_csvs():
+            entries += len(rebuild_manifest(year, csv_file, AUDIO_DIR, metadata)["entries"])
+        return entries
+
+
+def run_stage(pipeline, name, repeat):
+    """Peak memory from one traced run, then `repeat` timed runs"""
+    stage = getattr(pipeline, name)
+    reset = getattr(pipeline, f"reset_{name}", None)
+    check = getattr(pipeline, f"check_{name}", None)
+
+    def run():
+        if reset:
+            reset()
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            items = stage()
+            return time.perf_counter() - started, items
+
+    tracemalloc.start()
+    _, items = run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if check:
+        check()
+
+    seconds = [run()[0] for _ in range(repeat)]
+    median = statistics.median(seconds)
+    return {
+        "items": items,
+        "seconds": [round(s, 5) for s in seconds],
+        "median_seconds": round(median, 5),
+        "min_seconds": round(min(seconds), 5),
+        "items_per_second": round(items / median, 1) if median else None,
+        "peak_memory_bytes": peak,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_results(results_dir, messages):
+    """The most recent earlier run with the same message count, or None"""
+    for path in sorted(glob.glob(os.path.join(results_dir, "*.json")), reverse=True):
+        with open(path, "r", encoding="utf-8") as f:
+            results = json.load(f)
+        if results.get("messages") == messages:
+            return path, results
+    return None
+
+
+def compare(results, previous, threshold):
+    """{stage: ratio of median time to the previous run's}, and the regressed stages"""
+    ratios = {}
+    for name, stage in results["stages"].items():
+        before = previous["stages"].get(name)
+        if before and before["median_seconds"]:
+            ratios[name] = round(stage["median_seconds"] / before["median_seconds"], 3)
+    return ratios, [name for name, ratio in ratios.items() if ratio > 1 + threshold]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the message and audio pipeline on a synthetic chat.db")
+    parser.add_argument("--messages", type=int, default=10000, help="Synthetic messages to generate")
+    parser.add_argument("--db", help="Benchmark an existing chat.db instead of generating one")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage")
+    parser.add_argument("--stages", help=f"Comma-separated subset of: {', '.join(Pipeline.STAGES)}")
+    parser.add_argument("--audio-notes", type=int, default=200, help="Synthetic WAVs to save in save_audio")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown vs the previous run that counts as a regression")
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if any stage regressed")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark workspace")
+    args = parser.parse_args()
+
+    selected = args.stages.split(",") if args.stages else Pipeline.STAGES
+    unknown = [s for s in selected if s not in Pipeline.STAGES]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+    # Later stages consume earlier ones' output, so run every prerequisite
+    # (untimed) up to the last selected stage
+    needed = Pipeline.STAGES[:max(Pipeline.STAGES.index(s) for s in selected) + 1]
+
+    results_dir = os.path.abspath(args.results_dir)
+    workspace = tempfile.mkdtemp(prefix="lovenotes-bench-")
+    cwd = os.getcwd()
+
+    print("⏱️  Pipeline Benchmark")
+    print("=" * 50)
+
+    try:
+        if args.db:
+            db_path = os.path.abspath(args.db)
+            messages = None
+            print(f"📁 Database: {db_path}")
+        else:
+            db_path = os.path.join(workspace, "chat.db")
+            started = time.perf_counter()
+            stats = generate(db_path, args.messages, seed=args.seed)
+            messages = stats["messages"]
+            print(f"🧪 {messages:,} synthetic messages ({stats['bytes'] / 1024 / 1024:.1f} MB) "
+                  f"in {time.perf_counter() - started:.1f}s")
+
+        # Every stage writes relative to data/ and public/, so they land in the workspace
+        os.chdir(workspace)
+        pipeline = Pipeline(db_path, args.audio_notes, None if args.db else (START_DATE, END_DATE))
+        results = {
+            "created_at": datetime.now().isoformat(),
+            "git_commit": git_commit() if os.path.isdir(os.path.join(cwd, ".git")) else None,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "messages": messages,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "stages": {},
+        }
+
+        print(f"🔁 {args.repeat} timed runs per stage")
+        print("")
+        for name in needed:
+            if name not in selected:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    if hasattr(pipeline, f"reset_{name}"):
+                        getattr(pipeline, f"reset_{name}")()
+                    getattr(pipeline, name)()
+                if hasattr(pipeline, f"check_{name}"):
+                    getattr(pipeline, f"check_{name}")()
+                continue
+            stage = run_stage(pipeline, name, args.repeat)
+            results["stages"][name] = stage
+            rate = f"{stage['items_per_second']:>12,.0f}/s" if stage["items_per_second"] else ""
+            print(f"   {name:<24}{stage['median_seconds']:>9.3f}s  {stage['items']:>9,} items{rate}  "
+                  f"peak {stage['peak_memory_bytes'] / 1024 / 1024:.1f} MB")
+    except CheckFailed as e:
+        print(f"❌ {name}: {e}")
+        sys.exit(1)
+    finally:
+        os.chdir(cwd)
+        if args.keep:
+            print(f"📂 Workspace kept: {workspace}")
+        else:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    previous = previous_results(results_dir, messages)
+    results_file = os.path.join(results_dir, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    regressions = []
+    if previous:
+        ratios, regressions = compare(results, previous[1], args.threshold)
+        results["baseline"] = {"file": os.path.basename(previous[0]), "ratios": ratios, "regressions": regressions}
+    atomic_write_json(results_file, results)
+
+    print("")
+    if previous:
+        print(f"📊 Compared with {os.path.basename(previous[0])}:")
+        for name, ratio in results["baseline"]["ratios"].items():
+            flag = "⚠️  regression" if name in regressions else ""
+            print(f"   {name:<24}{ratio:>7.2f}x  {flag}")
+    else:
+        print("📊 No previous run with the same message count to compare against")
+    print(f"💾 Results saved to: {results_file}")
+
+    if regressions:
+        print(f"⚠️  {len(regressions)} stages slower than {args.threshold:.0%} over the previous run")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Consistent snapshots of a live Messages database.
+
+Opening ~/Library/Messages/chat.db in place either misses the messages still
+in chat.db-wal or contends with the Messages app for locks. This copies it
+(WAL contents included) to data/snapshots/<label>-<timestamp>.db with
+SQLite's online backup API, a batch of pages at a time: between batches the
+source is unlocked, and in WAL mode the writer is never blocked at all. If
+the source changes mid-copy the backup restarts from a fresh read; after
+--max-restarts it copies in a single step instead, a consistent read
+transaction that still doesn't block a WAL writer.
+
+The snapshot is a self-contained rollback-journal database (no -wal/-shm),
+integrity-checked and made read-only. open_snapshot() opens it with
+immutable=1, so SQLite skips locking and change detection entirely.
+
+Each new snapshot prunes older ones with the same label down to the newest
+--keep (default 3). The extractors take --snapshot to run against a snapshot
+of each source, and delete it afterwards unless given --keep-snapshot.
+
+Usage: python3 scripts/chat_snapshot.py [~/Library/Messages/chat.db] [--label NAME] [--pages N] [--keep N]
+"""
+
+import argparse
+import glob
+import os
+import sqlite3
+import stat
+import sys
+import time
+from datetime import datetime
+
+SNAPSHOT_DIR = "data/snapshots"
+LIVE_CHAT_DB = os.path.expanduser("~/Library/Messages/chat.db")
+
+# Pages per backup step (4 KB pages: 4 MB per step) and the pause between steps
+SNAPSHOT_PAGES = 1024
+STEP_SLEEP = 0.005
+MAX_RESTARTS = 5
+
+# Snapshots kept per label; each is a full copy of the database
+KEEP_SNAPSHOTS = 3
+
+
+class SourceChanged(Exception):
+    """The source kept changing under the incremental copy"""
+
+
+def open_source(db_path):
+    """
+    Read-only connection that sees the WAL. Backup volumes are often
+    read-only, and a WAL database there can't create its -shm file; fall back
+    to immutable=1, which reads the main file alone.
+    """
+    uri = f"file:{os.path.abspath(db_path)}"
+    try:
+        conn = sqlite3.connect(f"{uri}?mode=ro", uri=True)
+        conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        return conn, False
+    except sqlite3.OperationalError:
+        return sqlite3.connect(f"{uri}?immutable=1", uri=True), True
+
+
+def open_snapshot(snapshot_path):
+    """Connection to a snapshot; immutable, so no locking at all"""
+    return sqlite3.connect(f"file:{os.path.abspath(snapshot_path)}?immutable=1", uri=True)
+
+
+def remove_snapshot(snapshot_path):
+    """Delete a snapshot, read-only as it is"""
+    if os.path.exists(snapshot_path):
+        os.chmod(snapshot_path, stat.S_IRUSR | stat.S_IWUSR)
+        os.remove(snapshot_path)
+
+
+def prune_snapshots(label, keep=KEEP_SNAPSHOTS, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Delete all but the newest `keep` timestamped snapshots of a label.
+    Returns the deleted paths.
+    """
+    pattern = f"{glob.escape(label)}-{'[0-9]' * 8}_{'[0-9]' * 6}.db"
+    paths = sorted(glob.glob(os.path.join(glob.escape(snapshot_dir), pattern)))
+    stale = paths[:-keep] if keep > 0 else paths
+    for path in stale:
+        remove_snapshot(path)
+    return stale
+
+
+def snapshot_database(db_path, label=None, output=None, pages=SNAPSHOT_PAGES, sleep=STEP_SLEEP,
+                      max_restarts=MAX_RESTARTS, keep=KEEP_SNAPSHOTS, quiet=False):
+    """
+    Copy a (possibly live) SQLite database to a private, immutable file.
+    Returns the snapshot's metadata, including its path. A snapshot written
+    to the default location prunes the label's older ones to the newest
+    `keep` (None keeps them all).
+    """
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database not found: {db_path}")
+    label = label or os.path.splitext(os.path.basename(db_path))[0]
+    prune = output is None and keep is not None
+    output = output or os.path.join(SNAPSHOT_DIR, f"{label}-{datetime.now().strftime('%Y%m%d_%H%M%S')}.db")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    temp = f"{output}.tmp"
+
+    source, wal_skipped = open_source(db_path)
+    if wal_skipped and not quiet:
+        print(f"⚠️  {db_path} can't be opened with its WAL (read-only volume?); copying the main file only")
+
+    state = {"restarts": 0, "steps": 0, "remaining": None}
+
+    def progress(status, remaining, total):
+        state["steps"] += 1
+        if state["remaining"] is not None and remaining > state["remaining"]:
+            state["restarts"] += 1
+            if state["restarts"] > max_restarts:
+                raise SourceChanged()
+        state["remaining"] = remaining
+        if not quiet and state["steps"] % 50 == 0:
+            print(f"   📄 {total - remaining:,}/{total:,} pages", end="\r")
+
+    started = time.perf_counter()
+    try:
+        for attempt_pages in (pages, -1):
+            if os.path.exists(temp):
+                os.remove(temp)
+            target = sqlite3.connect(temp)
+            try:
+                source.backup(target, pages=attempt_pages, progress=progress, sleep=sleep)
+                break
+            except SourceChanged:
+                if not quiet:
+                    print(f"⚠️  Source changed {state['restarts']} times mid-copy; copying in one read transaction")
+            finally:
+                target.close()
+
+        target = sqlite3.connect(temp)
+        # A single self-contained file: no -wal/-shm next to the snapshot
+        target.execute("PRAGMA journal_mode=DELETE")
+        check = target.execute("PRAGMA quick_check").fetchone()[0]
+        if check != "ok":
+            raise sqlite3.DatabaseError(f"Snapshot failed its integrity check: {check}")
+        page_count = target.execute("PRAGMA page_count").fetchone()[0]
+        messages, max_rowid = None, None
+        if target.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'message'").fetchone():
+            messages, max_rowid = target.execute("SELECT COUNT(*), MAX(ROWID) FROM message").fetchone()
+        target.close()
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+    finally:
+        source.close()
+
+    os.replace(temp, output)
+    os.chmod(output, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+    seconds = time.perf_counter() - started
+
+    info = {
+        "path": output,
+        "source": os.path.abspath(db_path),
+        "label": label,
+        "created_at": datetime.now().isoformat(),
+        "pages": page_count,
+        "bytes": os.path.getsize(output),
+        "messages": messages,
+        "max_rowid": max_rowid,
+        "restarts": state["restarts"],
+        "wal_included": not wal_skipped,
+        "seconds": round(seconds, 3),
+    }
+    if not quiet:
+        size_mb = info["bytes"] / 1024 / 1024
+        counts = f", {messages:,} messages (max ROWID {max_rowid})" if messages is not None else ""
+        print(f"📸 Snapshot of {label}: {size_mb:.1f} MB{counts} in {seconds:.2f}s → {output}")
+    if prune:
+        pruned = prune_snapshots(label, keep)
+        if pruned and not quiet:
+            print(f"🧹 Removed {len(pruned)} older {label} snapshot(s), keeping the newest {keep}")
+    return info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Take a consistent snapshot of a live chat.db")
+    parser.add_argument("database", nargs="?", default=LIVE_CHAT_DB, help="Database to copy (default: the live chat.db)")
+    parser.add_argument("--label", help="Snapshot name prefix (default: the database file name)")
+    parser.add_argument("--output", help="Snapshot file (default: data/snapshots/<label>-<timestamp>.db)")
+    parser.add_argument("--pages", type=int, default=SNAPSHOT_PAGES, help="Pages copied per backup step")
+    parser.add_argument("--max-restarts", type=int, default=MAX_RESTARTS,
+                        help="Restarts of the incremental copy before copying in one step")
+    parser.add_argument("--keep", type=int, default=KEEP_SNAPSHOTS,
+                        help=f"Snapshots of this label to keep (default {KEEP_SNAPSHOTS}; 0 keeps all)")
+    args = parser.parse_args()
+
+    print("📸 Chat Database Snapshot")
+    print("=" * 50)
+    try:
+        snapshot_database(args.database, args.label, args.output, args.pages, max_restarts=args.max_restarts,
+                          keep=args.keep or None)
+    except (FileNotFoundError, sqlite3.Error) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
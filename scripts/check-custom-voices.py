@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 import os
-from hume import HumeClient
+from voice_registry import find_voice, get_client, get_registry
 
 def check_custom_voices():
     print("🔍 Checking for custom voices...")
@@ -12,38 +12,30 @@ def check_custom_voices():
     
     try:
         # Initialize the client
-        client = HumeClient(api_key=api_key)
+        client = get_client()
         print("✅ Client initialized successfully")
         
-        # Check custom voices
+        # List custom and Hume AI voices through the cached registry
+        registry = get_registry(client, refresh=True)
+        custom_voices = [v for v in registry["voices"] if v["provider"] == "CUSTOM_VOICE"]
+        hume_voices = [v for v in registry["voices"] if v["provider"] == "HUME_AI"]
+
         print("\n🔍 Checking custom voices...")
-        custom_voices = list(client.tts.voices.list(provider="CUSTOM_VOICE"))
         print(f"✅ Found {len(custom_voices)} custom voices:")
-        
         for i, voice in enumerate(custom_voices):
-            print(f"   {i+1}. {voice.name} (ID: {voice.id})")
-            
-            # Look for David2 voice
-            if voice.name == 'David2' or 'david2' in voice.name.lower():
-                print(f"   🎯 Found David2 voice: {voice.id}")
-        
-        # Also check Hume AI voices for David2
-        print("\n🔍 Checking Hume AI voices for David2...")
-        hume_voices = list(client.tts.voices.list(provider="HUME_AI"))
-        
-        david2_found = False
-        for voice in hume_voices:
-            if voice.name == 'David2' or 'david2' in voice.name.lower():
-                print(f"   🎯 Found David2 voice: {voice.id}")
-                david2_found = True
-        
-        if not david2_found:
+            print(f"   {i+1}. {voice['name']} (ID: {voice['id']})")
+
+        print(f"\n✅ Found {len(hume_voices)} Hume AI voices")
+
+        david2 = find_voice(registry, "David2")
+        if david2:
+            print(f"   🎯 Found David2 voice: {david2['id']} ({david2['provider']})")
+        else:
             print("   ❌ David2 voice not found in any provider")
             print("\n📋 Available voice names containing 'david':")
-            all_voices = custom_voices + hume_voices
-            for voice in all_voices:
-                if 'david' in voice.name.lower():
-                    print(f"   - {voice.name} (ID: {voice.id})")
+            for voice in registry["voices"]:
+                if 'david' in (voice['name'] or '').lower():
+                    print(f"   - {voice['name']} (ID: {voice['id']})")
         
         return True
         
@@ -22,6 +22,7 @@ function convertToAudioFormat(year) {
     const csvContent = fs.readFileSync(inputFile, 'utf-8')
     const lines = csvContent.split('\n')
     const headers = lines[0].split(',')
+    const guidIndex = headers.map(h => h.trim()).indexOf('guid')
     
     // Parse CSV and convert to audio format
     const audioNotes = lines.slice(1).filter(line => line.trim()).map(line => {
@@ -47,6 +48,7 @@ function convertToAudioFormat(year) {
       const text = values[1]?.replace(/"/g, '') || ''
       const date = values[2]?.replace(/"/g, '') || ''
       const emotion = values[3]?.replace(/"/g, '') || 'love'
+      const guid = guidIndex >= 0 ? values[guidIndex]?.replace(/"/g, '') || '' : ''
       const filename = `david-${year}-love-note-${id}.wav`
       
       return {
@@ -54,14 +56,15 @@ function convertToAudioFormat(year) {
         text,
         date,
         emotion,
-        filename
+        filename,
+        guid
       }
     })
     
     // Generate new CSV in audio format
-    const csvHeader = 'id,text,date,emotion,filename\n'
+    const csvHeader = 'id,text,date,emotion,filename,guid\n'
     const csvRows = audioNotes.map(note => {
-      return `"${note.id}","${note.text.replace(/"/g, '""')}","${note.date}","${note.emotion}","${note.filename}"`
+      return `"${note.id}","${note.text.replace(/"/g, '""')}","${note.date}","${note.emotion}","${note.filename}","${note.guid}"`
     }).join('\n')
     
     const outputCsvContent = csvHeader + csvRows
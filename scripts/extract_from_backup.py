@@ -5,6 +5,7 @@ Extracts ONLY direct messages between David and Nitzan from the iPhone backup.
 Excludes group chats to ensure we only get 1-on-1 conversations.
 """
 
+import argparse
 import sqlite3
 import os
 import json
@@ -12,6 +13,9 @@ import csv
 from datetime import datetime
 from pathlib import Path
 
+from chat_snapshot import remove_snapshot, snapshot_database
+from profiling import ProfiledCursor, add_profile_arguments, stage, staged, start_profiling
+
 
 class BackupMessageExtractor:
     def __init__(self):
@@ -47,7 +51,7 @@ class BackupMessageExtractor:
         
         try:
             conn = sqlite3.connect(self.backup_path)
-            cursor = conn.cursor()
+            cursor = conn.cursor(ProfiledCursor)
             
             # Find direct chats with Nitzan (excludes group chats)
             query = """
@@ -96,7 +100,7 @@ class BackupMessageExtractor:
         
         try:
             conn = sqlite3.connect(self.backup_path)
-            cursor = conn.cursor()
+            cursor = conn.cursor(ProfiledCursor)
             
             # First find direct chats
             direct_chats = self.find_direct_nitzan_chats()
@@ -125,7 +129,9 @@ class BackupMessageExtractor:
                     m.cache_has_attachments,
                     h.id as contact_id,
                     h.service,
-                    datetime(m.date/1000000000 + strftime('%s', '2001-01-01'), 'unixepoch', 'localtime') as readable_date
+                    -- Nanoseconds since 2001, or seconds in databases from before macOS 10.13
+                    datetime(CASE WHEN m.date > 1e15 THEN m.date/1000000000 ELSE m.date END + strftime('%s', '2001-01-01'),
+                             'unixepoch', 'localtime') as readable_date
                 FROM message m
                 JOIN chat_message_join cmj ON m.ROWID = cmj.message_id
                 LEFT JOIN handle h ON m.handle_id = h.ROWID
@@ -139,7 +145,7 @@ class BackupMessageExtractor:
                 print(f"  ✅ Extracted {len(chat_messages)} messages from this chat")
                 
                 # Convert to our format
-                for msg in chat_messages:
+                for msg in staged("row_conversion", chat_messages):
                     message_data = {
                         'message_id': msg[0],
                         'guid': msg[1],
@@ -188,7 +194,7 @@ class BackupMessageExtractor:
             
             # Save to file
             if output_file and all_messages:
-                with open(output_file, 'w', encoding='utf-8') as f:
+                with open(output_file, 'w', encoding='utf-8') as f, stage("serialization"):
                     json.dump({
                         'metadata': {
                             'source': 'iPhone_Backup_Direct_Only',
@@ -203,7 +209,7 @@ class BackupMessageExtractor:
                 
                 # Also create CSV
                 csv_file = output_file.replace('.json', '.csv')
-                with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+                with open(csv_file, 'w', newline='', encoding='utf-8') as f, stage("serialization"):
                     writer = csv.writer(f)
                     writer.writerow([
                         'message_id', 'guid', 'text', 'date', 'date_read', 'is_from_me',
@@ -233,8 +239,21 @@ class BackupMessageExtractor:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Extract direct Nitzan messages from the iPhone backup")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="Extract from a consistent snapshot of the database instead of the file in place")
+    parser.add_argument("--keep-snapshot", action="store_true",
+                        help="Keep the snapshot in data/snapshots/ after extracting (default: delete it)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args, "extract_from_backup")
+
+    snapshot = None
     try:
         extractor = BackupMessageExtractor()
+        if args.snapshot:
+            snapshot = snapshot_database(extractor.backup_path, label="iphone_backup")["path"]
+            extractor.backup_path = snapshot
         
         # Generate output filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -244,6 +263,9 @@ def main():
         
     except Exception as e:
         print(f"❌ Error: {e}")
+    finally:
+        if snapshot and not args.keep_snapshot:
+            remove_snapshot(snapshot)
 
 
 if __name__ == "__main__":
@@ -3,12 +3,29 @@
 Extract messages from David's backup drive
 """
 
+import argparse
 import sqlite3
 import json
 import os
 from datetime import datetime
 from pathlib import Path
 
+from chat_snapshot import remove_snapshot, snapshot_database
+from message_export import apple_to_unix
+from profiling import ProfiledCursor, add_profile_arguments, stage, staged, start_profiling
+
+# Direct Nitzan/David chats (alias c); group chats and other contacts are excluded
+DIRECT_NITZAN_CHATS = """
+    (c.chat_identifier LIKE '%nitzan%'
+       OR c.chat_identifier LIKE '%pelman%'
+       OR c.chat_identifier LIKE '%917%239%0518%'
+       OR c.chat_identifier = '+19172390518'
+       OR c.chat_identifier LIKE '%david%'
+       OR c.chat_identifier LIKE '%steuer%')
+    AND c.chat_identifier NOT LIKE 'chat%'
+    AND (c.display_name IS NULL OR c.display_name = '')
+"""
+
 def extract_from_backup_db(db_path, source_name):
     """Extract messages from a specific backup database"""
     
@@ -21,10 +38,10 @@ def extract_from_backup_db(db_path, source_name):
     
     try:
         conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        cursor = conn.cursor(ProfiledCursor)
         
         # Find direct Nitzan chats
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT DISTINCT
                 c.ROWID as chat_id,
                 c.guid,
@@ -37,14 +54,7 @@ def extract_from_backup_db(db_path, source_name):
             FROM chat c
             JOIN chat_message_join cmj ON c.ROWID = cmj.chat_id
             JOIN message m ON cmj.message_id = m.ROWID
-            WHERE (c.chat_identifier LIKE '%nitzan%'
-               OR c.chat_identifier LIKE '%pelman%'
-               OR c.chat_identifier LIKE '%917%239%0518%'
-               OR c.chat_identifier = '+19172390518'
-               OR c.chat_identifier LIKE '%david%'
-               OR c.chat_identifier LIKE '%steuer%')
-               AND c.chat_identifier NOT LIKE 'chat%'
-               AND (c.display_name IS NULL OR c.display_name = '')
+            WHERE {DIRECT_NITZAN_CHATS}
             GROUP BY c.ROWID, c.guid, c.chat_identifier, c.display_name, c.is_archived
             ORDER BY message_count DESC
         """)
@@ -80,13 +90,13 @@ def extract_from_backup_db(db_path, source_name):
             
             chat_messages = cursor.fetchall()
             
-            for msg in chat_messages:
+            for msg in staged("row_conversion", chat_messages):
                 message_id, guid, text, date, date_read, is_from_me, service, account, handle_id = msg
                 
-                # Convert Apple timestamp to readable date
+                # Convert Apple timestamp (nanoseconds or, in older databases, seconds) to readable date
                 if date:
                     apple_date = int(date)
-                    readable_date = datetime.fromtimestamp(apple_date / 1000000000 + 978307200).isoformat()
+                    readable_date = datetime.fromtimestamp(apple_to_unix(apple_date)).isoformat()
                 else:
                     apple_date = None
                     readable_date = None
@@ -94,7 +104,7 @@ def extract_from_backup_db(db_path, source_name):
                 # Convert read date
                 if date_read:
                     apple_date_read = int(date_read)
-                    readable_date_read = datetime.fromtimestamp(apple_date_read / 1000000000 + 978307200).isoformat()
+                    readable_date_read = datetime.fromtimestamp(apple_to_unix(apple_date_read)).isoformat()
                 else:
                     apple_date_read = None
                     readable_date_read = None
@@ -142,6 +152,15 @@ def extract_from_backup_db(db_path, source_name):
 
 def main():
     """Main extraction function"""
+    parser = argparse.ArgumentParser(description="Extract direct Nitzan/David messages from David's backup drive")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="Extract from a consistent snapshot of each database instead of the file in place")
+    parser.add_argument("--keep-snapshot", action="store_true",
+                        help="Keep the snapshots in data/snapshots/ after extracting (default: delete them)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args, "extract_from_davids_backup")
+
     print("🔍 EXTRACTING MESSAGES FROM DAVID'S BACKUP")
     print("=" * 60)
     
@@ -164,7 +183,13 @@ def main():
     all_messages = []
     
     for db_info in backup_databases:
-        messages = extract_from_backup_db(db_info['path'], db_info['name'])
+        db_path = db_info['path']
+        snapshot = None
+        if args.snapshot and os.path.exists(db_path):
+            snapshot = db_path = snapshot_database(db_path, label=db_info['name'])['path']
+        messages = extract_from_backup_db(db_path, db_info['name'])
+        if snapshot and not args.keep_snapshot:
+            remove_snapshot(snapshot)
         all_messages.extend(messages)
     
     if all_messages:
@@ -217,7 +242,7 @@ def main():
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_file = f"davids_backup_messages_{timestamp}.json"
         
-        with open(output_file, 'w') as f:
+        with open(output_file, 'w') as f, stage("serialization"):
             json.dump(all_messages, f, indent=2)
         
         print(f"\n💾 Saved {len(all_messages)} messages to: {output_file}")
@@ -232,7 +257,7 @@ def main():
             'contact_id', 'readable_date', 'apple_date', 'apple_date_read'
         ]
         
-        with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+        with open(csv_file, 'w', newline='', encoding='utf-8') as f, stage("serialization"):
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             writer.writeheader()
             
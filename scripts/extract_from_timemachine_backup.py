@@ -8,6 +8,8 @@ import json
 from datetime import datetime
 import os
 
+from message_export import apple_to_unix
+
 def extract_from_timemachine_backup():
     """Extract messages from the Time Machine backup chat.db"""
     
@@ -111,7 +113,7 @@ def extract_from_timemachine_backup():
                 
                 # Convert Apple timestamp to readable date
                 if date:
-                    readable_date = datetime.fromtimestamp(date / 1000000000 + 978307200).isoformat()
+                    readable_date = datetime.fromtimestamp(apple_to_unix(date)).isoformat()
                 else:
                     readable_date = None
                 
@@ -174,6 +174,7 @@ async function find2016LoveNotes() {
       if (score >= 4) {
         loveNotes.push({
           message_id: message.message_id,
+          guid: message.guid,
           text: message.text,
           readable_date: message.readable_date,
           score: score,
@@ -207,13 +208,13 @@ async function find2016LoveNotes() {
     
     // Save to CSV for audio generation
     if (loveNotes.length > 0) {
-      const csvData = ['id,text,date,emotion,filename']
+      const csvData = ['id,text,date,emotion,filename,guid']
       
       for (const note of loveNotes) {
         const emotion = note.score >= 8 ? 'love' : note.score >= 6 ? 'gratitude' : 'appreciation'
         const filename = `david-2016-love-note-${note.message_id}.wav`
         
-        csvData.push(`"${note.message_id}","${note.text.replace(/"/g, '""')}","${note.readable_date}","${emotion}","${filename}"`)
+        csvData.push(`"${note.message_id}","${note.text.replace(/"/g, '""')}","${note.readable_date}","${emotion}","${filename}","${note.guid || ''}"`)
       }
       
       fs.writeFileSync('data/2016-david-love-notes-for-audio.csv', csvData.join('\n'))
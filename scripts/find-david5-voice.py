@@ -4,8 +4,8 @@ import os
 import csv
 import sys
 from pathlib import Path
-from hume import HumeClient
 from hume.tts.types import PostedUtterance, PostedUtteranceVoiceWithId, FormatWav
+from voice_registry import DEFAULT_VOICE, get_client, get_registry, resolve_voice
 
 def find_david5_voice():
     """
@@ -14,62 +14,29 @@ def find_david5_voice():
     print("🔍 Finding David5 voice...")
     
     # Initialize Hume client
-    api_key = os.getenv('HUME_API_KEY', '5sMy54ZASUGzlDJv8f2nOIliS5AqEJmYyhECrA6VqiwZVIFx')
-    client = HumeClient(api_key=api_key)
+    client = get_client()
     
     try:
-        # Get available voices - try different methods
-        voices = []
-        try:
-            voices = client.tts.list_voices()
-        except AttributeError:
-            try:
-                voices = client.tts.voices()
-            except AttributeError:
-                print("⚠️  Could not list voices directly, testing with known voice ID")
-                # Test with the current working voice ID
-                test_david5_voice("e61bbb66-9084-40b7-a4dc-ddd0c62592c9")
-                return "e61bbb66-9084-40b7-a4dc-ddd0c62592c9"
-        
-        print(f"📝 Found {len(voices)} voices")
-        
-        # Look for David5 voice
-        david5_voice = None
-        for voice in voices:
-            if hasattr(voice, 'name') and voice.name and 'david5' in voice.name.lower():
-                david5_voice = voice
-                break
+        voice_id = resolve_voice("David5", client)
+        print(f"✅ Found David5 voice!")
+        print(f"   ID: {voice_id}")
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        print("Available voices:")
+        for voice in get_registry(client)["voices"]:
+            print(f"   - {voice['name']} (ID: {voice['id']})")
         
-        if david5_voice:
-            print(f"✅ Found David5 voice!")
-            print(f"   Name: {david5_voice.name}")
-            print(f"   ID: {david5_voice.id}")
-            print(f"   Model: {david5_voice.model_id}")
-            
-            # Test with a sample from 2022
-            test_david5_voice(david5_voice.id)
-            
-            return david5_voice.id
-        else:
-            print("❌ David5 voice not found")
-            print("Available voices:")
-            for voice in voices:
-                voice_name = getattr(voice, 'name', 'Unnamed')
-                voice_id = getattr(voice, 'id', 'Unknown')
-                print(f"   - {voice_name} (ID: {voice_id})")
-            
-            # Try the current working voice ID
-            print(f"\n🔄 Testing current working voice ID: e61bbb66-9084-40b7-a4dc-ddd0c62592c9")
-            test_david5_voice("e61bbb66-9084-40b7-a4dc-ddd0c62592c9")
-            
-            return "e61bbb66-9084-40b7-a4dc-ddd0c62592c9"
-            
+        # Fall back to the current working voice
+        voice_id = resolve_voice(DEFAULT_VOICE, client)
+        print(f"\n🔄 Testing current working voice {DEFAULT_VOICE}: {voice_id}")
     except Exception as e:
         print(f"❌ Error finding voices: {e}")
-        # Fallback to testing the known working voice ID
-        print(f"\n🔄 Testing fallback voice ID: e61bbb66-9084-40b7-a4dc-ddd0c62592c9")
-        test_david5_voice("e61bbb66-9084-40b7-a4dc-ddd0c62592c9")
-        return "e61bbb66-9084-40b7-a4dc-ddd0c62592c9"
+        voice_id = DEFAULT_VOICE
+        print(f"\n🔄 Testing fallback voice ID: {voice_id}")
+    
+    # Test with a sample from 2022
+    test_david5_voice(voice_id)
+    return voice_id
 
 def test_david5_voice(voice_id):
     """
@@ -78,8 +45,7 @@ def test_david5_voice(voice_id):
     print(f"\n🎤 Testing voice ID: {voice_id}")
     
     # Initialize Hume client
-    api_key = os.getenv('HUME_API_KEY', '5sMy54ZASUGzlDJv8f2nOIliS5AqEJmYyhECrA6VqiwZVIFx')
-    client = HumeClient(api_key=api_key)
+    client = get_client()
     
     # Read a sample from 2022
     csv_file = "data/2022-david-love-notes-for-audio.csv"
@@ -111,8 +77,8 @@ def test_david5_voice(voice_id):
                 format=FormatWav()
             )
             
-            # Save test audio file
-            output_dir = "public/audio/love-notes"
+            # Save test audio outside the production audio directory
+            output_dir = "data/voice-comparison"
             Path(output_dir).mkdir(parents=True, exist_ok=True)
             
             output_path = os.path.join(output_dir, f"test-david5-{filename}")
@@ -2,7 +2,8 @@
 
 import csv
 import os
-from datetime import datetime
+
+from love_notes import note_filename, stable_note_ids
 
 def fix_csv_file(year):
     """
@@ -17,36 +18,21 @@ def fix_csv_file(year):
     
     print(f"🔧 Fixing {year} CSV file...")
     
-    rows = []
     with open(input_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for i, row in enumerate(reader, 1):
-            # Generate a proper ID based on the date and row number
-            date_str = row.get('date', '')
-            try:
-                if date_str:
-                    # Parse the date and create a timestamp-based ID
-                    date_obj = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                    timestamp = int(date_obj.timestamp())
-                    message_id = f"{timestamp}_{i:03d}"
-                else:
-                    message_id = f"{year}_{i:03d}"
-            except:
-                message_id = f"{year}_{i:03d}"
-            
-            # Create proper filename
-            filename = f"david-{year}-love-note-{message_id}.wav"
-            
-            # Update the row
-            row['id'] = message_id
-            row['filename'] = filename
-            
-            rows.append(row)
+        rows = list(csv.DictReader(f))
+    
+    # Stable IDs from the source message GUID (or date + text), so reordering
+    # or inserting rows doesn't rename other notes' audio
+    for row, message_id in zip(rows, stable_note_ids(year, rows)):
+        row['id'] = message_id
+        row['filename'] = note_filename(year, message_id)
     
     # Write the fixed CSV
     with open(output_file, 'w', encoding='utf-8', newline='') as f:
         fieldnames = ['id', 'text', 'date', 'emotion', 'filename']
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        if any(row.get('guid') for row in rows):
+            fieldnames.append('guid')
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
         writer.writeheader()
         writer.writerows(rows)
     
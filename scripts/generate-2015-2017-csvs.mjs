@@ -109,10 +109,10 @@ async function findMissingLongNotes(year) {
     console.log(`✅ Found ${scoredMessages.length} high-quality longer notes`)
     
     // Save to CSV
-    const csvHeader = 'id,text,date,emotion,filename,score,wordCount,emotionalKeywords,thoughtfulKeywords\n'
+    const csvHeader = 'id,text,date,emotion,filename,score,wordCount,emotionalKeywords,thoughtfulKeywords,guid\n'
     const csvRows = scoredMessages.map(msg => {
       const filename = `david-${year}-love-note-${msg.id}.wav`
-      return `"${msg.id}","${(msg.text || '').replace(/"/g, '""')}","${msg.readable_date}","love","${filename}","${msg.score}","${msg.wordCount}","${msg.emotionalKeywords}","${msg.thoughtfulKeywords}"`
+      return `"${msg.id}","${(msg.text || '').replace(/"/g, '""')}","${msg.readable_date}","love","${filename}","${msg.score}","${msg.wordCount}","${msg.emotionalKeywords}","${msg.thoughtfulKeywords}","${msg.guid || ''}"`
     }).join('\n')
     
     const csvContent = csvHeader + csvRows
@@ -148,7 +148,7 @@ async function generateBalancedYearCSV(year) {
     
     const { data: messages, error } = await supabase
       .from('fulldata_set')
-      .select('message_id, readable_date, text, sender, is_from_me')
+      .select('message_id, guid, readable_date, text, sender, is_from_me')
       .eq('is_from_me', '1')
       .eq('recipient', 'Nitzan')
       .gte('readable_date', startDate)
@@ -179,12 +179,12 @@ async function generateBalancedYearCSV(year) {
     console.log(`🎯 Found ${scoredMessages.length} BALANCED love notes (score >= 5)`)
 
     // Generate CSV content
-    const csvHeader = 'id,text,date,emotion,filename\n'
+    const csvHeader = 'id,text,date,emotion,filename,guid\n'
     const csvRows = scoredMessages.map(msg => {
       const date = new Date(msg.readable_date)
       const filename = `david-${year}-love-note-${msg.message_id}.wav`
       
-      return `"${msg.message_id}","${msg.text.replace(/"/g, '""')}","${msg.readable_date}","${msg.emotion}","${filename}"`
+      return `"${msg.message_id}","${msg.text.replace(/"/g, '""')}","${msg.readable_date}","${msg.emotion}","${filename}","${msg.guid || ''}"`
     }).join('\n')
 
     const csvContent = csvHeader + csvRows
@@ -2,86 +2,66 @@
 
 import os
 import csv
+import argparse
 import sys
 import time
-import json
 from pathlib import Path
-from hume import HumeClient
-from hume.tts.types import PostedUtterance, PostedUtteranceVoiceWithId, FormatWav
+from voice_registry import DEFAULT_VOICE, get_client, resolve_voice
+from audio_io import is_complete_audio, load_audio_metadata, save_generated_audio
+from tts_telemetry import Telemetry
+from audio_manifest import record_generated_note
+from love_notes import find_year_csvs, load_year_rows
+from tts_text import get_tts_text, prepare_all_notes, print_report
+from generation_plan import add_plan_arguments, run_plan
+from profiling import add_profile_arguments, stage, start_profiling
+from tts_retry import (
+    AttemptTimer, CircuitOpenError, DeadLetters, RetryError, RetryPolicy, call_with_retry,
+    get_circuit_breaker, print_retry, DEAD_LETTER_FILE,
+)
 
-def validate_text_content(text, filename):
+def retry_audio_generation(client, utterance, policy=None, timer=None):
     """
-    Validate that text content is complete and not truncated
+    Generate audio under the shared retry policy and circuit breaker.
+    Returns (audio_data, None, attempts) on success or (None, RetryError, attempts)
+    on failure; CircuitOpenError propagates so the caller can stop the run.
+    `timer` (an AttemptTimer) gets each attempt's latency and the backoff.
     """
-    if not text or len(text.strip()) == 0:
-        return False, "Empty text"
-    
-    # Check for common truncation indicators
-    truncation_indicators = [
-        "...",
-        "…",
-        "etc.",
-        "etc",
-        "and so on",
-        "and more",
-        "[truncated]",
-        "[...]"
-    ]
-    
-    text_lower = text.lower()
-    for indicator in truncation_indicators:
-        if text_lower.endswith(indicator):
-            return False, f"Text appears truncated with '{indicator}'"
-    
-    # Check for reasonable text length (should be at least 10 words)
-    word_count = len(text.split())
-    if word_count < 10:
-        return False, f"Text too short ({word_count} words)"
-    
-    # Check for reasonable character length (should be at least 50 characters)
-    if len(text) < 50:
-        return False, f"Text too short ({len(text)} characters)"
-    
-    return True, "Valid text"
+    from hume.tts.types import FormatWav
 
-def retry_audio_generation(client, utterance, max_retries=3):
-    """
-    Retry audio generation with exponential backoff
-    """
-    for attempt in range(max_retries):
-        try:
-            audio_data = client.tts.synthesize_json(
+    timer = timer or AttemptTimer()
+    try:
+        audio_data, attempts = call_with_retry(
+            timer.wrap(lambda: client.tts.synthesize_json(
                 utterances=[utterance],
                 format=FormatWav()
-            )
-            return audio_data, None
-        except Exception as e:
-            if attempt == max_retries - 1:
-                return None, str(e)
-            print(f"   ⚠️  Attempt {attempt + 1} failed, retrying in {2**attempt}s...")
-            time.sleep(2**attempt)
-    
-    return None, "Max retries exceeded"
+            )),
+            policy=policy,
+            on_retry=timer.on_retry
+        )
+        return audio_data, None, attempts
+    except RetryError as e:
+        return None, e, e.attempts
 
-def generate_year_audio(csv_file, output_dir, voice_id="e61bbb66-9084-40b7-a4dc-ddd0c62592c9"):
+def generate_year_audio(csv_file, output_dir, voice_id=DEFAULT_VOICE, telemetry=None, text_cache=None):
     """
     Generate audio files for a specific year's CSV with comprehensive error handling
     """
+    # The SDK is only needed once we actually generate, not for --plan
+    from hume.tts.types import PostedUtterance, PostedUtteranceVoiceWithId
+
     print(f"🎵 Generating audio for: {csv_file}")
     print(f"📁 Output directory: {output_dir}")
     print(f"🎤 Using voice ID: {voice_id}")
     print("")
     
     # Initialize Hume client
-    api_key = os.getenv('HUME_API_KEY', '5sMy54ZASUGzlDJv8f2nOIliS5AqEJmYyhECrA6VqiwZVIFx')
-    client = HumeClient(api_key=api_key)
+    client = get_client()
     
     # Create output directory
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     
-    # Create error log file
-    error_log_file = f"data/audio-generation-errors-{os.path.basename(csv_file).replace('.csv', '')}.json"
-    errors = []
+    # Permanently failed notes go to the shared dead-letter file, once per note
+    dead_letters = DeadLetters()
     
     # Read CSV file
     with open(csv_file, 'r', encoding='utf-8') as f:
@@ -92,35 +72,50 @@ def generate_year_audio(csv_file, output_dir, voice_id="e61bbb66-9084-40b7-a4dc-
     print("")
     
     # Configure voice
-    voice = PostedUtteranceVoiceWithId(id=voice_id)
+    voice = PostedUtteranceVoiceWithId(id=resolve_voice(voice_id, client))
+    policy = RetryPolicy()
+    metadata = load_audio_metadata()
     
     success_count = 0
+    skipped_count = 0
     error_count = 0
     validation_errors = 0
     
+    def dead_letter(i, filename, text, row, error, category, attempts=0):
+        dead_letters.add({
+            "csv_file": csv_file,
+            "filename": filename,
+            "row": i + 1,
+            "error": error,
+            "category": category,
+            "attempts": attempts,
+            "text_length": len(text),
+            "word_count": len(text.split()),
+            "date": row.get('date', 'Unknown')
+        })
+    
     for i, row in enumerate(rows):
         text = row.get('text', '').strip()
         filename = row.get('filename', f'audio-{i+1}.wav')
         
+        # Skip notes that already have intact audio (same rule as the --plan estimate)
+        if is_complete_audio(os.path.join(output_dir, filename), metadata.get(filename)):
+            skipped_count += 1
+            dead_letters.resolve(filename)
+            continue
+        
         print(f"🎤 Processing {i+1}/{len(rows)}: {filename}")
         print(f"   📊 Text length: {len(text)} characters, {len(text.split())} words")
         print(f"   📅 Date: {row.get('date', 'Unknown')}")
         print(f"   📝 Preview: {text[:80]}...")
         
-        # Validate text content
-        is_valid, validation_message = validate_text_content(text, filename)
+        # Validate and normalize text content (cached by the pre-pass)
+        text, is_valid, validation_message = get_tts_text(text, text_cache if text_cache is not None else {})
         if not is_valid:
             print(f"   ❌ Validation failed: {validation_message}")
             error_count += 1
             validation_errors += 1
-            errors.append({
-                "filename": filename,
-                "row": i + 1,
-                "error": f"Validation failed: {validation_message}",
-                "text_length": len(text),
-                "word_count": len(text.split()),
-                "date": row.get('date', 'Unknown')
-            })
+            dead_letter(i, filename, text, row, f"Validation failed: {validation_message}", "validation")
             continue
         
         try:
@@ -130,61 +125,58 @@ def generate_year_audio(csv_file, output_dir, voice_id="e61bbb66-9084-40b7-a4dc-
                 voice=voice
             )
             
-            audio_data, error = retry_audio_generation(client, utterance)
+            timer = AttemptTimer(on_retry=print_retry)
+            with stage("network"):
+                audio_data, error, attempts = retry_audio_generation(client, utterance, policy, timer)
             
             if error:
+                if telemetry:
+                    telemetry.record(filename, "failed", latency=timer.latency, chars=len(text),
+                                     retries=attempts - 1, backoff_seconds=timer.backoff, error=error.category)
                 print(f"   ❌ Audio generation failed: {error}")
                 error_count += 1
-                errors.append({
-                    "filename": filename,
-                    "row": i + 1,
-                    "error": f"Audio generation failed: {error}",
-                    "text_length": len(text),
-                    "word_count": len(text.split()),
-                    "date": row.get('date', 'Unknown')
-                })
+                dead_letter(i, filename, text, row, f"Audio generation failed: {error.last_error}",
+                            error.category, error.attempts)
                 continue
             
             # Save audio file
-            output_path = os.path.join(output_dir, filename)
             import base64
             audio_bytes = base64.b64decode(audio_data.generations[0].audio)
             
-            # Verify audio file was created successfully
-            with open(output_path, 'wb') as f:
-                f.write(audio_bytes)
-            
-            # Verify file exists and has content
-            if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
-                raise Exception("Audio file was not created or is empty")
+            # Written atomically; raises if the payload is not a valid WAV
+            with stage("disk_write"):
+                saved = save_generated_audio(output_dir, filename, audio_bytes, audio_data.generations[0].duration)
+                record_generated_note(row, filename, saved)
+            if telemetry:
+                telemetry.record(filename, "ok", latency=timer.latency, chars=len(text),
+                                 audio_seconds=audio_data.generations[0].duration,
+                                 retries=attempts - 1, backoff_seconds=timer.backoff,
+                                 bytes_written=len(audio_bytes))
             
             print(f"   ✅ Generated: {filename} ({audio_data.generations[0].duration:.2f}s)")
             success_count += 1
+            dead_letters.resolve(filename)
             
             # Add a small delay to avoid rate limiting
             time.sleep(0.1)
             
+        except CircuitOpenError as e:
+            print(f"   🔌 {e} - stopping this run, remaining notes are left for the next one")
+            break
         except Exception as e:
             print(f"   ❌ Error: {e}")
             error_count += 1
-            errors.append({
-                "filename": filename,
-                "row": i + 1,
-                "error": str(e),
-                "text_length": len(text),
-                "word_count": len(text.split()),
-                "date": row.get('date', 'Unknown')
-            })
+            dead_letter(i, filename, text, row, str(e), "permanent")
     
-    # Save error log
-    if errors:
-        with open(error_log_file, 'w') as f:
-            json.dump(errors, f, indent=2)
-        print(f"📝 Error log saved to: {error_log_file}")
+    if dead_letters.added:
+        print(f"📝 {dead_letters.added} failed notes added to: {DEAD_LETTER_FILE}")
+    if dead_letters.resolved:
+        print(f"🩹 {dead_letters.resolved} dead-lettered notes resolved")
     
     print(f"")
     print(f"🎉 {csv_file} Audio generation complete!")
     print(f"✅ Successfully generated: {success_count} files")
+    print(f"⏭️  Already generated: {skipped_count} files")
     print(f"❌ Errors: {error_count} files")
     print(f"🔍 Validation errors: {validation_errors} files")
     print(f"📁 Output directory: {output_dir}")
@@ -193,29 +185,40 @@ def generate_year_audio(csv_file, output_dir, voice_id="e61bbb66-9084-40b7-a4dc-
     return success_count, error_count
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate love-note audio for all years")
+    parser.add_argument("--prometheus", help="Write run metrics in Prometheus text-file format to this path")
+    parser.add_argument("--plan", action="store_true", help="Only estimate cost, API calls and wall-clock time")
+    parser.add_argument("--voice", default=DEFAULT_VOICE, help=f"Voice name or ID (default: {DEFAULT_VOICE})")
+    add_plan_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.plan:
+        run_plan(args)
+        return
+    
+    start_profiling(args, "generate-all-years")
     print("🎵 Complete Love Notes Audio Generator")
     print("=" * 60)
     print("📅 Generating audio for all years: 2022-2024, then 2015-2021")
     print("🔍 Includes comprehensive error correction and validation")
     print("")
     
-    # Define the years and their CSV files in priority order
+    # Find the year CSVs in priority order (2022-2024 first, then 2015-2021)
     years_priority = [
-        # Priority 1: Recent years (2022-2024)
-        ("2022", "data/2022-david-love-notes-for-audio.csv", 78),
-        ("2023", "data/2023-david-love-notes-for-audio.csv", 77),
-        ("2024", "data/2024-david-love-notes-for-audio.csv", 40),
-        # Priority 2: Earlier years (2015-2021)
-        ("2015", "data/2015-david-love-notes-for-audio.csv", 172),
-        ("2016", "data/2016-david-love-notes-for-audio.csv", 104),
-        ("2017", "data/2017-david-love-notes-for-audio.csv", 19),
-        ("2018", "data/2018-david-love-notes-for-audio.csv", 29),
-        ("2019", "data/2019-david-love-notes-for-audio.csv", 33),
-        ("2020", "data/2020-david-love-notes-for-audio.csv", 44),
-        ("2021", "data/2021-david-love-notes-for-audio.csv", 40),
+        (str(year), csv_file, len(load_year_rows(csv_file)))
+        for year, csv_file in find_year_csvs()
     ]
     
     output_dir = "public/audio/love-notes"
+    telemetry = Telemetry("generate-all-years")
+    
+    # Validate and normalize every note up front, before any API spend
+    print("🧹 Preparing text for all years...")
+    with stage("text_prepare"):
+        text_cache, text_report = prepare_all_notes()
+    print_report(text_report)
+    print("")
     total_success = 0
     total_errors = 0
     
@@ -233,16 +236,22 @@ def main():
         print(f"🚀 Starting {year} ({expected_count} love notes)...")
         print("=" * 50)
         
-        success_count, error_count = generate_year_audio(csv_file, output_dir)
+        success_count, error_count = generate_year_audio(csv_file, output_dir, voice_id=args.voice, telemetry=telemetry, text_cache=text_cache)
         total_success += success_count
         total_errors += error_count
         
         print(f"✅ {year} complete: {success_count}/{expected_count} files generated")
         print("")
         
+        if get_circuit_breaker().state == get_circuit_breaker().OPEN:
+            print("🔌 Circuit breaker is open, skipping the remaining years")
+            break
+        
         # Add a longer delay between years to be safe
         time.sleep(1)
     
+    telemetry.finish(args.prometheus)
+    print("")
     print("🎉 ALL YEARS COMPLETE!")
     print("=" * 60)
     print(f"📊 Total Summary:")
@@ -252,7 +261,7 @@ def main():
     print("")
     print("🎯 Next steps:")
     print("1. Check the audio quality in the output directory")
-    print("2. Review error logs in data/audio-generation-errors-*.json")
+    print(f"2. Review failed notes in {DEAD_LETTER_FILE} (retry with scripts/retry-failed-audio.py)")
     print("3. Use the audio files in your application")
     print("4. Consider creating a web interface to browse and play the audio")
 
@@ -4,10 +4,14 @@ import os
 import csv
 import sys
 from pathlib import Path
-from hume import HumeClient
 from hume.tts.types import PostedUtterance, PostedUtteranceVoiceWithId, FormatWav
+from voice_registry import DEFAULT_VOICE, get_client, resolve_voice
+from audio_io import save_generated_audio
+from audio_manifest import record_generated_note
+from tts_text import get_tts_text, load_text_cache
+from tts_retry import CircuitOpenError, DeadLetters, RetryError, call_with_retry, print_retry
 
-def generate_audio_from_csv(csv_file, output_dir, voice_id="e61bbb66-9084-40b7-a4dc-ddd0c62592c9"):
+def generate_audio_from_csv(csv_file, output_dir, voice_id=DEFAULT_VOICE):
     """
     Generate audio files from CSV using Hume TTS
     """
@@ -17,8 +21,9 @@ def generate_audio_from_csv(csv_file, output_dir, voice_id="e61bbb66-9084-40b7-a
     print("")
     
     # Initialize Hume client
-    api_key = os.getenv('HUME_API_KEY', '5sMy54ZASUGzlDJv8f2nOIliS5AqEJmYyhECrA6VqiwZVIFx')
-    client = HumeClient(api_key=api_key)
+    client = get_client()
+    text_cache = load_text_cache()
+    dead_letters = DeadLetters()
     
     # Create output directory
     Path(output_dir).mkdir(parents=True, exist_ok=True)
@@ -33,7 +38,7 @@ def generate_audio_from_csv(csv_file, output_dir, voice_id="e61bbb66-9084-40b7-a
     
     # Configure voice
     voice = PostedUtteranceVoiceWithId(
-        id=voice_id
+        id=resolve_voice(voice_id, client)
     )
     
     success_count = 0
@@ -47,6 +52,12 @@ def generate_audio_from_csv(csv_file, output_dir, voice_id="e61bbb66-9084-40b7-a
             print(f"⚠️  Skipping row {i+1}: empty text")
             continue
         
+        # Send the same normalized text as generate-all-years-audio.py
+        text, is_valid, reason = get_tts_text(text, text_cache)
+        if not is_valid:
+            print(f"⚠️  Skipping {filename}: {reason}")
+            continue
+        
         print(f"🎤 Generating audio {i+1}/{len(rows)}: {filename}")
         print(f"   Text: {text[:100]}{'...' if len(text) > 100 else ''}")
         
@@ -57,25 +68,43 @@ def generate_audio_from_csv(csv_file, output_dir, voice_id="e61bbb66-9084-40b7-a
                 voice=voice
             )
             
-            audio_data = client.tts.synthesize_json(
-                utterances=[utterance],
-                format=FormatWav()
+            # Retried under the shared policy and circuit breaker
+            audio_data, _ = call_with_retry(
+                lambda: client.tts.synthesize_json(
+                    utterances=[utterance],
+                    format=FormatWav()
+                ),
+                on_retry=print_retry
             )
             
             # Save audio file
-            output_path = os.path.join(output_dir, filename)
             import base64
             audio_bytes = base64.b64decode(audio_data.generations[0].audio)
-            with open(output_path, 'wb') as f:
-                f.write(audio_bytes)
+            saved = save_generated_audio(output_dir, filename, audio_bytes, audio_data.generations[0].duration)
+            record_generated_note(row, filename, saved)
             
             print(f"   ✅ Generated: {filename} ({audio_data.generations[0].duration:.2f}s)")
             success_count += 1
+            dead_letters.resolve(filename)
             
             # Add a small delay to avoid rate limiting
             import time
             time.sleep(0.1)
             
+        except CircuitOpenError as e:
+            print(f"   🔌 {e} - stopping this run, remaining notes are left for the next one")
+            break
+        except RetryError as e:
+            print(f"   ❌ Failed ({e.category}) after {e.attempts} attempts: {e.last_error}")
+            error_count += 1
+            dead_letters.add({
+                "csv_file": csv_file,
+                "filename": filename,
+                "error": f"Audio generation failed: {e.last_error}",
+                "category": e.category,
+                "attempts": e.attempts,
+                "date": row.get('date', 'Unknown')
+            })
         except Exception as e:
             print(f"   ❌ Error: {e}")
             error_count += 1
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Dry-run planner for love-note audio generation.
+
+Reads every year CSV, validates and normalizes each note through the TTS
+text cache, subtracts notes whose audio is already generated, and reports the
+characters, estimated audio seconds, API requests, cost and projected
+wall-clock time of the remaining work - without calling the API.
+
+Audio length and request latency are calibrated from previous runs
+(data/audio-metadata.json and the latest telemetry summary) when available.
+
+Usage: python3 scripts/generation_plan.py [--concurrency N] [--rpm N] [--json FILE]
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+
+from audio_io import AUDIO_METADATA_FILE, is_complete_audio, load_audio_metadata
+from love_notes import AUDIO_DIR, DATA_DIR, find_year_csvs, load_year_rows, row_filename
+from tts_telemetry import TELEMETRY_DIR, estimate_cost
+from tts_text import get_tts_text, load_text_cache
+
+# Fallbacks when there is no history to calibrate from
+DEFAULT_CHARS_PER_AUDIO_SECOND = 14.0
+DEFAULT_REQUEST_LATENCY = 3.0
+
+
+def calibrate_speaking_rate(year_rows, metadata, text_cache):
+    """
+    Characters of text per second of generated audio, measured from notes
+    that already have recorded durations
+    """
+    chars = 0
+    seconds = 0.0
+    for rows in year_rows.values():
+        for i, row in enumerate(rows):
+            entry = metadata.get(row_filename(row, i))
+            if entry and entry.get("duration"):
+                chars += len(get_tts_text(row.get("text", ""), text_cache)[0])
+                seconds += entry["duration"]
+    if seconds > 0 and chars > 0:
+        return chars / seconds, "measured"
+    return DEFAULT_CHARS_PER_AUDIO_SECOND, "default"
+
+
+def calibrate_latency(telemetry_dir=TELEMETRY_DIR):
+    """Mean request latency from the most recent telemetry summary"""
+    summaries = sorted(glob.glob(os.path.join(telemetry_dir, "*-summary.json")), key=os.path.getmtime)
+    for path in reversed(summaries):
+        with open(path, "r", encoding="utf-8") as f:
+            summary = json.load(f)
+        if summary.get("succeeded"):
+            return summary["latency"]["sum"] / summary["succeeded"], "measured"
+    return DEFAULT_REQUEST_LATENCY, "default"
+
+
+def build_plan(data_dir=DATA_DIR, audio_dir=AUDIO_DIR, metadata_file=AUDIO_METADATA_FILE,
+               concurrency=1, requests_per_minute=None):
+    """
+    Build the generation plan. Returns a dict with per-year and total figures.
+    """
+    metadata = load_audio_metadata(metadata_file)
+    text_cache = load_text_cache()
+    year_csvs = find_year_csvs(data_dir)
+    year_rows = {year: load_year_rows(csv_file) for year, csv_file in year_csvs}
+
+    chars_per_second, rate_source = calibrate_speaking_rate(year_rows, metadata, text_cache)
+    latency, latency_source = calibrate_latency()
+
+    years = []
+    for year, csv_file in year_csvs:
+        rows = year_rows[year]
+        stats = {
+            "year": year,
+            "csv_file": csv_file,
+            "notes": len(rows),
+            "generated": 0,
+            "invalid": 0,
+            "pending": 0,
+            "chars": 0,
+            "invalid_notes": [],
+        }
+        for i, row in enumerate(rows):
+            filename = row_filename(row, i)
+            text = row.get("text", "").strip()
+            if is_complete_audio(os.path.join(audio_dir, filename), metadata.get(filename)):
+                stats["generated"] += 1
+                continue
+            text, is_valid, message = get_tts_text(text, text_cache)
+            if not is_valid:
+                stats["invalid"] += 1
+                stats["invalid_notes"].append({"filename": filename, "row": i + 1, "error": message})
+                continue
+            stats["pending"] += 1
+            stats["chars"] += len(text)
+        stats["audio_seconds"] = round(stats["chars"] / chars_per_second, 1)
+        stats["estimated_cost"] = round(estimate_cost(stats["chars"]), 2)
+        years.append(stats)
+
+    requests = sum(y["pending"] for y in years)
+    chars = sum(y["chars"] for y in years)
+    concurrency = max(1, concurrency)
+
+    # Each worker handles its share of requests back to back; a requests/minute
+    # quota puts a floor under the total regardless of concurrency
+    wall_seconds = math.ceil(requests / concurrency) * latency
+    if requests_per_minute:
+        wall_seconds = max(wall_seconds, requests / requests_per_minute * 60.0)
+
+    return {
+        "years": years,
+        "totals": {
+            "notes": sum(y["notes"] for y in years),
+            "generated": sum(y["generated"] for y in years),
+            "invalid": sum(y["invalid"] for y in years),
+            "requests": requests,
+            "chars": chars,
+            "audio_seconds": round(chars / chars_per_second, 1),
+            "estimated_cost": round(estimate_cost(chars), 2),
+            "wall_seconds": round(wall_seconds, 1),
+        },
+        "assumptions": {
+            "concurrency": concurrency,
+            "requests_per_minute": requests_per_minute,
+            "chars_per_audio_second": round(chars_per_second, 2),
+            "chars_per_audio_second_source": rate_source,
+            "request_latency": round(latency, 2),
+            "request_latency_source": latency_source,
+        },
+    }
+
+
+def format_duration(seconds):
+    """Human-readable duration"""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    if minutes:
+        return f"{minutes}m {secs:02d}s"
+    return f"{secs}s"
+
+
+def print_plan(plan):
+    """Print the plan in the generators' log style"""
+    print("📋 Generation Plan (dry run - no API calls)")
+    print("=" * 60)
+    print(f"{'Year':<6}{'Notes':>7}{'Done':>7}{'Invalid':>9}{'To do':>7}{'Chars':>9}{'Audio':>10}{'Cost':>9}")
+    for y in plan["years"]:
+        print(f"{y['year']:<6}{y['notes']:>7}{y['generated']:>7}{y['invalid']:>9}{y['pending']:>7}"
+              f"{y['chars']:>9}{format_duration(y['audio_seconds']):>10}{'$%.2f' % y['estimated_cost']:>9}")
+
+    totals = plan["totals"]
+    assumptions = plan["assumptions"]
+    print("-" * 60)
+    print(f"📝 Notes: {totals['notes']} total, {totals['generated']} already generated, {totals['invalid']} invalid")
+    print(f"🎤 API requests: {totals['requests']}")
+    print(f"🔤 Characters: {totals['chars']}")
+    print(f"⏱️  Estimated audio: {format_duration(totals['audio_seconds'])} "
+          f"(at {assumptions['chars_per_audio_second']} chars/s, {assumptions['chars_per_audio_second_source']})")
+    print(f"💰 Estimated cost: ${totals['estimated_cost']:.2f}")
+    quota = f", {assumptions['requests_per_minute']} req/min" if assumptions["requests_per_minute"] else ""
+    print(f"🕐 Projected wall-clock: {format_duration(totals['wall_seconds'])} "
+          f"(concurrency {assumptions['concurrency']}{quota}, "
+          f"{assumptions['request_latency']}s/request {assumptions['request_latency_source']})")
+
+    invalid = [(y["year"], n) for y in plan["years"] for n in y["invalid_notes"]]
+    if invalid:
+        print("")
+        print("🔍 Invalid notes (fix the CSV before generating):")
+        for year, note in invalid:
+            print(f"   {year} row {note['row']}: {note['filename']} - {note['error']}")
+
+
+def add_plan_arguments(parser):
+    """Planner options shared with generate-all-years-audio.py --plan"""
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent requests to project wall-clock time for")
+    parser.add_argument("--rpm", type=int, help="API quota in requests per minute")
+    parser.add_argument("--json", dest="json_file", help="Also write the plan as JSON to this file")
+
+
+def run_plan(args):
+    """Build, print and optionally save a plan from parsed arguments"""
+    plan = build_plan(concurrency=args.concurrency, requests_per_minute=args.rpm)
+    print_plan(plan)
+    if args.json_file:
+        with open(args.json_file, "w", encoding="utf-8") as f:
+            json.dump(plan, f, indent=2)
+        print(f"💾 Plan saved to: {args.json_file}")
+    return plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate the cost and duration of love-note audio generation")
+    add_plan_arguments(parser)
+    run_plan(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,14 @@
 #!/usr/bin/env python3
 
-import os
-import pickle
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
+import sys
 
-# DELETE any existing token file first
-token_file = 'data/google-photos-token.pickle'
-if os.path.exists(token_file):
-    os.remove(token_file)
-    print("Deleted old token")
+from google_photos_sync import TOKEN_FILE, load_credentials
 
-# Explicitly define the scopes you need
-SCOPES = ['https://www.googleapis.com/auth/photoslibrary.readonly']
+# Reuse (and refresh) the stored token; --force signs in again from scratch
+creds = load_credentials(force="--force" in sys.argv)
 
-# Force new authentication
-flow = InstalledAppFlow.from_client_secrets_file(
-    'data/google-credentials.json', 
-    SCOPES
-)
-
-# This will open browser for fresh authentication
-creds = flow.run_local_server(port=0)
-
-# Save the new token
-with open(token_file, 'wb') as token:
-    pickle.dump(creds, token)
-
-print("New token created with scopes:", creds.scopes)
-print(f"Token saved to: {token_file}")
+print("Token scopes:", creds.scopes)
+print(f"Token saved to: {TOKEN_FILE}")
 
 # Test the token with direct HTTP requests
 import requests
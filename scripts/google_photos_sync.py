@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Incremental Google Photos metadata sync into a local SQLite cache.
+
+Reuses the stored OAuth token (refreshing it when it has expired) instead of
+a fresh browser login every run, pages through mediaItems:search with
+pageToken, and only asks for items created since the last sync. Date ranges
+are fetched concurrently over one pooled HTTP session. Thumbnails are
+downloaded concurrently into public/photos/google-thumbs, because media
+baseUrls expire after about an hour.
+
+After each sync, data/google-photos-results.json is rewritten from the cache
+(date -> media items) so app/api/google-photos serves the local index
+without calling the API per request.
+
+To run against a stub server instead of Google:
+    GOOGLE_PHOTOS_API_BASE=http://localhost:8765/v1 GOOGLE_PHOTOS_ACCESS_TOKEN=test \\
+        python3 scripts/google_photos_sync.py
+
+Usage: python3 scripts/google_photos_sync.py [--since 2015-01-01] [--full] [--workers 8] [--no-thumbnails]
+"""
+
+import argparse
+import os
+import pickle
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta, timezone
+
+import requests
+from google.auth.transport.requests import Request
+from google_auth_oauthlib.flow import InstalledAppFlow
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from audio_io import atomic_write_bytes, atomic_write_json
+
+API_BASE = os.getenv("GOOGLE_PHOTOS_API_BASE", "https://photoslibrary.googleapis.com/v1")
+SCOPES = ["https://www.googleapis.com/auth/photoslibrary.readonly"]
+CREDENTIALS_FILE = "data/google-credentials.json"
+TOKEN_FILE = "data/google-photos-token.pickle"
+
+DB_FILE = "data/google-photos.db"
+RESULTS_FILE = "data/google-photos-results.json"
+THUMBNAIL_DIR = "public/photos/google-thumbs"
+THUMBNAIL_URL = "/photos/google-thumbs"
+THUMBNAIL_SIZE = "=w400-h300-c"
+
+PAGE_SIZE = 100  # API maximum for mediaItems:search
+BATCH_GET_SIZE = 50  # API maximum for mediaItems:batchGet
+# baseUrls are valid for 60 minutes; refresh them a little before that
+BASE_URL_TTL = 50 * 60
+DEFAULT_SINCE = "2015-01-01"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS media_items (
+    id TEXT PRIMARY KEY,
+    filename TEXT,
+    mime_type TEXT,
+    creation_time TEXT,
+    date TEXT,
+    width INTEGER,
+    height INTEGER,
+    product_url TEXT,
+    base_url TEXT,
+    base_url_fetched_at REAL,
+    thumbnail TEXT,
+    synced_at TEXT
+);
+CREATE INDEX IF NOT EXISTS media_items_date ON media_items (date);
+CREATE INDEX IF NOT EXISTS media_items_creation_time ON media_items (creation_time);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def load_credentials(token_file=TOKEN_FILE, credentials_file=CREDENTIALS_FILE, force=False):
+    """
+    Stored credentials, refreshed if expired. Only falls back to a browser
+    login when there is no usable token (or `force` is set).
+    """
+    creds = None
+    if not force and os.path.exists(token_file):
+        with open(token_file, "rb") as f:
+            creds = pickle.load(f)
+
+    if creds and creds.expired and creds.refresh_token:
+        try:
+            creds.refresh(Request())
+            print("🔄 Refreshed Google Photos access token")
+        except Exception as e:
+            print(f"⚠️  Token refresh failed ({e}), signing in again")
+            creds = None
+
+    if not creds or not creds.valid:
+        flow = InstalledAppFlow.from_client_secrets_file(credentials_file, SCOPES)
+        creds = flow.run_local_server(port=0)
+
+    atomic_write_bytes(token_file, pickle.dumps(creds))
+    return creds
+
+
+def get_access_token():
+    """Access token from GOOGLE_PHOTOS_ACCESS_TOKEN (stub servers), else OAuth"""
+    return os.getenv("GOOGLE_PHOTOS_ACCESS_TOKEN") or load_credentials().token
+
+
+def create_session(access_token, pool_size=16):
+    """
+    One pooled session shared by every worker thread. 429s and 5xx are
+    retried with backoff, honouring Retry-After.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=5,
+        backoff_factor=1.0,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=None,  # searches are POSTs but read-only
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"})
+    return session
+
+
+def open_db(db_file=DB_FILE):
+    """Open (and create) the metadata cache"""
+    os.makedirs(os.path.dirname(db_file) or ".", exist_ok=True)
+    db = sqlite3.connect(db_file)
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript(SCHEMA)
+    return db
+
+
+def get_state(db, key, default=None):
+    row = db.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+    return row["value"] if row else default
+
+
+def set_state(db, key, value):
+    db.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
+
+
+def api_date(d):
+    return {"year": d.year, "month": d.month, "day": d.day}
+
+
+def search_range(session, start, end, page_size=PAGE_SIZE, api_base=API_BASE):
+    """
+    Every media item created between `start` and `end` (dates, inclusive),
+    following pageToken until the last page
+    """
+    body = {
+        "pageSize": page_size,
+        "filters": {"dateFilter": {"ranges": [{"startDate": api_date(start), "endDate": api_date(end)}]}},
+    }
+    items = []
+    while True:
+        response = session.post(f"{api_base}/mediaItems:search", json=body, timeout=60)
+        response.raise_for_status()
+        data = response.json()
+        items.extend(data.get("mediaItems", []))
+        if not data.get("nextPageToken"):
+            return items
+        body["pageToken"] = data["nextPageToken"]
+
+
+def split_range(start, end):
+    """Split a date range into calendar-year chunks that can be fetched concurrently"""
+    chunks = []
+    while start <= end:
+        chunk_end = min(end, date(start.year, 12, 31))
+        chunks.append((start, chunk_end))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def item_row(item, fetched_at, synced_at):
+    """Row values for a media item from the API"""
+    metadata = item.get("mediaMetadata", {})
+    creation_time = metadata.get("creationTime")
+    return (
+        item["id"],
+        item.get("filename"),
+        item.get("mimeType"),
+        creation_time,
+        creation_time[:10] if creation_time else None,
+        int(metadata["width"]) if metadata.get("width") else None,
+        int(metadata["height"]) if metadata.get("height") else None,
+        item.get("productUrl"),
+        item.get("baseUrl"),
+        fetched_at,
+        synced_at,
+    )
+
+
+def upsert_items(db, items, fetched_at):
+    """Insert or update items; a known item keeps its downloaded thumbnail"""
+    synced_at = datetime.now().isoformat()
+    db.executemany(
+        """
+        INSERT INTO media_items (id, filename, mime_type, creation_time, date, width, height, product_url,
+                                 base_url, base_url_fetched_at, synced_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (id) DO UPDATE SET
+            filename = excluded.filename, mime_type = excluded.mime_type,
+            creation_time = excluded.creation_time, date = excluded.date,
+            width = excluded.width, height = excluded.height, product_url = excluded.product_url,
+            base_url = excluded.base_url, base_url_fetched_at = excluded.base_url_fetched_at,
+            synced_at = excluded.synced_at
+        """,
+        [item_row(item, fetched_at, synced_at) for item in items],
+    )
+
+
+def sync_metadata(db, session, since, until, workers=8, api_base=API_BASE):
+    """
+    Fetch and store every item created between `since` and `until`, one
+    concurrent search per year. Returns the number of items fetched.
+    """
+    total = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(search_range, session, start, end, api_base=api_base): (start, end)
+                   for start, end in split_range(since, until)}
+        for future in as_completed(futures):
+            start, end = futures[future]
+            items = future.result()
+            # Only this thread touches the database
+            upsert_items(db, items, time.time())
+            db.commit()
+            total += len(items)
+            print(f"   📅 {start} → {end}: {len(items)} items")
+    return total
+
+
+def refresh_base_urls(db, session, ids, api_base=API_BASE):
+    """Fetch fresh baseUrls for items whose stored ones have expired"""
+    for i in range(0, len(ids), BATCH_GET_SIZE):
+        batch = ids[i:i + BATCH_GET_SIZE]
+        response = session.get(f"{api_base}/mediaItems:batchGet", params={"mediaItemIds": batch}, timeout=60)
+        response.raise_for_status()
+        items = [r["mediaItem"] for r in response.json().get("mediaItemResults", []) if "mediaItem" in r]
+        upsert_items(db, items, time.time())
+    db.commit()
+
+
+def download_thumbnail(session, item_id, base_url, thumbnail_dir=THUMBNAIL_DIR):
+    """Download one thumbnail. Runs in a worker thread."""
+    response = session.get(base_url + THUMBNAIL_SIZE, timeout=60)
+    response.raise_for_status()
+    atomic_write_bytes(os.path.join(thumbnail_dir, f"{item_id}.jpg"), response.content)
+    return f"{THUMBNAIL_URL}/{item_id}.jpg"
+
+
+def sync_thumbnails(db, session, workers=8, thumbnail_dir=THUMBNAIL_DIR, api_base=API_BASE):
+    """
+    Download thumbnails for images that don't have one yet, refreshing
+    expired baseUrls in batches first. Returns (downloaded, failed).
+    """
+    missing = db.execute(
+        "SELECT id, base_url_fetched_at FROM media_items WHERE thumbnail IS NULL AND mime_type LIKE 'image/%'"
+    ).fetchall()
+    stale = [row["id"] for row in missing if time.time() - (row["base_url_fetched_at"] or 0) > BASE_URL_TTL]
+    if stale:
+        print(f"🔗 Refreshing {len(stale)} expired base URLs")
+        refresh_base_urls(db, session, stale, api_base)
+
+    pending = db.execute(
+        "SELECT id, base_url FROM media_items WHERE thumbnail IS NULL AND mime_type LIKE 'image/%' AND base_url IS NOT NULL"
+    ).fetchall()
+    downloaded = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(download_thumbnail, session, row["id"], row["base_url"], thumbnail_dir): row["id"]
+                   for row in pending}
+        for future in as_completed(futures):
+            item_id = futures[future]
+            try:
+                thumbnail = future.result()
+            except requests.RequestException as e:
+                print(f"   ❌ Thumbnail {item_id}: {e}")
+                failed += 1
+                continue
+            db.execute("UPDATE media_items SET thumbnail = ? WHERE id = ?", (thumbnail, item_id))
+            downloaded += 1
+    db.commit()
+    return downloaded, failed
+
+
+def export_results(db, results_file=RESULTS_FILE):
+    """
+    Write the cache as {date: [media item]} in the shape app/api/google-photos
+    reads. Returns the number of items.
+    """
+    results = {}
+    rows = db.execute("SELECT * FROM media_items WHERE date IS NOT NULL ORDER BY creation_time").fetchall()
+    for row in rows:
+        results.setdefault(row["date"], []).append({
+            "id": row["id"],
+            "filename": row["filename"],
+            "mimeType": row["mime_type"],
+            "creationTime": row["creation_time"],
+            "width": row["width"],
+            "height": row["height"],
+            "productUrl": row["product_url"],
+            "baseUrl": row["base_url"],
+            "thumbnail": row["thumbnail"],
+        })
+    atomic_write_json(results_file, results)
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally sync Google Photos metadata into a local SQLite cache")
+    parser.add_argument("--since", help=f"Sync items created on or after this date (default: last sync, else {DEFAULT_SINCE})")
+    parser.add_argument("--full", action="store_true", help=f"Ignore the last sync and resync from {DEFAULT_SINCE}")
+    parser.add_argument("--db", default=DB_FILE, help="SQLite cache file")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent requests")
+    parser.add_argument("--no-thumbnails", action="store_true", help="Skip thumbnail downloads")
+    args = parser.parse_args()
+
+    print("📸 Google Photos Sync")
+    print("=" * 50)
+
+    db = open_db(args.db)
+    last_sync = get_state(db, "synced_through")
+    if args.since:
+        since = date.fromisoformat(args.since)
+    elif last_sync and not args.full:
+        # Overlap by a day: the date filter has day granularity and timezones blur the edge
+        since = date.fromisoformat(last_sync) - timedelta(days=1)
+    else:
+        since = date.fromisoformat(DEFAULT_SINCE)
+    until = datetime.now(timezone.utc).date()
+    print(f"📅 Syncing {since} → {until}" + (f" (last sync: {last_sync})" if last_sync else ""))
+
+    try:
+        session = create_session(get_access_token(), pool_size=args.workers * 2)
+        fetched = sync_metadata(db, session, since, until, args.workers)
+        set_state(db, "synced_through", until.isoformat())
+        set_state(db, "last_sync_at", datetime.now().isoformat())
+        db.commit()
+        print(f"✅ {fetched} items fetched")
+
+        if not args.no_thumbnails:
+            downloaded, failed = sync_thumbnails(db, session, args.workers)
+            print(f"🖼️  Thumbnails: {downloaded} downloaded, {failed} failed")
+    except requests.RequestException as e:
+        print(f"❌ Google Photos API error: {e}")
+        sys.exit(1)
+
+    total = export_results(db)
+    print(f"💾 {total} items in {args.db}, exported to {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the per-year love-note CSVs
+(data/{year}-david-love-notes-for-audio.csv: id, text, date, emotion, filename,
+and optionally guid - the source message GUID).
+"""
+
+import csv
+import glob
+import hashlib
+import os
+import re
+from datetime import datetime
+
+DATA_DIR = "data"
+AUDIO_DIR = "public/audio/love-notes"
+CSV_PATTERN = "{year}-david-love-notes-for-audio.csv"
+
+# Generation order: recent years first, then the earlier ones
+PRIORITY_YEARS = [2022, 2023, 2024, 2015, 2016, 2017, 2018, 2019, 2020, 2021]
+
+
+def year_csv_path(year, data_dir=DATA_DIR):
+    """Path to a year's love-notes CSV"""
+    return os.path.join(data_dir, CSV_PATTERN.format(year=year))
+
+
+def find_year_csvs(data_dir=DATA_DIR):
+    """
+    Find every year CSV in the data directory, in generation priority order.
+    Returns a list of (year, csv_file).
+    """
+    found = {}
+    for path in glob.glob(os.path.join(data_dir, CSV_PATTERN.format(year="*"))):
+        match = re.match(r"(\d{4})-david-love-notes-for-audio\.csv$", os.path.basename(path))
+        if match:
+            found[int(match.group(1))] = path
+
+    def priority(year):
+        return (PRIORITY_YEARS.index(year), year) if year in PRIORITY_YEARS else (len(PRIORITY_YEARS), year)
+
+    return [(year, found[year]) for year in sorted(found, key=priority)]
+
+
+def load_year_rows(csv_file):
+    """Read a year CSV into a list of dicts"""
+    with open(csv_file, "r", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def row_filename(row, index):
+    """Audio filename for a CSV row, with the generators' fallback"""
+    return row.get("filename") or f"audio-{index + 1}.wav"
+
+
+def note_filename(year, note_id):
+    """Audio filename for a note ID"""
+    return f"david-{year}-love-note-{note_id}.wav"
+
+
+def parse_timestamp(date_str):
+    """Unix timestamp (seconds) for a CSV date string, or None"""
+    if not date_str:
+        return None
+    try:
+        return int(datetime.fromisoformat(date_str.replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        return None
+
+
+def stable_note_id(year, date_str, guid=None, text=""):
+    """
+    Deterministic note ID that doesn't depend on the note's row position:
+    {timestamp}_{hash} where the hash comes from the source message GUID, or
+    from the note text when no GUID is known. Inserting or reordering rows no
+    longer changes any other note's ID or audio filename; for a text-derived
+    ID, editing the note's text does.
+    """
+    source = f"guid:{guid}" if guid else "text:" + " ".join(text.split())
+    digest = hashlib.sha1(source.encode("utf-8")).hexdigest()[:8]
+    timestamp = parse_timestamp(date_str)
+    return f"{timestamp if timestamp is not None else year}_{digest}"
+
+
+def stable_note_ids(year, rows):
+    """
+    Stable IDs for a year's rows. Exact duplicates (same GUID, or same text
+    at the same second) get -2, -3... in row order.
+    """
+    ids = []
+    seen = set()
+    for row in rows:
+        note_id = stable_note_id(year, row.get("date", ""), row.get("guid"), row.get("text", ""))
+        if note_id in seen:
+            suffix = 2
+            while f"{note_id}-{suffix}" in seen:
+                suffix += 1
+            note_id = f"{note_id}-{suffix}"
+        seen.add(note_id)
+        ids.append(note_id)
+    return ids
+
+
+def validate_text_content(text, filename=None):
+    """
+    Validate that text content is complete and not truncated
+    """
+    if not text or len(text.strip()) == 0:
+        return False, "Empty text"
+
+    # Check for common truncation indicators
+    truncation_indicators = [
+        "...",
+        "…",
+        "etc.",
+        "etc",
+        "and so on",
+        "and more",
+        "[truncated]",
+        "[...]"
+    ]
+
+    text_lower = text.lower()
+    for indicator in truncation_indicators:
+        if text_lower.endswith(indicator):
+            return False, f"Text appears truncated with '{indicator}'"
+
+    # Check for reasonable text length (should be at least 10 words)
+    word_count = len(text.split())
+    if word_count < 10:
+        return False, f"Text too short ({word_count} words)"
+
+    # Check for reasonable character length (should be at least 50 characters)
+    if len(text) < 50:
+        return False, f"Text too short ({len(text)} characters)"
+
+    return True, "Valid text"
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+One entry point for the love-notes pipeline scripts.
+
+Each command runs an existing script with the remaining arguments, and
+imports that script only when the command runs, so the Hume SDK, boto3 and
+numpy are loaded only by the commands that use them. `status` and `plan`
+need nothing beyond the standard library and the CSV/JSON files on disk,
+start in a few tens of milliseconds and are safe to run from cron jobs and
+git hooks (`status --check` exits 1 when notes are missing audio).
+
+    python3 scripts/lovenotes.py status
+    python3 scripts/lovenotes.py plan --concurrency 4
+    python3 scripts/lovenotes.py generate --voice David2
+    python3 scripts/lovenotes.py extract davids-backup --profile
+
+Usage: python3 scripts/lovenotes.py <command> [options]   (lovenotes <command> --help for a command's options)
+"""
+
+import importlib
+import json
+import os
+import sys
+
+# extract <source> -> (module, entry point)
+EXTRACT_SOURCES = {
+    "davids-backup": ("extract_from_davids_backup", "main"),
+    "iphone-backup": ("extract_from_backup", "main"),
+    "timemachine": ("extract_from_timemachine_backup", "extract_from_timemachine_backup"),
+}
+
+# command -> (module, summary); None means it is implemented here
+COMMANDS = {
+    "status": (None, "Notes and generated audio per year, from the CSVs and the audio on disk"),
+    "snapshot": ("chat_snapshot", "Take a consistent snapshot of a live chat.db (WAL included)"),
+    "extract": (None, f"Extract messages from a backup ({', '.join(EXTRACT_SOURCES)})"),
+    "merge": ("ultimate_comprehensive_with_davids_backup", "Merge and deduplicate the extracted datasets"),
+    "diff": ("snapshot_diff", "Recover messages deleted since older backups by diffing snapshots"),
+    "export": (None, "Write a Supabase-ready JSON/CSV export of a message file"),
+    "plan": ("generation_plan", "Estimate cost, API calls and time for the missing audio"),
+    "generate": ("generate-all-years-audio", "Generate missing love-note audio for every year"),
+    "verify": ("verify_audio_files", "Check generated WAV files against their headers and metadata"),
+    "upload": ("upload_audio", "Upload audio, manifests, packs and peaks to storage"),
+    "manifest": ("audio_manifest", "Rebuild the per-year audio manifests"),
+    "voices": ("voice_registry", "List cached Hume voices or resolve voice names"),
+}
+
+
+def run_script(module_name, argv, prog, entry="main"):
+    """Import a pipeline script and run its entry point as if invoked directly"""
+    module = importlib.import_module(module_name)
+    sys.argv = [prog] + argv
+    return getattr(module, entry)()
+
+
+def status(argv):
+    import argparse
+
+    from audio_io import is_complete_audio, load_audio_metadata
+    from love_notes import AUDIO_DIR, find_year_csvs, load_year_rows, row_filename
+    from tts_retry import load_dead_letters
+
+    parser = argparse.ArgumentParser(prog="lovenotes status", description=COMMANDS["status"][1])
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any note is missing audio")
+    args = parser.parse_args(argv)
+
+    # Audio on disk, by the generators' own skip rule; manifests can be stale
+    metadata = load_audio_metadata()
+    years = []
+    for year, csv_file in find_year_csvs():
+        rows = load_year_rows(csv_file)
+        filenames = [row_filename(row, i) for i, row in enumerate(rows)]
+        with_audio = sum(1 for f in filenames if is_complete_audio(os.path.join(AUDIO_DIR, f), metadata.get(f)))
+        years.append({"year": year, "notes": len(rows), "with_audio": with_audio, "missing": len(rows) - with_audio})
+    dead_letters = len(load_dead_letters())
+
+    missing = sum(y["missing"] for y in years)
+    if args.json:
+        print(json.dumps({"years": years, "missing": missing, "dead_letters": dead_letters}, indent=2))
+    else:
+        print("💌 Love Notes Status")
+        print("=" * 50)
+        for y in sorted(years, key=lambda y: y["year"]):
+            print(f"   {y['year']}: {y['with_audio']:>4}/{y['notes']:<4} with audio"
+                  + (f"  ({y['missing']} missing)" if y["missing"] else ""))
+        print(f"📊 {sum(y['notes'] for y in years)} notes, {missing} missing audio, {dead_letters} unresolved in the dead-letter file")
+    if args.check and missing:
+        sys.exit(1)
+
+
+def extract(argv):
+    if not argv or argv[0] not in EXTRACT_SOURCES:
+        print(f"usage: lovenotes extract {{{','.join(EXTRACT_SOURCES)}}} [options]")
+        sys.exit(2)
+    module_name, entry = EXTRACT_SOURCES[argv[0]]
+    return run_script(module_name, argv[1:], f"lovenotes extract {argv[0]}", entry)
+
+
+def export(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="lovenotes export", description=COMMANDS["export"][1])
+    parser.add_argument("messages", help="Message export (JSON or CSV)")
+    parser.add_argument("--years", help="Comma-separated years to keep, e.g. 2024,2025")
+    args = parser.parse_args(argv)
+
+    from message_export import read_message_export
+    from ultimate_comprehensive_with_davids_backup import create_supabase_export
+
+    years = [int(y) for y in args.years.split(",")] if args.years else None
+    if years and len(years) == 1:
+        years *= 2  # the export names its files after the first two years
+    create_supabase_export(read_message_export(args.messages), years)
+
+
+HANDLERS = {"status": status, "extract": extract, "export": export}
+
+
+def print_usage():
+    print("usage: lovenotes <command> [options]")
+    print("")
+    for name, (_, summary) in COMMANDS.items():
+        print(f"   {name:<10}{summary}")
+    print("")
+    print("Run `lovenotes <command> --help` for a command's options.")
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ("-h", "--help"):
+        print_usage()
+        return
+    command, argv = sys.argv[1], sys.argv[2:]
+    if command not in COMMANDS:
+        print(f"❌ Unknown command: {command}")
+        print_usage()
+        sys.exit(2)
+
+    if command in HANDLERS:
+        HANDLERS[command](argv)
+    else:
+        run_script(COMMANDS[command][0], argv, f"lovenotes {command}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the message exports written by the extraction scripts
+(extract_from_backup.py and friends: JSON with a "messages" list, a bare
+JSON list, or CSV with message_id, guid, text, readable_date, apple_date,
+is_from_me, ...).
+"""
+
+import csv
+import json
+from datetime import datetime, timedelta, timezone
+
+APPLE_EPOCH = datetime(2001, 1, 1, tzinfo=timezone.utc)
+
+
+def apple_to_unix(value):
+    """
+    Unix seconds for a chat.db date in either encoding: nanoseconds since
+    2001 (macOS 10.13+) or seconds since 2001 (older databases)
+    """
+    value = float(value)
+    return (value / 1e9 if value > 1e15 else value) + APPLE_EPOCH.timestamp()
+
+
+def read_message_export(path):
+    """Every message in an export, as dicts"""
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data["messages"] if isinstance(data, dict) else data
+    with open(path, "r", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def to_timestamp(value):
+    """
+    Unix seconds for the date formats in message and photo exports: Apple
+    timestamps (nanoseconds or seconds since 2001), Unix seconds or
+    milliseconds, or ISO strings (naive ones are local time). None if
+    unparseable.
+    """
+    if value in (None, ""):
+        return None
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            try:
+                return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+            except ValueError:
+                return None
+    if value > 1e15:  # Apple nanoseconds
+        return (APPLE_EPOCH + timedelta(microseconds=value / 1000)).timestamp()
+    if value > 1e12:  # Unix milliseconds
+        return value / 1000
+    if value < 1e9:  # Apple seconds
+        return (APPLE_EPOCH + timedelta(seconds=value)).timestamp()
+    return float(value)
+
+
+def message_timestamp(message):
+    """A message's time; the UTC apple_date wins over the local-time readable_date"""
+    return to_timestamp(message.get("apple_date")) or to_timestamp(message.get("readable_date") or message.get("date"))
+
+
+def is_from_me(message):
+    """is_from_me as a bool, whether it was exported as 1/0, '1'/'0', True/False or 'David'"""
+    value = message.get("is_from_me")
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "david")
+    return bool(value)
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Migrate love notes from row-position IDs ({timestamp}_{row}) to stable IDs
+derived from the source message GUID, or the note text when there is no
+GUID (see love_notes.stable_note_id).
+
+Computes the old -> new ID mapping for every year CSV and renames what
+already exists instead of regenerating it: WAVs, encoded MP3/Opus files,
+recorded audio metadata, peaks sidecars, pack indexes and dead-letter
+entries, then rewrites the CSVs (keeping any extra columns) and rebuilds the
+manifests. Nothing is sent to the TTS API.
+
+GUIDs come from the CSV's guid column (written by the CSV producers from
+the Supabase guid column), or from a message export written by the
+extraction scripts (--messages, JSON or CSV with guid, text and
+readable_date), matched on the note text. Notes without a GUID - every CSV
+written before the producers emitted one, unless --messages matches it - get
+an ID derived from their text, so editing such a note's text changes its ID.
+
+Dry run by default. --apply writes a journal to data/note-id-migrations/
+listing every file move before anything is renamed, and updates it as each
+phase finishes. --rollback <journal> undoes a migration, including one that
+was interrupted part-way, and a new migration refuses to start while an
+unfinished journal exists.
+
+Usage: python3 scripts/migrate_note_ids.py [--years 2015,2016] [--messages export.json] [--apply]
+       python3 scripts/migrate_note_ids.py --rollback data/note-id-migrations/<timestamp>.json
+"""
+
+import argparse
+import csv
+import glob
+import io
+import json
+import os
+import sys
+from datetime import datetime
+
+from audio_io import (
+    AUDIO_METADATA_FILE, atomic_write_bytes, atomic_write_json, load_audio_metadata, metadata_lock, save_audio_metadata,
+)
+from audio_manifest import rebuild_manifest
+from audio_pack import PACK_DIR, index_path, load_pack_index
+from audio_peaks import PEAKS_DIR, load_peaks, peaks_path
+from love_notes import (
+    AUDIO_DIR, find_year_csvs, load_year_rows, note_filename, parse_timestamp, row_filename, stable_note_ids,
+)
+from message_export import message_timestamp, read_message_export
+from postprocess_audio import OUTPUT_FORMATS
+from tts_retry import DEAD_LETTER_FILE
+
+JOURNAL_DIR = "data/note-id-migrations"
+CSV_FIELDS = ["id", "text", "date", "emotion", "filename"]
+
+
+def normalize_text(text):
+    return " ".join((text or "").split())
+
+
+def load_message_guids(path):
+    """
+    Message export -> {normalized text: [(timestamp, guid)]}
+    """
+    guids = {}
+    for message in read_message_export(path):
+        if not message.get("guid") or not message.get("text"):
+            continue
+        guids.setdefault(normalize_text(message["text"]), []).append((message_timestamp(message), message["guid"]))
+    return guids
+
+
+def lookup_guid(row, message_guids):
+    """
+    GUID for a CSV row: its own guid column, else the export message with the
+    same text, the one closest in time if the text was sent more than once
+    """
+    if row.get("guid"):
+        return row["guid"]
+    candidates = message_guids.get(normalize_text(row.get("text")))
+    if not candidates:
+        return None
+    if len(candidates) == 1:
+        return candidates[0][1]
+    timestamp = parse_timestamp(row.get("date"))
+    if timestamp is None:
+        return None  # can't tell which one it was
+    return min(candidates, key=lambda c: abs((c[0] or 0) - timestamp))[1]
+
+
+def plan_year(year, csv_file, message_guids):
+    """
+    New rows and the {old stem: new stem} renames for one year CSV
+    """
+    rows = load_year_rows(csv_file)
+    for row in rows:
+        guid = lookup_guid(row, message_guids)
+        if guid:
+            row["guid"] = guid
+
+    renames = {}
+    new_rows = []
+    for i, (row, note_id) in enumerate(zip(rows, stable_note_ids(year, rows))):
+        old_stem = os.path.splitext(row_filename(row, i))[0]
+        new_filename = note_filename(year, note_id)
+        if old_stem != os.path.splitext(new_filename)[0]:
+            renames[old_stem] = os.path.splitext(new_filename)[0]
+        new_rows.append(dict(row, id=note_id, filename=new_filename))
+    return new_rows, renames
+
+
+def rows_to_csv(rows):
+    """The input's columns in their order (extra ones like score included), plus any missing standard ones and guid"""
+    fieldnames = []
+    for row in rows:
+        fieldnames.extend(key for key in row if key is not None and key not in fieldnames)
+    fieldnames.extend(field for field in CSV_FIELDS + ["guid"] if field not in fieldnames)
+    out = io.StringIO(newline="")
+    writer = csv.DictWriter(out, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue()
+
+
+def audio_dirs(audio_dir=AUDIO_DIR):
+    """(directory, extension) for every place a note's audio lives"""
+    return [(audio_dir, ".wav")] + [(output_dir, ext) for output_dir, ext, _ in OUTPUT_FORMATS.values()]
+
+
+def file_renames(renames, audio_dir=AUDIO_DIR):
+    """
+    Existing files to move as [(old path, new path)]. Raises ValueError if a
+    target already exists and isn't itself being renamed away.
+    """
+    moves = []
+    for directory, extension in audio_dirs(audio_dir):
+        moving = {os.path.join(directory, stem + extension) for stem in renames}
+        for old_stem, new_stem in renames.items():
+            old_path = os.path.join(directory, old_stem + extension)
+            new_path = os.path.join(directory, new_stem + extension)
+            if not os.path.exists(old_path):
+                continue
+            if os.path.exists(new_path) and new_path not in moving:
+                raise ValueError(f"{new_path} already exists")
+            moves.append((old_path, new_path))
+    return moves
+
+
+def staged_path(path, tag):
+    """Temporary name a file waits under between the two rename phases"""
+    return f"{path}.{tag}"
+
+
+def move_files(moves, tag, on_staged=None):
+    """
+    Rename in two phases through temporary names ({new path}.{tag}), so IDs
+    that trade places (a -> b, b -> a) never overwrite each other.
+    `on_staged()` runs between the phases. A source already at its temporary
+    name (an interrupted run being resumed) is left where it is.
+    """
+    for old_path, new_path in moves:
+        if old_path != staged_path(new_path, tag):
+            os.replace(old_path, staged_path(new_path, tag))
+    if on_staged:
+        on_staged()
+    for _, new_path in moves:
+        os.replace(staged_path(new_path, tag), new_path)
+
+
+def rename_metadata(metadata, renames):
+    """Audio metadata with filename keys and post-processing outputs renamed"""
+    renamed = {}
+    for filename, entry in metadata.items():
+        stem, extension = os.path.splitext(filename)
+        new_stem = renames.get(stem)
+        if new_stem is None:
+            renamed[filename] = entry
+            continue
+        outputs = (entry.get("postprocess") or {}).get("outputs") or {}
+        for output in outputs.values():
+            output["filename"] = new_stem + os.path.splitext(output["filename"])[1]
+        renamed[new_stem + extension] = entry
+    return renamed
+
+
+def stem_id(stem):
+    """Note ID part of a filename stem"""
+    return stem.split("-love-note-", 1)[-1]
+
+
+def rename_peaks(year, renames, peaks_dir=PEAKS_DIR):
+    """Rekey a year's peaks sidecar; True if it changed"""
+    if not os.path.exists(peaks_path(year, peaks_dir)):
+        return False
+    sidecar = load_peaks(year, peaks_dir)
+    ids = {stem_id(old): stem_id(new) for old, new in renames.items()}
+    entries = {}
+    for message_id, entry in sidecar["entries"].items():
+        if message_id in ids:
+            stem, extension = os.path.splitext(entry["filename"])
+            entry["filename"] = renames.get(stem, stem) + extension
+            message_id = ids[message_id]
+        entries[message_id] = entry
+    sidecar["entries"] = entries
+    atomic_write_json(peaks_path(year, peaks_dir), sidecar, indent=None)
+    return True
+
+
+def rename_pack_index(year, renames, pack_dir=PACK_DIR):
+    """
+    Point a year's pack index at the renamed notes. The pack bytes don't
+    change; only the names in the index do. True if it changed.
+    """
+    index = load_pack_index(year, pack_dir)
+    if index is None:
+        return False
+    for entry in index["entries"]:
+        stem, extension = os.path.splitext(entry["filename"])
+        if stem in renames:
+            entry["filename"] = renames[stem] + extension
+            entry["csv_id"] = stem_id(renames[stem])
+    index["updated_at"] = datetime.now().isoformat()
+    atomic_write_json(index_path(year, pack_dir), index)
+    return True
+
+
+def rename_dead_letters(renames, dead_letter_file=DEAD_LETTER_FILE):
+    """Point dead-letter entries at the renamed notes; True if any changed"""
+    if not os.path.exists(dead_letter_file):
+        return False
+    lines = []
+    changed = False
+    with open(dead_letter_file, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                lines.append(line)
+                continue
+            stem, extension = os.path.splitext(record.get("filename") or "")
+            if stem in renames:
+                record["filename"] = renames[stem] + extension
+                line = json.dumps(record, ensure_ascii=False) + "\n"
+                changed = True
+            lines.append(line)
+    if changed:
+        atomic_write_bytes(dead_letter_file, "".join(lines).encode("utf-8"))
+    return changed
+
+
+def rewrite_indexes(years, renames, csv_contents, audio_dir=AUDIO_DIR, metadata_file=AUDIO_METADATA_FILE,
+                    rename_indexes=True):
+    """
+    Rewrite every index for a {old stem: new stem} mapping, then write the
+    CSVs and rebuild the manifests. Used both to migrate and (with the
+    inverse mapping) to roll back.
+    """
+    if rename_indexes:
+        with metadata_lock(metadata_file):
+            metadata = rename_metadata(load_audio_metadata(metadata_file), renames)
+            save_audio_metadata(metadata, metadata_file)
+        rename_dead_letters(renames)
+    else:
+        metadata = load_audio_metadata(metadata_file)
+
+    for year, csv_file in years:
+        atomic_write_bytes(csv_file, csv_contents[str(year)].encode("utf-8"))
+        if rename_indexes:
+            rename_peaks(year, renames)
+            rename_pack_index(year, renames)
+        manifest = rebuild_manifest(year, csv_file, audio_dir, metadata)
+        with_audio = sum(1 for e in manifest["entries"] if e["hasAudio"])
+        print(f"✅ {year}: {len(manifest['entries'])} notes ({with_audio} with audio)")
+
+
+def write_journal(journal_file, journal, **state):
+    journal.update(state, updated_at=datetime.now().isoformat())
+    atomic_write_json(journal_file, journal)
+
+
+def load_journal(journal_file):
+    with open(journal_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def is_finished(journal):
+    """
+    True once a migration completed and any rollback of it completed too.
+    Journals written before phases were recorded only exist for completed runs.
+    """
+    if journal.get("rollback"):
+        return journal["rollback"] == "completed"
+    return journal.get("status", "completed") == "completed"
+
+
+def unfinished_journals(journal_dir=JOURNAL_DIR):
+    return [path for path in sorted(glob.glob(os.path.join(journal_dir, "*.json"))) if not is_finished(load_journal(path))]
+
+
+def rollback_moves(journal):
+    """
+    Where each journaled file is now, as [(current path, original path)].
+    The migration's status says which side of each rename phase it got to;
+    a file still at a temporary name is wherever that name says.
+    """
+    tag = journal["tag"]
+    rollback_tag = f"rollback-{tag}"
+    moves = []
+    for old_path, new_path in journal["moves"]:
+        if os.path.exists(staged_path(old_path, rollback_tag)):
+            current = staged_path(old_path, rollback_tag)
+        elif journal.get("rollback") == "staged":
+            continue  # already back at its old name
+        elif os.path.exists(staged_path(new_path, tag)):
+            current = staged_path(new_path, tag)
+        elif journal.get("status") == "pending":
+            continue  # never moved
+        else:
+            current = new_path
+        if not os.path.exists(current):
+            print(f"⚠️  {os.path.basename(old_path)} is missing, skipping")
+            continue
+        moves.append((current, old_path))
+    return moves
+
+
+def rollback(journal_file):
+    journal = load_journal(journal_file)
+    if journal.get("rollback") == "completed":
+        print(f"✅ {journal_file} was already rolled back")
+        return
+    print(f"↩️  Rolling back {journal_file}")
+    rollback_tag = f"rollback-{journal['tag']}"
+
+    moves = rollback_moves(journal)
+    write_journal(journal_file, journal, rollback="started")
+    move_files(moves, rollback_tag, on_staged=lambda: write_journal(journal_file, journal, rollback="staged"))
+    print(f"📁 Restored {len(moves)} files")
+
+    renames = {new: old for old, new in journal["renames"].items()}
+    years = [(int(year), info["csv_file"]) for year, info in journal["years"].items()]
+    csv_contents = {year: info["original_csv"] for year, info in journal["years"].items()}
+    # A migration interrupted before its files were all staged never touched the indexes
+    rewrite_indexes(years, renames, csv_contents, audio_dir=journal["audio_dir"],
+                    rename_indexes=journal.get("status") != "pending")
+    write_journal(journal_file, journal, rollback="completed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate love notes to stable GUID- or text-derived IDs by renaming existing audio")
+    parser.add_argument("--years", help="Comma-separated years (default: every year CSV)")
+    parser.add_argument("--messages", help="Message export (JSON or CSV) to look up GUIDs by text")
+    parser.add_argument("--dir", default=AUDIO_DIR, help="Directory of generated WAV files")
+    parser.add_argument("--apply", action="store_true", help="Perform the migration (default: dry run)")
+    parser.add_argument("--rollback", metavar="JOURNAL", help="Undo a migration from its journal")
+    args = parser.parse_args()
+
+    if args.rollback:
+        rollback(args.rollback)
+        return
+
+    unfinished = unfinished_journals()
+    if unfinished:
+        for path in unfinished:
+            print(f"❌ {path} didn't finish; run --rollback {path} first")
+        sys.exit(1)
+
+    years = {int(y) for y in args.years.split(",")} if args.years else None
+    message_guids = load_message_guids(args.messages) if args.messages else {}
+
+    print("🔑 Love Notes ID Migration")
+    print("=" * 50)
+
+    selected = []
+    renames = {}
+    journal_years = {}
+    csv_contents = {}
+    for year, csv_file in find_year_csvs():
+        if years and year not in years:
+            continue
+        new_rows, year_renames = plan_year(year, csv_file, message_guids)
+        with open(csv_file, "r", encoding="utf-8") as f:
+            original = f.read()
+        with_guid = sum(1 for row in new_rows if row.get("guid"))
+        print(f"📅 {year}: {len(new_rows)} notes, {with_guid} with GUIDs, {len(year_renames)} IDs change")
+        selected.append((year, csv_file))
+        renames.update(year_renames)
+        journal_years[str(year)] = {"csv_file": csv_file, "original_csv": original}
+        csv_contents[str(year)] = rows_to_csv(new_rows)
+
+    try:
+        moves = file_renames(renames, args.dir)
+    except ValueError as e:
+        print(f"❌ Refusing to migrate: {e}")
+        sys.exit(1)
+
+    print(f"📁 {len(moves)} files to rename")
+    for old_path, new_path in moves[:10]:
+        print(f"   {os.path.basename(old_path)} → {os.path.basename(new_path)}")
+    if len(moves) > 10:
+        print(f"   ... and {len(moves) - 10} more")
+
+    if not args.apply:
+        print("")
+        print("📝 Dry run - rerun with --apply to migrate")
+        return
+
+    tag = datetime.now().strftime("%Y%m%d_%H%M%S")
+    journal_file = os.path.join(JOURNAL_DIR, f"{tag}.json")
+    journal = {
+        "tag": tag,
+        "created_at": datetime.now().isoformat(),
+        "audio_dir": args.dir,
+        "renames": renames,
+        "moves": moves,
+        "years": journal_years,
+    }
+    # Every move is on disk before the first rename, so an interrupted run can be undone
+    write_journal(journal_file, journal, status="pending")
+    print(f"📓 Journal: {journal_file}")
+    print("")
+
+    move_files(moves, tag, on_staged=lambda: write_journal(journal_file, journal, status="staged"))
+    print(f"📁 Renamed {len(moves)} files")
+    rewrite_indexes(selected, renames, csv_contents, args.dir)
+    write_journal(journal_file, journal, status="completed")
+
+    print("")
+    print("🎉 Migration complete - no audio was regenerated")
+    print(f"↩️  Undo with: python3 scripts/migrate_note_ids.py --rollback {journal_file}")
+
+
+if __name__ == "__main__":
+    main()
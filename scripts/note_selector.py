@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Interactive love-note selector across all years, with background generation.
+
+Builds an in-memory index of every note in every year CSV together with its
+generation status (from data/audio-metadata.json and a header check of each
+file, done once at start-up rather than on every page). Filters by year,
+emotion, date range, status and text search run against the index, and
+selected notes are queued to a background generator thread so browsing can
+continue while audio is produced. Generated notes update the index, audio
+metadata and manifests as they finish.
+
+Usage: python3 scripts/note_selector.py [--years 2015,2016] [--voice David2]
+"""
+
+import argparse
+import base64
+import calendar
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from hume.tts.types import PostedUtterance, PostedUtteranceVoiceWithId, FormatWav
+
+from audio_io import is_complete_audio, load_audio_metadata, save_generated_audio
+from audio_manifest import record_generated_note
+from love_notes import AUDIO_DIR, find_year_csvs, load_year_rows, row_filename
+from tts_retry import CircuitOpenError, DeadLetters, RetryError, RetryPolicy, call_with_retry
+from tts_text import get_tts_text, load_text_cache
+from voice_registry import DEFAULT_VOICE, get_client, resolve_voice
+
+NOTES_PER_PAGE = 20
+
+# Generation status -> list marker
+STATUS_ICONS = {"pending": "  ", "queued": "⏳", "generating": "🎤", "done": "✅", "failed": "❌"}
+
+
+def parse_date(value, end=False):
+    """
+    Date from a CSV date or a YYYY[-MM[-DD]] filter argument, or None. With
+    `end`, a bare year or month means its last day (for upper bounds).
+    """
+    if not value:
+        return None
+    value = value.strip()
+    for fmt, length in (("%Y-%m-%d", 10), ("%Y-%m", 7), ("%Y", 4)):
+        try:
+            day = datetime.strptime(value[:length], fmt).date()
+        except ValueError:
+            continue
+        if end and length == 7:
+            day = day.replace(day=calendar.monthrange(day.year, day.month)[1])
+        elif end and length == 4:
+            day = day.replace(month=12, day=31)
+        return day
+    return None
+
+
+class NoteIndex:
+    """All notes with their generation status, filterable in memory"""
+
+    def __init__(self, output_dir=AUDIO_DIR):
+        self.output_dir = output_dir
+        self.notes = []
+        self._lock = threading.Lock()
+        metadata = load_audio_metadata()
+
+        for year, csv_file in find_year_csvs():
+            for i, row in enumerate(load_year_rows(csv_file)):
+                filename = row_filename(row, i)
+                done = is_complete_audio(os.path.join(output_dir, filename), metadata.get(filename))
+                text = row.get("text", "")
+                self.notes.append({
+                    "year": year,
+                    "csv_file": csv_file,
+                    "index": i,
+                    "row": row,
+                    "id": row.get("id", ""),
+                    "text": text,
+                    "search_text": text.lower(),
+                    "date": row.get("date", ""),
+                    "day": parse_date(row.get("date", "")),
+                    "emotion": (row.get("emotion") or "").strip().lower(),
+                    "filename": filename,
+                    "status": "done" if done else "pending",
+                    "error": None,
+                })
+
+    def emotions(self):
+        """Emotion labels with counts"""
+        counts = {}
+        for note in self.notes:
+            if note["emotion"]:
+                counts[note["emotion"]] = counts.get(note["emotion"], 0) + 1
+        return dict(sorted(counts.items(), key=lambda item: -item[1]))
+
+    def filter(self, filters):
+        """Notes matching every active filter, in year/CSV order"""
+        years = filters.get("years")
+        emotion = filters.get("emotion")
+        search = filters.get("search")
+        date_from = filters.get("date_from")
+        date_to = filters.get("date_to")
+        statuses = filters.get("statuses")
+        return [
+            note for note in self.notes
+            if (not years or note["year"] in years)
+            and (not emotion or note["emotion"] == emotion)
+            and (not search or search in note["search_text"])
+            and (not date_from or (note["day"] and note["day"] >= date_from))
+            and (not date_to or (note["day"] and note["day"] <= date_to))
+            and (not statuses or note["status"] in statuses)
+        ]
+
+    def set_status(self, note, status, error=None):
+        with self._lock:
+            note["status"] = status
+            note["error"] = error
+
+    def counts(self):
+        counts = {status: 0 for status in STATUS_ICONS}
+        for note in self.notes:
+            counts[note["status"]] += 1
+        return counts
+
+
+class GenerationQueue:
+    """
+    Background generator: one worker thread takes queued notes, synthesizes
+    them under the shared retry policy and circuit breaker, and saves them.
+    """
+
+    def __init__(self, index, output_dir=AUDIO_DIR, voice_id=DEFAULT_VOICE):
+        self.index = index
+        self.output_dir = output_dir
+        self.voice_name = voice_id
+        self.voice_id = None
+        self.queue = queue.Queue()
+        self.text_cache = load_text_cache()
+        self.dead_letters = DeadLetters()
+        self.log = []
+        self._client = None
+        self._worker = threading.Thread(target=self._run, name="audio-generator", daemon=True)
+        self._worker.start()
+
+    def enqueue(self, notes):
+        """Queue notes that aren't already generated or in flight; returns how many were queued"""
+        queued = 0
+        for note in notes:
+            if note["status"] in ("pending", "failed"):
+                self.index.set_status(note, "queued")
+                self.queue.put(note)
+                queued += 1
+        return queued
+
+    def pending(self):
+        return self.queue.unfinished_tasks
+
+    def wait(self):
+        self.queue.join()
+
+    def _log(self, message):
+        self.log.append(f"{datetime.now().strftime('%H:%M:%S')} {message}")
+
+    def _run(self):
+        while True:
+            note = self.queue.get()
+            try:
+                self._generate(note)
+            finally:
+                self.queue.task_done()
+
+    def _generate(self, note):
+        if self._client is None:
+            self._client = get_client()
+            Path(self.output_dir).mkdir(parents=True, exist_ok=True)
+
+        filename = note["filename"]
+        text, is_valid, reason = get_tts_text(note["text"], self.text_cache)
+        if not is_valid:
+            self.index.set_status(note, "failed", reason)
+            self._log(f"❌ {filename}: {reason}")
+            return
+
+        self.index.set_status(note, "generating")
+        try:
+            if self.voice_id is None:
+                self.voice_id = resolve_voice(self.voice_name, self._client)
+            utterance = PostedUtterance(text=text, voice=PostedUtteranceVoiceWithId(id=self.voice_id))
+            audio_data, _ = call_with_retry(
+                lambda: self._client.tts.synthesize_json(utterances=[utterance], format=FormatWav()),
+                policy=RetryPolicy(),
+            )
+            audio_bytes = base64.b64decode(audio_data.generations[0].audio)
+            saved = save_generated_audio(self.output_dir, filename, audio_bytes, audio_data.generations[0].duration)
+            record_generated_note(note["row"], filename, saved)
+        except CircuitOpenError as e:
+            # Put it back to pending; the user can re-queue once the API recovers
+            self.index.set_status(note, "pending", str(e))
+            self._log(f"🔌 {filename}: {e}")
+            return
+        except RetryError as e:
+            self.index.set_status(note, "failed", str(e))
+            self.dead_letters.add({
+                "csv_file": note["csv_file"],
+                "filename": filename,
+                "row": note["index"] + 1,
+                "error": f"Audio generation failed: {e.last_error}",
+                "category": e.category,
+                "attempts": e.attempts,
+                "text_length": len(text),
+                "word_count": len(text.split()),
+                "date": note["date"] or "Unknown",
+            })
+            self._log(f"❌ {filename}: {e}")
+            return
+        except Exception as e:
+            self.index.set_status(note, "failed", str(e))
+            self._log(f"❌ {filename}: {e}")
+            return
+
+        self.index.set_status(note, "done")
+        self.dead_letters.resolve(filename)
+        self._log(f"✅ {filename} ({audio_data.generations[0].duration:.2f}s)")
+
+
+def describe_filters(filters):
+    parts = []
+    if filters.get("years"):
+        parts.append("years " + ",".join(str(y) for y in sorted(filters["years"])))
+    if filters.get("emotion"):
+        parts.append(f"emotion {filters['emotion']}")
+    if filters.get("date_from") or filters.get("date_to"):
+        parts.append(f"dates {filters.get('date_from') or '…'} → {filters.get('date_to') or '…'}")
+    if filters.get("search"):
+        parts.append(f"text \"{filters['search']}\"")
+    if filters.get("statuses"):
+        parts.append("status " + ",".join(sorted(filters["statuses"])))
+    return "; ".join(parts) or "none"
+
+
+def display_notes(notes, start_index, count, index, generator, filters):
+    """Display a page of filtered notes"""
+    end_index = min(start_index + count, len(notes))
+    counts = index.counts()
+
+    print(f"\n📄 Notes {start_index + 1 if notes else 0}-{end_index} of {len(notes)} matching "
+          f"(filters: {describe_filters(filters)})")
+    print(f"🎧 Queue: {generator.pending()} waiting/generating | "
+          f"✅ {counts['done']} done | ❌ {counts['failed']} failed | {counts['pending']} not generated")
+    print("=" * 80)
+    for i, note in enumerate(notes[start_index:end_index]):
+        text_preview = note["text"][:70] + "..." if len(note["text"]) > 70 else note["text"]
+        print(f"{start_index + i + 1:3d}. {STATUS_ICONS[note['status']]} [{note['emotion'] or '-'}] {text_preview}")
+        print(f"       {note['year']} | Date: {note['date']} | ID: {note['id']}")
+
+
+def print_help():
+    print("Commands:")
+    print("  n / p                  Next / previous page")
+    print("  / <text>               Search note text (empty clears)")
+    print("  e <emotion>            Filter by emotion (empty clears; 'e ?' lists emotions)")
+    print("  d <from> <to>          Date range, YYYY[-MM[-DD]] ('-' leaves a side open; empty clears)")
+    print("  y <years>              Filter by years, e.g. 'y 2015 2016' (empty clears)")
+    print("  t <status...>          Filter by status: pending queued generating done failed (empty clears)")
+    print("  c                      Clear all filters")
+    print("  s <numbers>            Queue notes for generation, e.g. 's 1 3 5' or 's 4-9'")
+    print("  a                      Queue every matching note that isn't generated yet")
+    print("  l                      Show the generator log")
+    print("  h                      Show this help")
+    print("  q                      Quit (waits for queued notes to finish)")
+
+
+def parse_numbers(args, limit):
+    """'1 3 5-7' -> [0, 2, 4, 5, 6] (0-based, within range)"""
+    numbers = []
+    for part in args:
+        if "-" in part:
+            low, high = part.split("-", 1)
+            numbers.extend(range(int(low), int(high) + 1))
+        else:
+            numbers.append(int(part))
+    return [n - 1 for n in numbers if 1 <= n <= limit]
+
+
+def run_selector(index, generator, filters):
+    start_index = 0
+    matching = index.filter(filters)
+    print_help()
+
+    while True:
+        display_notes(matching, start_index, NOTES_PER_PAGE, index, generator, filters)
+        command = input("\nEnter command (h for help): ").strip()
+        name, _, rest = command.partition(" ")
+        name = name.lower()
+        args = rest.split()
+        refilter = True
+
+        if name == "q":
+            return
+        elif name == "n":
+            refilter = False
+            if start_index + NOTES_PER_PAGE < len(matching):
+                start_index += NOTES_PER_PAGE
+            else:
+                print("📄 Already at the last page")
+        elif name == "p":
+            refilter = False
+            if start_index > 0:
+                start_index = max(0, start_index - NOTES_PER_PAGE)
+            else:
+                print("📄 Already at the first page")
+        elif name == "/":
+            filters["search"] = rest.strip().lower() or None
+        elif command.startswith("/"):
+            filters["search"] = command[1:].strip().lower() or None
+        elif name == "e":
+            if rest.strip() == "?":
+                refilter = False
+                for emotion, count in index.emotions().items():
+                    print(f"   {emotion}: {count}")
+            else:
+                filters["emotion"] = rest.strip().lower() or None
+        elif name == "d":
+            if not args:
+                filters["date_from"] = filters["date_to"] = None
+            else:
+                filters["date_from"] = parse_date(args[0]) if args[0] != "-" else None
+                filters["date_to"] = parse_date(args[1], end=True) if len(args) > 1 and args[1] != "-" else None
+        elif name == "y":
+            try:
+                filters["years"] = {int(y) for y in args} or None
+            except ValueError:
+                print("❌ Years must be numbers")
+        elif name == "t":
+            unknown = [s for s in args if s not in STATUS_ICONS]
+            if unknown:
+                print(f"❌ Unknown status: {', '.join(unknown)}")
+            else:
+                filters["statuses"] = set(args) or None
+        elif name == "c":
+            filters.clear()
+        elif name == "s":
+            refilter = False
+            try:
+                selected = [matching[i] for i in parse_numbers(args, len(matching))]
+            except ValueError:
+                print("❌ Invalid selection. Use numbers or ranges like '1 3 5-7'.")
+                continue
+            print(f"🎧 Queued {generator.enqueue(selected)} notes")
+        elif name == "a":
+            refilter = False
+            print(f"🎧 Queued {generator.enqueue(matching)} notes")
+        elif name == "l":
+            refilter = False
+            for line in generator.log[-20:] or ["(nothing generated yet)"]:
+                print(f"   {line}")
+        elif name == "h":
+            refilter = False
+            print_help()
+        elif command:
+            refilter = False
+            print("❌ Invalid command. Type h for help.")
+        else:
+            refilter = False
+
+        if refilter:
+            matching = index.filter(filters)
+            start_index = 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Browse love notes across years and queue audio generation")
+    parser.add_argument("--years", help="Comma-separated years to start filtered to (default: all)")
+    parser.add_argument("--dir", default=AUDIO_DIR, help="Output directory for generated audio")
+    parser.add_argument("--voice", default=DEFAULT_VOICE, help=f"Voice name or ID (default: {DEFAULT_VOICE})")
+    args = parser.parse_args(argv)
+
+    print("🎵 Interactive Audio Generator for Love Notes")
+    print("=" * 50)
+
+    started = time.monotonic()
+    index = NoteIndex(output_dir=args.dir)
+    counts = index.counts()
+    print(f"📝 Indexed {len(index.notes)} notes in {time.monotonic() - started:.1f}s "
+          f"({counts['done']} with audio, {counts['pending']} remaining)")
+    if not index.notes:
+        print("❌ No love-note CSVs found")
+        return
+
+    filters = {"statuses": {"pending", "queued", "generating", "failed"}}
+    if args.years:
+        filters["years"] = {int(y) for y in args.years.split(",")}
+
+    generator = GenerationQueue(index, args.dir, args.voice)
+    try:
+        run_selector(index, generator, filters)
+    except (KeyboardInterrupt, EOFError):
+        print("")
+
+    if generator.pending():
+        print(f"⏳ Waiting for {generator.pending()} queued notes to finish (Ctrl+C to abandon)...")
+        try:
+            generator.wait()
+        except KeyboardInterrupt:
+            print("⚠️  Abandoned the remaining queue")
+
+    counts = index.counts()
+    print("")
+    print("🎉 Session complete!")
+    for line in generator.log:
+        print(f"   {line}")
+    print(f"✅ Notes with audio: {counts['done']}")
+    print(f"❌ Failed: {counts['failed']}")
+    print(f"📁 Output directory: {args.dir}")
+
+
+if __name__ == "__main__":
+    main()
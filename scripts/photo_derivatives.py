@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Responsive WebP/JPEG derivatives for indexed photos.
+
+Every photo in the local photo index (photo_index.py) is resized to a few
+widths and encoded as WebP and JPEG in a process pool. Outputs are cached by
+source content hash, width and encoder settings
+(public/photos/derived/{sha[:2]}/{sha}-{width}-{settings}.{ext}), so only new photos are
+processed, a photo that moves or is copied is not re-encoded, and changing a
+setting only re-encodes what it affects.
+
+Each source is decoded once per run (JPEGs at a reduced scale when that is
+enough for the largest width), and the smaller widths are resized from that
+decode. Images are never upscaled. HEIC sources decode through pillow-heif
+when it is installed (registered by photo_index).
+
+data/photo-derivatives.json maps photo IDs to their derivatives for
+app/api/local-photos.
+
+Usage: python3 scripts/photo_derivatives.py [--widths 320,640,1280] [--workers N] [--prune]
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from PIL import Image, ImageOps
+
+from audio_io import atomic_write_bytes, atomic_write_json
+from photo_index import INDEX_DB
+
+DERIVED_DIR = "public/photos/derived"
+DERIVED_URL = "/photos/derived"
+DERIVATIVES_FILE = "data/photo-derivatives.json"
+
+DEFAULT_WIDTHS = (320, 640, 1280)
+# Format -> (extension, Pillow save options)
+FORMATS = {
+    "webp": (".webp", {"format": "WEBP", "quality": 78, "method": 4}),
+    "jpeg": (".jpg", {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True}),
+}
+# EXIF orientations 5-8 are rotated a quarter turn, so width and height swap
+ORIENTATION_TAG = 0x0112
+
+
+def settings_tag(fmt):
+    """Short hash of a format's encoder settings, part of every output name"""
+    return hashlib.sha1(repr(sorted(FORMATS[fmt][1].items())).encode("utf-8")).hexdigest()[:6]
+
+
+def derivative_path(sha256, width, fmt, derived_dir=DERIVED_DIR):
+    """Content-addressed location of one derivative"""
+    extension = FORMATS[fmt][0]
+    return os.path.join(derived_dir, sha256[:2], f"{sha256[:24]}-{width}-{settings_tag(fmt)}{extension}")
+
+
+def derivative_url(path, derived_dir=DERIVED_DIR):
+    return DERIVED_URL + "/" + os.path.relpath(path, derived_dir).replace(os.sep, "/")
+
+
+def oriented_size(image):
+    """Size of an opened image once its EXIF orientation is applied"""
+    width, height = image.size
+    if image.getexif().get(ORIENTATION_TAG) in (5, 6, 7, 8):
+        return height, width
+    return width, height
+
+
+def target_widths(source_width, widths):
+    """Widths to produce without upscaling; a small source still gets one"""
+    fitting = [w for w in widths if w <= source_width]
+    return fitting or [min(widths)]
+
+
+def render_derivatives(path, sha256, widths, derived_dir=DERIVED_DIR):
+    """
+    Decode one source and write whichever of its derivatives are missing.
+    Target widths follow the upright image, so a rotated portrait photo is
+    sized by its displayed width. Runs in a worker process. Returns
+    (sources, upright source width, bytes written).
+    """
+    with Image.open(path) as image:
+        source_width = oriented_size(image)[0]
+        widths = sorted(target_widths(source_width, widths), reverse=True)
+        # JPEG: let the decoder scale down by up to 8x when the largest width allows it
+        image.draft("RGB", (widths[0], widths[0]))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        sources = []
+        written = 0
+        current = image
+        for width in widths:
+            height = max(1, round(current.height * width / current.width))
+            if width < current.width:
+                current = current.resize((width, height), Image.LANCZOS)
+            entry = {"target": width, "width": current.width, "height": current.height}
+            for fmt, (_, options) in FORMATS.items():
+                output = derivative_path(sha256, width, fmt, derived_dir)
+                if not os.path.exists(output):
+                    buffer = io.BytesIO()
+                    current.save(buffer, **options)
+                    atomic_write_bytes(output, buffer.getvalue())
+                    written += buffer.tell()
+                entry[fmt] = derivative_url(output, derived_dir)
+            sources.append(entry)
+    return sorted(sources, key=lambda s: s["target"]), source_width, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build responsive image derivatives for indexed photos")
+    parser.add_argument("--db", default=INDEX_DB, help="Photo index (from photo_index.py)")
+    parser.add_argument("--widths", default=",".join(map(str, DEFAULT_WIDTHS)), help="Comma-separated target widths")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Worker processes")
+    parser.add_argument("--all", action="store_true", help="Include every burst/duplicate, not just representatives")
+    parser.add_argument("--prune", action="store_true", help="Delete derivatives no indexed photo uses anymore")
+    args = parser.parse_args()
+
+    widths = sorted({int(w) for w in args.widths.split(",") if w.strip()})
+
+    print("🪄 Photo Derivatives")
+    print("=" * 50)
+
+    db = sqlite3.connect(args.db)
+    db.row_factory = sqlite3.Row
+    query = "SELECT id, path, sha256, width FROM photos WHERE error IS NULL AND sha256 IS NOT NULL"
+    if not args.all:
+        query += " AND group_id = id"
+    photos = db.execute(query).fetchall()
+    db.close()
+
+    # One task per distinct content; copies of a file share its derivatives
+    by_sha = {}
+    for photo in photos:
+        by_sha.setdefault(photo["sha256"], []).append(photo)
+
+    # Sources recorded last run, reused while all their files still exist
+    previous = {}
+    if os.path.exists(DERIVATIVES_FILE):
+        with open(DERIVATIVES_FILE, "r", encoding="utf-8") as f:
+            previous = {p["sha256"]: p for p in json.load(f)["photos"].values()}
+
+    # The upright width is only known once a source has been opened, so
+    # anything recorded without one is rendered again
+    def complete(sha256):
+        source_width = previous.get(sha256, {}).get("width")
+        return source_width is not None and all(
+            os.path.exists(derivative_path(sha256, w, fmt))
+            for w in target_widths(source_width, widths) for fmt in FORMATS)
+
+    derivatives = {}
+    pending = []
+    for sha256, copies in by_sha.items():
+        if complete(sha256):
+            source_width = previous[sha256]["width"]
+            wanted = set(target_widths(source_width, widths))
+            sources = [source for source in previous[sha256]["sources"] if source["target"] in wanted]
+            derivatives[sha256] = {"width": source_width, "sources": sources}
+        else:
+            pending.append((copies[0]["path"], sha256))
+    print(f"📝 {len(pending)} of {len(by_sha)} photos need derivatives ({', '.join(map(str, widths))}px × {', '.join(FORMATS)})")
+
+    errors = 0
+    written = 0
+    if pending:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = {pool.submit(render_derivatives, path, sha256, widths): (path, sha256)
+                       for path, sha256 in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                path, sha256 = futures[future]
+                try:
+                    sources, source_width, size = future.result()
+                    derivatives[sha256] = {"width": source_width, "sources": sources}
+                    written += size
+                except Exception as e:
+                    print(f"   ❌ {path}: {e}")
+                    errors += 1
+                if done % 100 == 0:
+                    print(f"   📊 {done}/{len(pending)}")
+
+    manifest = {"generated_at": datetime.now().isoformat(), "widths": widths, "photos": {}}
+    for sha256, copies in by_sha.items():
+        if sha256 in derivatives:
+            for photo in copies:
+                manifest["photos"][photo["id"]] = {"sha256": sha256, **derivatives[sha256]}
+    atomic_write_json(DERIVATIVES_FILE, manifest)
+
+    if args.prune and os.path.isdir(DERIVED_DIR):
+        keep = {derivative_path(sha256, source["target"], fmt) for sha256, entry in derivatives.items()
+                for source in entry["sources"] for fmt in FORMATS}
+        pruned = 0
+        for dirpath, _, filenames in os.walk(DERIVED_DIR):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if path not in keep:
+                    os.remove(path)
+                    pruned += 1
+        print(f"🧹 Pruned {pruned} unused derivatives")
+
+    print(f"✅ {len(manifest['photos'])} photos with derivatives ({written / 1024 / 1024:.1f} MB written)")
+    print(f"💾 Saved to: {DERIVATIVES_FILE}")
+    if errors:
+        print(f"❌ Errors: {errors} files")
+
+
+if __name__ == "__main__":
+    main()
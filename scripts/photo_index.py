@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Index a local photo library (a folder, or an exported Photos library) into
+SQLite for the photo routes.
+
+Each image is read in a process pool for its EXIF capture time, GPS
+position, camera and dimensions, plus a content hash and a 64-bit perceptual
+hash (DCT pHash). The index is keyed by path and remembers each file's mtime
+and size, so a rescan only opens new or changed files and drops deleted ones.
+
+Bursts (similar frames shot seconds apart) and duplicates (the same picture
+exported or copied twice) are collapsed into groups; the largest image of
+each group is its representative. Groups are found without comparing every
+pair: bursts only compare time neighbours, and duplicates only compare
+photos sharing a 16-bit slice of their hash (any two hashes within
+DUPLICATE_DISTANCE bits must share one).
+
+After each scan data/photo-index.json is rewritten with one entry per
+representative, in the shape app/api/local-photos serves.
+
+HEIC files need the optional pillow-heif package (pip install pillow-heif).
+
+Usage: python3 scripts/photo_index.py PHOTO_DIR [--workers N] [--rescan]
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+from PIL import ExifTags, Image
+
+from audio_io import atomic_write_json
+
+try:
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+    HEIF_SUPPORT = True
+except ImportError:
+    HEIF_SUPPORT = False
+
+INDEX_DB = "data/photo-index.db"
+INDEX_EXPORT = "data/photo-index.json"
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".tif", ".tiff"}
+HEIF_EXTENSIONS = {".heic", ".heif"}
+
+HASH_SIZE = 8  # 8x8 low frequencies -> 64-bit hash
+HASH_IMAGE_SIZE = 32
+BURST_SECONDS = 10
+BURST_DISTANCE = 12  # bits
+DUPLICATE_DISTANCE = 3  # bits; must stay below the number of hash slices (4)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS photos (
+    path TEXT PRIMARY KEY,
+    id TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT,
+    width INTEGER,
+    height INTEGER,
+    taken_at TEXT,
+    taken_at_ts REAL,
+    taken_at_source TEXT,
+    latitude REAL,
+    longitude REAL,
+    camera TEXT,
+    phash TEXT,
+    group_id TEXT,
+    group_size INTEGER,
+    error TEXT,
+    indexed_at TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS photos_id ON photos (id);
+CREATE INDEX IF NOT EXISTS photos_taken_at ON photos (taken_at_ts);
+CREATE INDEX IF NOT EXISTS photos_group ON photos (group_id);
+"""
+
+COLUMNS = ("path", "id", "mtime", "size", "sha256", "width", "height", "taken_at", "taken_at_ts",
+           "taken_at_source", "latitude", "longitude", "camera", "phash", "error", "indexed_at")
+
+_DCT = None
+
+
+def photo_id(path):
+    """Stable ID for an indexed path"""
+    return hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+
+
+def open_index(db_file=INDEX_DB):
+    """Open (and create) the photo index"""
+    os.makedirs(os.path.dirname(db_file) or ".", exist_ok=True)
+    db = sqlite3.connect(db_file)
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript(SCHEMA)
+    return db
+
+
+def find_photos(root):
+    """Every supported image under `root` as {path: (mtime, size)}"""
+    extensions = IMAGE_EXTENSIONS | (HEIF_EXTENSIONS if HEIF_SUPPORT else set())
+    found = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        # Skip hidden folders and the Photos library's derived-image caches
+        dirnames[:] = [d for d in dirnames if not d.startswith(".") and d not in ("resources", "private")]
+        for filename in filenames:
+            if os.path.splitext(filename)[1].lower() in extensions and not filename.startswith("."):
+                path = os.path.join(dirpath, filename)
+                stat = os.stat(path)
+                found[os.path.abspath(path)] = (stat.st_mtime, stat.st_size)
+    return found
+
+
+def dct_matrix(n):
+    """Orthonormal DCT-II basis"""
+    k = np.arange(n)[:, None]
+    matrix = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+def perceptual_hash(image):
+    """64-bit DCT hash as 16 hex digits: low frequencies above/below their median"""
+    global _DCT
+    if _DCT is None:
+        _DCT = dct_matrix(HASH_IMAGE_SIZE)
+    pixels = np.asarray(image.convert("L").resize((HASH_IMAGE_SIZE, HASH_IMAGE_SIZE), Image.LANCZOS), dtype=np.float64)
+    low = (_DCT @ pixels @ _DCT.T)[:HASH_SIZE, :HASH_SIZE].flatten()
+    bits = low > np.median(low[1:])  # the DC term would dominate the median
+    return f"{int(''.join('1' if b else '0' for b in bits), 2):016x}"
+
+
+def gps_degrees(values, ref):
+    """EXIF (degrees, minutes, seconds) rationals -> signed decimal degrees"""
+    degrees = float(values[0]) + float(values[1]) / 60 + float(values[2]) / 3600
+    return -degrees if ref in ("S", "W") else degrees
+
+
+def read_exif(image):
+    """Capture time (ISO, with offset when recorded), GPS and camera from EXIF"""
+    exif = image.getexif()
+    details = exif.get_ifd(ExifTags.IFD.Exif)
+    gps = exif.get_ifd(ExifTags.IFD.GPSInfo)
+
+    taken_at = None
+    raw = details.get(ExifTags.Base.DateTimeOriginal) or exif.get(ExifTags.Base.DateTime)
+    if raw:
+        try:
+            taken = datetime.strptime(str(raw).strip("\x00 "), "%Y:%m:%d %H:%M:%S")
+            offset = details.get(ExifTags.Base.OffsetTimeOriginal)
+            taken_at = taken.isoformat() + (str(offset).strip("\x00 ") if offset else "")
+        except ValueError:
+            pass
+
+    latitude = longitude = None
+    try:
+        if gps.get(ExifTags.GPS.GPSLatitude) and gps.get(ExifTags.GPS.GPSLongitude):
+            latitude = gps_degrees(gps[ExifTags.GPS.GPSLatitude], gps.get(ExifTags.GPS.GPSLatitudeRef))
+            longitude = gps_degrees(gps[ExifTags.GPS.GPSLongitude], gps.get(ExifTags.GPS.GPSLongitudeRef))
+    except (TypeError, ValueError, ZeroDivisionError):
+        pass
+
+    camera = " ".join(str(exif.get(tag, "")).strip("\x00 ") for tag in (ExifTags.Base.Make, ExifTags.Base.Model)).strip()
+    return taken_at, latitude, longitude, camera or None
+
+
+def analyze_photo(path, mtime, size):
+    """Index row for one image. Runs in a worker process."""
+    row = {"path": path, "id": photo_id(path), "mtime": mtime, "size": size,
+           "indexed_at": datetime.now().isoformat()}
+    try:
+        hasher = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(chunk)
+        row["sha256"] = hasher.hexdigest()
+
+        with Image.open(path) as image:
+            row["width"], row["height"] = image.size
+            taken_at, row["latitude"], row["longitude"], row["camera"] = read_exif(image)
+            image.draft("RGB", (HASH_IMAGE_SIZE * 4, HASH_IMAGE_SIZE * 4))  # JPEG: decode at reduced size
+            row["phash"] = perceptual_hash(image)
+    except Exception as e:
+        row["error"] = str(e)
+        taken_at = None
+
+    if taken_at:
+        row["taken_at"], row["taken_at_source"] = taken_at, "exif"
+    else:
+        # No EXIF date (screenshots, edited exports): fall back to the file time
+        row["taken_at"] = datetime.fromtimestamp(mtime).isoformat()
+        row["taken_at_source"] = "mtime"
+    row["taken_at_ts"] = datetime.fromisoformat(row["taken_at"]).timestamp()
+    return row
+
+
+def hamming(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def group_photos(db):
+    """
+    Collapse bursts and duplicates into groups and record each photo's group
+    (the ID of its representative). Returns the number of groups.
+    """
+    photos = db.execute(
+        "SELECT id, phash, taken_at_ts, width, height FROM photos WHERE phash IS NOT NULL ORDER BY taken_at_ts"
+    ).fetchall()
+    parent = {p["id"]: p["id"] for p in photos}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(a, b):
+        parent[find(a)] = find(b)
+
+    # Bursts: only photos taken within BURST_SECONDS of each other are compared
+    start = 0
+    for i, photo in enumerate(photos):
+        while photos[start]["taken_at_ts"] < photo["taken_at_ts"] - BURST_SECONDS:
+            start += 1
+        for other in photos[start:i]:
+            if hamming(photo["phash"], other["phash"]) <= BURST_DISTANCE:
+                union(photo["id"], other["id"])
+
+    # Duplicates at any time: near-identical hashes share at least one 16-bit slice
+    buckets = {}
+    for photo in photos:
+        for slot in range(4):
+            buckets.setdefault((slot, photo["phash"][slot * 4:slot * 4 + 4]), []).append(photo)
+    for bucket in buckets.values():
+        for i, photo in enumerate(bucket):
+            for other in bucket[i + 1:]:
+                if find(photo["id"]) != find(other["id"]) and hamming(photo["phash"], other["phash"]) <= DUPLICATE_DISTANCE:
+                    union(photo["id"], other["id"])
+
+    groups = {}
+    for photo in photos:
+        groups.setdefault(find(photo["id"]), []).append(photo)
+
+    updates = []
+    for members in groups.values():
+        # Largest image represents the group; ties go to the earliest shot
+        representative = max(members, key=lambda p: ((p["width"] or 0) * (p["height"] or 0), -p["taken_at_ts"]))
+        updates.extend((representative["id"], len(members), p["id"]) for p in members)
+    db.executemany("UPDATE photos SET group_id = ?, group_size = ? WHERE id = ?", updates)
+    db.commit()
+    return len(groups)
+
+
+def export_index(db, export_file=INDEX_EXPORT):
+    """
+    One entry per group representative for app/api/local-photos. Returns the
+    number of entries.
+    """
+    rows = db.execute(
+        "SELECT * FROM photos WHERE error IS NULL AND group_id = id ORDER BY taken_at_ts"
+    ).fetchall()
+    photos = []
+    for row in rows:
+        photo = {
+            "id": row["id"],
+            "path": row["path"],
+            "sha256": row["sha256"],
+            "date": row["taken_at"][:10],
+            "takenAt": row["taken_at"],
+            "takenAtSource": row["taken_at_source"],
+            "width": row["width"],
+            "height": row["height"],
+            "camera": row["camera"],
+            "groupSize": row["group_size"],
+        }
+        if row["latitude"] is not None:
+            photo["location"] = {"latitude": row["latitude"], "longitude": row["longitude"]}
+        photos.append(photo)
+    atomic_write_json(export_file, {"generated_at": datetime.now().isoformat(), "photos": photos})
+    return len(photos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index a local photo library with EXIF data and perceptual hashes")
+    parser.add_argument("root", help="Photo directory or exported Photos library")
+    parser.add_argument("--db", default=INDEX_DB, help="SQLite index file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Worker processes")
+    parser.add_argument("--rescan", action="store_true", help="Re-read every file, even unchanged ones")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"❌ Not a directory: {args.root}")
+        sys.exit(1)
+
+    print("🖼️  Local Photo Index")
+    print("=" * 50)
+    if not HEIF_SUPPORT:
+        print("⚠️  pillow-heif not installed - skipping HEIC files")
+
+    db = open_index(args.db)
+    root = os.path.abspath(args.root)
+    on_disk = find_photos(root)
+    known = {row["path"]: (row["mtime"], row["size"])
+             for row in db.execute("SELECT path, mtime, size FROM photos WHERE path LIKE ?", (root + os.sep + "%",))}
+
+    removed = [path for path in known if path not in on_disk]
+    db.executemany("DELETE FROM photos WHERE path = ?", [(path,) for path in removed])
+    pending = [(path, mtime, size) for path, (mtime, size) in on_disk.items()
+               if args.rescan or known.get(path) != (mtime, size)]
+    print(f"📁 {len(on_disk)} photos, {len(pending)} new or changed, {len(removed)} removed")
+
+    errors = 0
+    if pending:
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(analyze_photo, *item) for item in pending]
+            for done, future in enumerate(as_completed(futures), 1):
+                row = future.result()
+                if row.get("error"):
+                    print(f"   ❌ {row['path']}: {row['error']}")
+                    errors += 1
+                db.execute(f"INSERT OR REPLACE INTO photos ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+                           tuple(row.get(column) for column in COLUMNS))
+                if done % 500 == 0:
+                    db.commit()
+                    print(f"   📊 {done}/{len(pending)}")
+    db.commit()
+
+    groups = group_photos(db)
+    exported = export_index(db)
+    total = db.execute("SELECT COUNT(*) FROM photos").fetchone()[0]
+    print(f"✅ {total} photos indexed in {groups} groups (bursts and duplicates collapsed)")
+    print(f"💾 {exported} photos exported to {INDEX_EXPORT}")
+    if errors:
+        print(f"❌ Errors: {errors} files")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Match photos to the messages sent around the time they were taken.
+
+Message timestamps and photo capture times are each sorted once, then
+joined with a sliding window (two pointers that only move forward), so the
+whole join is O(n log n) in the sort instead of a per-photo scan or a
+per-date database query. Each match gets a confidence that halves every
+--half-life seconds of distance between photo and message.
+
+Writes data/photo-message-matches.json with both directions precomputed
+(photo -> messages and message -> photos), which app/api/photo-matches
+serves as-is.
+
+Photo sources:
+- google: the Google Photos cache from google_photos_sync.py
+- iphone: extracted-photos/photo-metadata.json from extract-iphone-photos.mjs
+- local: the local photo index from photo_index.py (one photo per burst)
+
+Usage: python3 scripts/photo_message_join.py --messages data/messages.json [--window 7200] [--half-life 900] [--top 5]
+"""
+
+import argparse
+import bisect
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+
+from audio_io import atomic_write_json
+from message_export import message_timestamp, read_message_export, to_timestamp
+
+MATCHES_FILE = "data/photo-message-matches.json"
+IPHONE_METADATA_FILE = "extracted-photos/photo-metadata.json"
+# Written by google_photos_sync.py (not imported here: it needs the Google auth libraries)
+GOOGLE_PHOTOS_DB = "data/google-photos.db"
+PHOTO_INDEX_DB = "data/photo-index.db"
+
+DEFAULT_WINDOW = 2 * 3600
+DEFAULT_HALF_LIFE = 15 * 60
+DEFAULT_TOP = 5
+
+
+def load_messages(path):
+    """
+    Messages from an extraction export as a list of (timestamp, message_id,
+    guid), sorted by time
+    """
+    rows = []
+    for message in read_message_export(path):
+        timestamp = message_timestamp(message)
+        if timestamp is not None:
+            rows.append((timestamp, str(message.get("message_id") or message.get("id")), message.get("guid")))
+    rows.sort()
+    return rows
+
+
+def load_google_photos(db_file=GOOGLE_PHOTOS_DB):
+    """Photos from the Google Photos cache as (timestamp, photo_id, source)"""
+    if not os.path.exists(db_file):
+        return []
+    db = sqlite3.connect(db_file)
+    rows = db.execute("SELECT id, creation_time FROM media_items WHERE creation_time IS NOT NULL").fetchall()
+    db.close()
+    return [(to_timestamp(creation_time), photo_id, "google") for photo_id, creation_time in rows]
+
+
+def load_iphone_photos(metadata_file=IPHONE_METADATA_FILE):
+    """Photos organized by extract-iphone-photos.mjs as (timestamp, photo_id, source)"""
+    if not os.path.exists(metadata_file):
+        return []
+    with open(metadata_file, "r", encoding="utf-8") as f:
+        photos = json.load(f).get("photos", [])
+    return [(to_timestamp(p.get("createdAt")), p["id"], "iphone") for p in photos if p.get("createdAt")]
+
+
+def load_local_photos(db_file=PHOTO_INDEX_DB):
+    """Group representatives from the local photo index as (timestamp, photo_id, source)"""
+    if not os.path.exists(db_file):
+        return []
+    db = sqlite3.connect(db_file)
+    rows = db.execute("SELECT id, taken_at_ts FROM photos WHERE group_id = id").fetchall()
+    db.close()
+    return [(taken_at_ts, photo_id, "local") for photo_id, taken_at_ts in rows]
+
+
+PHOTO_SOURCES = {
+    "google": load_google_photos,
+    "iphone": load_iphone_photos,
+    "local": load_local_photos,
+}
+
+
+def join(photos, messages, window=DEFAULT_WINDOW, half_life=DEFAULT_HALF_LIFE, top=DEFAULT_TOP):
+    """
+    Sliding-window sort-merge join. `photos` is [(timestamp, photo_id,
+    source)], `messages` is [(timestamp, message_id, guid)] sorted by time.
+    Returns {photo_id: {source, taken_at, matches}} with each photo's `top`
+    closest messages within `window` seconds, found by walking outward from
+    the photo's position in the window (O(top) per photo, not a sort).
+    """
+    times = [m[0] for m in messages]
+    lo = hi = 0
+    matches = {}
+    for taken_at, photo_id, source in sorted(photos):
+        # Both window edges only move forward as photos get later
+        while lo < len(times) and times[lo] < taken_at - window:
+            lo += 1
+        if hi < lo:
+            hi = lo
+        while hi < len(times) and times[hi] <= taken_at + window:
+            hi += 1
+        if lo == hi:
+            continue
+
+        # Merge outward from the photo's insertion point; ties go to the message before the photo
+        left = bisect.bisect_left(times, taken_at, lo, hi) - 1
+        right = left + 1
+        candidates = []
+        while len(candidates) < top and (left >= lo or right < hi):
+            if right >= hi or (left >= lo and taken_at - times[left] <= times[right] - taken_at):
+                candidates.append(messages[left])
+                left -= 1
+            else:
+                candidates.append(messages[right])
+                right += 1
+        matches[photo_id] = {
+            "source": source,
+            "taken_at": datetime.fromtimestamp(taken_at, timezone.utc).isoformat(),
+            "matches": [
+                {
+                    "message_id": message_id,
+                    "guid": guid,
+                    "delta_seconds": round(timestamp - taken_at),
+                    "confidence": round(0.5 ** (abs(timestamp - taken_at) / half_life), 3),
+                }
+                for timestamp, message_id, guid in candidates
+            ],
+        }
+    return matches
+
+
+def invert(matches):
+    """message_id -> photos sorted by confidence"""
+    by_message = {}
+    for photo_id, photo in matches.items():
+        for match in photo["matches"]:
+            by_message.setdefault(match["message_id"], []).append(
+                {"photo_id": photo_id, "source": photo["source"], "confidence": match["confidence"]})
+    for photos in by_message.values():
+        photos.sort(key=lambda p: -p["confidence"])
+    return by_message
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute photo <-> message matches by capture time")
+    parser.add_argument("--messages", required=True, help="Message export (JSON or CSV) from the extraction scripts")
+    parser.add_argument("--sources", default=",".join(PHOTO_SOURCES), help=f"Photo sources ({', '.join(PHOTO_SOURCES)})")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="Max seconds between photo and message")
+    parser.add_argument("--half-life", type=int, default=DEFAULT_HALF_LIFE, help="Seconds at which confidence halves")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Messages kept per photo")
+    parser.add_argument("--output", default=MATCHES_FILE)
+    args = parser.parse_args()
+
+    sources = [s.strip() for s in args.sources.split(",") if s.strip()]
+    unknown = [s for s in sources if s not in PHOTO_SOURCES]
+    if unknown:
+        print(f"❌ Unknown source(s): {', '.join(unknown)}")
+        sys.exit(1)
+
+    print("🧩 Photo ↔ Message Join")
+    print("=" * 50)
+    messages = load_messages(args.messages)
+    print(f"💬 {len(messages)} messages")
+
+    photos = []
+    for source in sources:
+        loaded = [p for p in PHOTO_SOURCES[source]() if p[0] is not None]
+        print(f"📸 {source}: {len(loaded)} photos")
+        photos.extend(loaded)
+
+    matches = join(photos, messages, args.window, args.half_life, args.top)
+    by_message = invert(matches)
+
+    atomic_write_json(args.output, {
+        "generated_at": datetime.now().isoformat(),
+        "window_seconds": args.window,
+        "half_life_seconds": args.half_life,
+        "photos": matches,
+        "messages": by_message,
+    })
+    print(f"✅ {len(matches)} of {len(photos)} photos matched to {len(by_message)} messages")
+    print(f"💾 Saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Post-process generated love-note audio for the web.
+
+For every WAV in public/audio/love-notes that hasn't been processed yet (or
+changed since), trims leading/trailing silence, normalizes loudness and
+transcodes to web formats with ffmpeg. Files are processed in a process pool;
+the generated WAVs are left untouched as the source of truth and the results
+are recorded under "postprocess" in data/audio-metadata.json and in the
+per-year audio manifests.
+
+Loudness is measured with BS.1770-style gating (absolute -70 dB gate, relative
+-10 dB gate over 400 ms blocks) on the unweighted signal, which is close enough
+for a single synthetic voice and needs nothing beyond NumPy.
+
+Usage: python3 scripts/postprocess_audio.py [--formats mp3,opus] [--workers N] [--force]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import wave
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+
+from audio_io import AUDIO_METADATA_FILE, load_audio_metadata, record_audio_metadata
+from audio_manifest import record_postprocessed_note
+
+AUDIO_DIR = "public/audio/love-notes"
+
+# Output format -> (output directory, extension, ffmpeg encoder arguments)
+OUTPUT_FORMATS = {
+    "mp3": ("public/audio/love-notes-mp3", ".mp3", ["-f", "mp3", "-c:a", "libmp3lame", "-b:a", "96k"]),
+    "opus": ("public/audio/love-notes-opus", ".ogg", ["-f", "ogg", "-c:a", "libopus", "-b:a", "32k", "-application", "voip"]),
+}
+
+TARGET_LOUDNESS_DB = -18.0
+PEAK_CEILING_DB = -1.0
+SILENCE_THRESHOLD_DB = -45.0
+SILENCE_PAD_SECONDS = 0.15
+FRAME_SECONDS = 0.01
+
+
+def read_wav_samples(path):
+    """
+    Read a PCM WAV into a float32 array of shape (frames, channels) in [-1, 1]
+    """
+    with wave.open(path, "rb") as w:
+        channels = w.getnchannels()
+        sample_rate = w.getframerate()
+        sample_width = w.getsampwidth()
+        raw = w.readframes(w.getnframes())
+
+    if sample_width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    elif sample_width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width * 8} bits")
+
+    return samples.reshape(-1, channels), sample_rate
+
+
+def to_db(values):
+    """Convert linear power values to dB, flooring silence at -120 dB"""
+    return 10.0 * np.log10(np.maximum(values, 1e-12))
+
+
+def frame_power(samples, frame_length):
+    """Mean power per non-overlapping frame, mixed down to mono"""
+    mono = samples.mean(axis=1)
+    frame_count = len(mono) // frame_length
+    if frame_count == 0:
+        return np.array([np.mean(mono ** 2)]) if len(mono) else np.zeros(0)
+    frames = mono[:frame_count * frame_length].reshape(frame_count, frame_length)
+    return np.mean(frames ** 2, axis=1)
+
+
+def trim_silence(samples, sample_rate, threshold_db=SILENCE_THRESHOLD_DB, pad_seconds=SILENCE_PAD_SECONDS):
+    """
+    Trim leading/trailing frames quieter than `threshold_db`, keeping a short pad.
+    Returns (trimmed_samples, seconds_trimmed_start, seconds_trimmed_end).
+    """
+    frame_length = max(1, int(sample_rate * FRAME_SECONDS))
+    loud = np.flatnonzero(to_db(frame_power(samples, frame_length)) > threshold_db)
+    if len(loud) == 0:
+        return samples, 0.0, 0.0
+
+    pad = int(sample_rate * pad_seconds)
+    start = max(0, loud[0] * frame_length - pad)
+    end = min(len(samples), (loud[-1] + 1) * frame_length + pad)
+    return samples[start:end], start / sample_rate, (len(samples) - end) / sample_rate
+
+
+def measure_loudness(samples, sample_rate):
+    """
+    Gated loudness in dB: 400 ms blocks with 75% overlap, absolute gate at
+    -70 dB, then a relative gate 10 dB below the mean of the remaining blocks.
+    """
+    mono = samples.mean(axis=1)
+    block = int(sample_rate * 0.4)
+    hop = block // 4
+    if len(mono) < block:
+        return float(to_db(np.mean(mono ** 2))) if len(mono) else -120.0
+
+    # Block powers from a cumulative sum of squares - no per-block Python loop
+    squares = np.concatenate(([0.0], np.cumsum(mono.astype(np.float64) ** 2)))
+    starts = np.arange(0, len(mono) - block + 1, hop)
+    powers = (squares[starts + block] - squares[starts]) / block
+
+    gated = powers[to_db(powers) > -70.0]
+    if len(gated) == 0:
+        return -120.0
+    relative_gate = to_db(np.mean(gated)) - 10.0
+    gated = gated[to_db(gated) > relative_gate]
+    return float(to_db(np.mean(gated)))
+
+
+def normalize_loudness(samples, sample_rate, target_db=TARGET_LOUDNESS_DB, peak_ceiling_db=PEAK_CEILING_DB):
+    """
+    Apply a single gain to reach `target_db`, limited so peaks stay under the
+    ceiling. Returns (normalized_samples, measured_db, applied_gain_db).
+    """
+    measured = measure_loudness(samples, sample_rate)
+    gain_db = target_db - measured
+
+    peak = float(np.max(np.abs(samples))) if samples.size else 0.0
+    if peak > 0:
+        max_gain_db = peak_ceiling_db - 20.0 * np.log10(peak)
+        gain_db = min(gain_db, max_gain_db)
+
+    normalized = np.clip(samples * (10.0 ** (gain_db / 20.0)), -1.0, 1.0)
+    return normalized, measured, float(gain_db)
+
+
+def encode(samples, sample_rate, output_path, encoder_args, ffmpeg="ffmpeg"):
+    """
+    Pipe 16-bit PCM into ffmpeg and atomically move the result into place
+    """
+    pcm = (samples * 32767.0).astype("<i2").tobytes()
+    tmp_path = f"{output_path}.tmp"
+    command = [
+        ffmpeg, "-hide_banner", "-loglevel", "error", "-y",
+        "-f", "s16le", "-ar", str(sample_rate), "-ac", str(samples.shape[1]), "-i", "pipe:0",
+        *encoder_args, tmp_path,
+    ]
+    try:
+        result = subprocess.run(command, input=pcm, capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.decode("utf-8", "replace").strip() or "ffmpeg failed")
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return os.path.getsize(output_path)
+
+
+def process_file(path, formats, ffmpeg="ffmpeg"):
+    """
+    Trim, normalize and transcode one file. Runs in a worker process.
+    """
+    filename = os.path.basename(path)
+    stat = os.stat(path)
+    samples, sample_rate = read_wav_samples(path)
+    duration_in = len(samples) / sample_rate
+
+    trimmed, trimmed_start, trimmed_end = trim_silence(samples, sample_rate)
+    normalized, measured_db, gain_db = normalize_loudness(trimmed, sample_rate)
+
+    outputs = {}
+    for fmt in formats:
+        output_dir, extension, encoder_args = OUTPUT_FORMATS[fmt]
+        os.makedirs(output_dir, exist_ok=True)
+        output_name = os.path.splitext(filename)[0] + extension
+        size = encode(normalized, sample_rate, os.path.join(output_dir, output_name), encoder_args, ffmpeg)
+        outputs[fmt] = {"filename": output_name, "bytes": size}
+
+    return filename, {
+        "source_bytes": stat.st_size,
+        "source_mtime": stat.st_mtime,
+        "duration_in": round(duration_in, 3),
+        "duration": round(len(normalized) / sample_rate, 3),
+        "trimmed_start": round(trimmed_start, 3),
+        "trimmed_end": round(trimmed_end, 3),
+        "loudness_in_db": round(measured_db, 2),
+        "gain_db": round(gain_db, 2),
+        "target_db": TARGET_LOUDNESS_DB,
+        "outputs": outputs,
+        "processed_at": datetime.now().isoformat(),
+    }
+
+
+def needs_processing(path, entry, formats):
+    """True if the source changed or a requested output is missing"""
+    done = (entry or {}).get("postprocess")
+    if not done:
+        return True
+    stat = os.stat(path)
+    if done.get("source_bytes") != stat.st_size or done.get("source_mtime") != stat.st_mtime:
+        return True
+    for fmt in formats:
+        output = done.get("outputs", {}).get(fmt)
+        output_dir = OUTPUT_FORMATS[fmt][0]
+        if not output or not os.path.exists(os.path.join(output_dir, output["filename"])):
+            return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trim, normalize and transcode generated love-note audio")
+    parser.add_argument("--dir", default=AUDIO_DIR, help="Directory of generated WAV files")
+    parser.add_argument("--formats", default="mp3", help=f"Comma-separated output formats ({', '.join(OUTPUT_FORMATS)})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Worker processes")
+    parser.add_argument("--force", action="store_true", help="Reprocess files that are already up to date")
+    parser.add_argument("--ffmpeg", default=os.getenv("FFMPEG_PATH") or shutil.which("ffmpeg") or "ffmpeg")
+    args = parser.parse_args()
+
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in OUTPUT_FORMATS]
+    if unknown:
+        print(f"❌ Unknown format(s): {', '.join(unknown)}")
+        sys.exit(1)
+    if not os.path.isdir(args.dir):
+        print(f"❌ Audio directory not found: {args.dir}")
+        sys.exit(1)
+
+    print("🎛️  Love Notes Audio Post-Processor")
+    print("=" * 50)
+
+    metadata = load_audio_metadata()
+    candidates = sorted(f for f in os.listdir(args.dir) if f.endswith(".wav"))
+    pending = [
+        f for f in candidates
+        if args.force or needs_processing(os.path.join(args.dir, f), metadata.get(f), formats)
+    ]
+
+    print(f"📁 Source: {args.dir}")
+    print(f"🎯 Formats: {', '.join(formats)}")
+    print(f"📝 {len(pending)} of {len(candidates)} files need processing")
+    print("")
+    if not pending:
+        return
+
+    success_count = 0
+    error_count = 0
+    bytes_in = 0
+    bytes_out = 0
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(process_file, os.path.join(args.dir, f), formats, args.ffmpeg): f
+            for f in pending
+        }
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                _, result = future.result()
+            except Exception as e:
+                print(f"   ❌ {filename}: {e}")
+                error_count += 1
+                continue
+
+            # Only the parent process writes metadata and manifests
+            entry = record_audio_metadata(filename, {"postprocess": result}, AUDIO_METADATA_FILE)
+            record_postprocessed_note(filename, entry)
+            success_count += 1
+            bytes_in += result["source_bytes"]
+            bytes_out += sum(o["bytes"] for o in result["outputs"].values())
+            print(f"   ✅ {filename}: {result['duration_in']:.2f}s → {result['duration']:.2f}s, "
+                  f"gain {result['gain_db']:+.1f} dB")
+
+    print("")
+    print("🎉 Post-processing complete!")
+    print(f"✅ Processed: {success_count} files")
+    print(f"❌ Errors: {error_count} files")
+    if bytes_in:
+        print(f"📊 {bytes_in / 1024 / 1024:.1f} MB of WAV → {bytes_out / 1024 / 1024:.1f} MB encoded "
+              f"({(1 - bytes_out / bytes_in) * 100:.0f}% smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Opt-in per-stage profiling for the pipeline scripts.
+
+Scripts mark their phases with `with stage("merge"):` blocks, loops with
+`for row in staged("row_conversion", rows):` and SQLite work with
+conn.cursor(ProfiledCursor), and opt in with add_profile_arguments(parser)
+and start_profiling(args, run_name).
+
+Without --profile a stage is a no-op. With it, every stage records calls,
+wall time, CPU time of the calling thread and the process's peak RSS, and at
+exit the run prints a summary table and writes
+data/profiles/<run>-<timestamp>.json. That file is a Chrome trace (open it in
+Perfetto or chrome://tracing) with the per-stage totals alongside.
+
+Conventional stage names: sql_query, row_conversion, merge, serialization,
+network, disk_write.
+
+--profile-memory also runs tracemalloc and records each stage's peak traced
+Python memory (nested stages included; slower). Traced memory is
+process-wide, so stages running concurrently on other threads share it.
+--profile-cprofile runs the main thread under cProfile, prints the top
+functions and saves a .prof file for snakeviz or pstats.
+
+Usage (roll up a trace): python3 scripts/profiling.py data/profiles/<run>.json
+"""
+
+import argparse
+import atexit
+import cProfile
+import io
+import json
+import os
+import pstats
+import resource
+import sqlite3
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_DIR = "data/profiles"
+
+# Trace events kept per run; stage totals keep counting past this
+MAX_TRACE_EVENTS = 200000
+CPROFILE_TOP = 25
+
+
+def max_rss_bytes():
+    """Peak resident set size of this process so far"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class Profiler:
+    """Stage timings for one run. Thread-safe; stages may nest."""
+
+    def __init__(self):
+        self.enabled = False
+        self.run_name = None
+        self.stages = {}
+        self.events = []
+        self.memory = False
+        self.cprofile = None
+        self.profile_dir = PROFILE_DIR
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def enable(self, run_name, memory=False, cprofile=False, profile_dir=PROFILE_DIR):
+        self.enabled = True
+        self.run_name = run_name
+        self.profile_dir = profile_dir
+        self.started_at = datetime.now()
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.memory = memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if cprofile:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+
+        stack = self._local.__dict__.setdefault("stack", [])
+        frame = {"memory_peak": 0}
+        if self.memory:
+            # Hand the peak so far to the enclosing stage, then measure ours from here
+            _, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]["memory_peak"] = max(stack[-1]["memory_peak"], peak)
+            tracemalloc.reset_peak()
+        stack.append(frame)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            stack.pop()
+            if self.memory:
+                _, peak = tracemalloc.get_traced_memory()
+                frame["memory_peak"] = max(frame["memory_peak"], peak)
+                if stack:
+                    stack[-1]["memory_peak"] = max(stack[-1]["memory_peak"], frame["memory_peak"])
+            self._record(name, wall_start, wall, cpu, frame["memory_peak"])
+
+    def _record(self, name, wall_start, wall, cpu, memory_peak):
+        rss = max_rss_bytes()
+        with self._lock:
+            totals = self.stages.setdefault(name, {
+                "calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "max_wall_seconds": 0.0,
+                "traced_memory_peak_bytes": None, "max_rss_bytes": 0,
+            })
+            totals["calls"] += 1
+            totals["wall_seconds"] += wall
+            totals["cpu_seconds"] += cpu
+            totals["max_wall_seconds"] = max(totals["max_wall_seconds"], wall)
+            totals["max_rss_bytes"] = max(totals["max_rss_bytes"], rss)
+            if self.memory:
+                totals["traced_memory_peak_bytes"] = max(totals["traced_memory_peak_bytes"] or 0, memory_peak)
+            if len(self.events) < MAX_TRACE_EVENTS:
+                self.events.append({
+                    "name": name,
+                    "ph": "X",
+                    "ts": round((wall_start - self.wall_start) * 1e6, 1),
+                    "dur": round(wall * 1e6, 1),
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": {"cpu_ms": round(cpu * 1000, 3)},
+                })
+
+    def summary(self):
+        wall = time.perf_counter() - self.wall_start
+        with self._lock:
+            stages = {name: dict(totals) for name, totals in self.stages.items()}
+        for totals in stages.values():
+            totals["wall_seconds"] = round(totals["wall_seconds"], 6)
+            totals["cpu_seconds"] = round(totals["cpu_seconds"], 6)
+            totals["max_wall_seconds"] = round(totals["max_wall_seconds"], 6)
+        return {
+            "run": self.run_name,
+            "started_at": self.started_at.isoformat(),
+            "argv": sys.argv,
+            "wall_seconds": round(wall, 6),
+            "cpu_seconds": round(time.process_time() - self.cpu_start, 6),
+            "max_rss_bytes": max_rss_bytes(),
+            "stages": stages,
+        }
+
+    def finish(self):
+        """Print the summary and write the trace file (and .prof). Returns the trace path."""
+        if not self.enabled:
+            return None
+        self.enabled = False
+        if self.cprofile:
+            self.cprofile.disable()
+        summary = self.summary()
+        if self.memory:
+            tracemalloc.stop()
+
+        stamp = self.started_at.strftime("%Y%m%d_%H%M%S")
+        os.makedirs(self.profile_dir, exist_ok=True)
+        trace_file = os.path.join(self.profile_dir, f"{self.run_name}-{stamp}.json")
+        with open(trace_file, "w", encoding="utf-8") as f:
+            json.dump(dict(summary, traceEvents=self.events, displayTimeUnit="ms"), f)
+
+        print("")
+        if self.cprofile:
+            prof_file = trace_file.replace(".json", ".prof")
+            self.cprofile.dump_stats(prof_file)
+            out = io.StringIO()
+            pstats.Stats(self.cprofile, stream=out).sort_stats("cumulative").print_stats(CPROFILE_TOP)
+            print(out.getvalue().strip())
+            print(f"🔬 cProfile: {prof_file}")
+            print("")
+        print_summary(summary)
+        print(f"🔬 Trace: {trace_file}")
+        return trace_file
+
+
+_profiler = Profiler()
+
+
+def get_profiler():
+    """The process-wide profiler"""
+    return _profiler
+
+
+def stage(name):
+    """Time a block as the named stage (a no-op unless profiling is on)"""
+    return _profiler.stage(name)
+
+
+def staged(name, iterable):
+    """
+    Iterate `iterable` as one named stage: the stage spans the whole loop,
+    body included, without reindenting it under a with block
+    """
+    with _profiler.stage(name):
+        yield from iterable
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """
+    sqlite3 cursor whose queries and fetches count as the sql_query stage:
+    conn.cursor(ProfiledCursor)
+    """
+
+    def execute(self, *args):
+        with _profiler.stage("sql_query"):
+            return super().execute(*args)
+
+    def executemany(self, *args):
+        with _profiler.stage("sql_query"):
+            return super().executemany(*args)
+
+    def fetchall(self):
+        with _profiler.stage("sql_query"):
+            return super().fetchall()
+
+    def fetchmany(self, *args):
+        with _profiler.stage("sql_query"):
+            return super().fetchmany(*args)
+
+
+def add_profile_arguments(parser):
+    parser.add_argument("--profile", action="store_true", help="Record per-stage timings and write a trace file")
+    parser.add_argument("--profile-memory", action="store_true", help="With --profile, also trace Python memory")
+    parser.add_argument("--profile-cprofile", action="store_true", help="With --profile, also run under cProfile")
+    parser.add_argument("--profile-dir", default=PROFILE_DIR, help="Where trace files go")
+
+
+def start_profiling(args, run_name):
+    """Turn profiling on if --profile was given; the summary is written at exit"""
+    if not getattr(args, "profile", False):
+        return
+    _profiler.enable(run_name, memory=args.profile_memory, cprofile=args.profile_cprofile,
+                     profile_dir=args.profile_dir)
+    atexit.register(_profiler.finish)
+
+
+def format_bytes(value):
+    return f"{value / 1024 / 1024:.1f}" if value is not None else "-"
+
+
+def print_summary(summary):
+    """Stage table, slowest first"""
+    wall = summary["wall_seconds"] or 1e-9
+    print(f"🔬 Profile: {summary['run']}")
+    print("=" * 50)
+    print(f"   {'stage':<20}{'calls':>8}{'wall s':>10}{'cpu s':>10}{'% wall':>8}{'mem MB':>9}{'rss MB':>9}")
+    stages = sorted(summary["stages"].items(), key=lambda item: item[1]["wall_seconds"], reverse=True)
+    for name, totals in stages:
+        print(f"   {name:<20}{totals['calls']:>8}{totals['wall_seconds']:>10.3f}{totals['cpu_seconds']:>10.3f}"
+              f"{100 * totals['wall_seconds'] / wall:>7.1f}%{format_bytes(totals['traced_memory_peak_bytes']):>9}"
+              f"{format_bytes(totals['max_rss_bytes']):>9}")
+    print(f"   {'total':<20}{'':>8}{summary['wall_seconds']:>10.3f}{summary['cpu_seconds']:>10.3f}{'':>8}{'':>9}"
+          f"{format_bytes(summary['max_rss_bytes']):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the stage summary of a profiling trace file")
+    parser.add_argument("trace", help="Trace file written by --profile")
+    args = parser.parse_args()
+
+    with open(args.trace, "r", encoding="utf-8") as f:
+        print_summary(json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,14 @@ import csv
 import sys
 import base64
 from pathlib import Path
-from hume import HumeClient
 from hume.tts.types import PostedUtterance, PostedUtteranceVoiceWithId, FormatWav
+from voice_registry import DEFAULT_VOICE, get_client, resolve_voice
+from audio_io import save_generated_audio
+from audio_manifest import record_generated_note
+from tts_text import get_tts_text, load_text_cache
+from tts_retry import AttemptTimer, CircuitOpenError, DeadLetters, RetryError, call_with_retry, print_retry
 
-def resume_audio_generation(csv_file, output_dir, start_index=87, voice_id="e61bbb66-9084-40b7-a4dc-ddd0c62592c9"):
+def resume_audio_generation(csv_file, output_dir, start_index=87, voice_id=DEFAULT_VOICE):
     """
     Resume audio generation from a specific index
     """
@@ -18,8 +22,9 @@ def resume_audio_generation(csv_file, output_dir, start_index=87, voice_id="e61b
     print("")
     
     # Initialize Hume client
-    api_key = os.getenv('HUME_API_KEY', '5sMy54ZASUGzlDJv8f2nOIliS5AqEJmYyhECrA6VqiwZVIFx')
-    client = HumeClient(api_key=api_key)
+    client = get_client()
+    text_cache = load_text_cache()
+    dead_letters = DeadLetters()
     
     # Create output directory
     Path(output_dir).mkdir(parents=True, exist_ok=True)
@@ -35,7 +40,7 @@ def resume_audio_generation(csv_file, output_dir, start_index=87, voice_id="e61b
     
     # Configure voice
     voice = PostedUtteranceVoiceWithId(
-        id=voice_id
+        id=resolve_voice(voice_id, client)
     )
     
     success_count = 0
@@ -53,6 +58,12 @@ def resume_audio_generation(csv_file, output_dir, start_index=87, voice_id="e61b
             print(f"⚠️  Skipping row {actual_index+1}: empty text")
             continue
         
+        # Send the same normalized text as generate-all-years-audio.py
+        text, is_valid, reason = get_tts_text(text, text_cache)
+        if not is_valid:
+            print(f"⚠️  Skipping {filename}: {reason}")
+            continue
+        
         print(f"🎤 Generating audio {actual_index+1}/{len(rows)}: {filename}")
         print(f"   Text: {text[:100]}{'...' if len(text) > 100 else ''}")
         
@@ -63,24 +74,45 @@ def resume_audio_generation(csv_file, output_dir, start_index=87, voice_id="e61b
                 voice=voice
             )
             
-            audio_data = client.tts.synthesize_json(
-                utterances=[utterance],
-                format=FormatWav()
+            # Retried under the shared policy and circuit breaker
+            timer = AttemptTimer(on_retry=print_retry)
+            audio_data, _ = call_with_retry(
+                timer.wrap(lambda: client.tts.synthesize_json(
+                    utterances=[utterance],
+                    format=FormatWav()
+                )),
+                on_retry=timer.on_retry
             )
             
             # Save audio file
-            output_path = os.path.join(output_dir, filename)
             audio_bytes = base64.b64decode(audio_data.generations[0].audio)
-            with open(output_path, 'wb') as f:
-                f.write(audio_bytes)
+            saved = save_generated_audio(output_dir, filename, audio_bytes, audio_data.generations[0].duration)
+            record_generated_note(row, filename, saved)
             
-            print(f"   ✅ Generated: {filename} ({audio_data.generations[0].duration:.2f}s)")
+            print(f"   ✅ Generated: {filename} ({audio_data.generations[0].duration:.2f}s, "
+                  f"request {timer.latency:.2f}s, backoff {timer.backoff:.1f}s)")
             success_count += 1
+            dead_letters.resolve(filename)
             
             # Add a small delay to avoid rate limiting
             import time
             time.sleep(0.1)
             
+        except CircuitOpenError as e:
+            print(f"   🔌 {e} - stopping this run, remaining notes are left for the next one")
+            break
+        except RetryError as e:
+            print(f"   ❌ Failed ({e.category}) after {e.attempts} attempts: {e.last_error}")
+            error_count += 1
+            dead_letters.add({
+                "csv_file": csv_file,
+                "filename": filename,
+                "row": actual_index + 1,
+                "error": f"Audio generation failed: {e.last_error}",
+                "category": e.category,
+                "attempts": e.attempts,
+                "date": row.get('date', 'Unknown')
+            })
         except Exception as e:
             print(f"   ❌ Error: {e}")
             error_count += 1
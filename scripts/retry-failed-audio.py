@@ -1,14 +1,19 @@
 #!/usr/bin/env python3
 
-import os
 import csv
 import sys
-import time
 from pathlib import Path
-from hume import HumeClient
 from hume.tts.types import PostedUtterance, PostedUtteranceVoiceWithId, FormatWav
+from voice_registry import DEFAULT_VOICE, get_client, resolve_voice
+from audio_io import save_generated_audio
+from audio_manifest import record_generated_note
+from tts_text import get_tts_text, load_text_cache
+from tts_retry import (
+    CircuitOpenError, RetryError, RetryPolicy, call_with_retry, load_dead_letters,
+    mark_dead_letter_resolved, print_retry, DEAD_LETTER_FILE,
+)
 
-def retry_failed_audio(filename, output_dir="public/audio/love-notes", voice_id="e61bbb66-9084-40b7-a4dc-ddd0c62592c9", max_retries=3):
+def retry_failed_audio(filename, output_dir="public/audio/love-notes", voice_id=DEFAULT_VOICE, max_retries=5):
     """
     Retry generating a failed audio file with better error handling
     """
@@ -18,8 +23,7 @@ def retry_failed_audio(filename, output_dir="public/audio/love-notes", voice_id=
     print("")
     
     # Initialize Hume client
-    api_key = os.getenv('HUME_API_KEY', '5sMy54ZASUGzlDJv8f2nOIliS5AqEJmYyhECrA6VqiwZVIFx')
-    client = HumeClient(api_key=api_key)
+    client = get_client()
     
     # Create output directory
     Path(output_dir).mkdir(parents=True, exist_ok=True)
@@ -44,59 +48,63 @@ def retry_failed_audio(filename, output_dir="public/audio/love-notes", voice_id=
         print(f"❌ Empty text for {filename}")
         return False
     
+    # Send the same normalized text the batch generator would
+    text, is_valid, reason = get_tts_text(text, load_text_cache())
+    if not is_valid:
+        print(f"❌ {filename} fails validation: {reason}")
+        return False
+    
     print(f"🎤 Generating audio: {filename}")
     print(f"   📊 Text length: {len(text)} characters, {len(text.split())} words")
     print(f"   📅 Date: {row.get('date', 'Unknown')}")
     print(f"   📝 Preview: {text[:100]}...")
     
     # Configure voice
-    voice = PostedUtteranceVoiceWithId(id=voice_id)
+    voice = PostedUtteranceVoiceWithId(id=resolve_voice(voice_id, client))
     
-    for attempt in range(max_retries):
-        try:
-            print(f"   🔄 Attempt {attempt + 1}/{max_retries}...")
-            
-            # Generate audio
-            utterance = PostedUtterance(
-                text=text,
-                voice=voice
-            )
-            
-            audio_data = client.tts.synthesize_json(
+    # Generate audio
+    utterance = PostedUtterance(
+        text=text,
+        voice=voice
+    )
+    
+    try:
+        audio_data, attempts = call_with_retry(
+            lambda: client.tts.synthesize_json(
                 utterances=[utterance],
                 format=FormatWav()
-            )
-            
-            # Save audio file
-            output_path = os.path.join(output_dir, filename)
-            import base64
-            audio_bytes = base64.b64decode(audio_data.generations[0].audio)
-            with open(output_path, 'wb') as f:
-                f.write(audio_bytes)
-            
-            print(f"   ✅ Generated: {filename} ({audio_data.generations[0].duration:.2f}s)")
-            return True
-            
-        except Exception as e:
-            print(f"   ❌ Error (attempt {attempt + 1}): {e}")
-            if attempt < max_retries - 1:
-                wait_time = (2 ** attempt) * 5  # Exponential backoff: 5s, 10s, 20s
-                print(f"   ⏳ Waiting {wait_time}s before retry...")
-                time.sleep(wait_time)
-            else:
-                print(f"   ❌ Failed after {max_retries} attempts")
-                return False
+            ),
+            policy=RetryPolicy(max_attempts=max_retries, base_delay=5.0),
+            on_retry=print_retry
+        )
+    except RetryError as e:
+        print(f"   ❌ Failed ({e.category}) after {e.attempts} attempts: {e.last_error}")
+        return False
+    
+    # Save audio file
+    import base64
+    audio_bytes = base64.b64decode(audio_data.generations[0].audio)
+    saved = save_generated_audio(output_dir, filename, audio_bytes, audio_data.generations[0].duration)
+    record_generated_note(row, filename, saved)
     
-    return False
+    print(f"   ✅ Generated: {filename} ({audio_data.generations[0].duration:.2f}s)")
+    mark_dead_letter_resolved(filename)
+    return True
 
 def main():
     print("🎵 Failed Audio Retry Generator")
     print("=" * 50)
     
-    # Failed files to retry
-    failed_files = [
-        'david-2024-love-note-77950.wav'
-    ]
+    # Failed files to retry: filenames on the command line, otherwise the
+    # dead-letter file (validation failures need a CSV fix, not a retry)
+    if len(sys.argv) > 1:
+        failed_files = sys.argv[1:]
+    else:
+        failed_files = [
+            entry['filename'] for entry in load_dead_letters()
+            if entry.get('filename') and entry.get('category') != 'validation'
+        ]
+        print(f"📝 Found {len(failed_files)} failed notes in {DEAD_LETTER_FILE}")
     
     output_dir = "public/audio/love-notes"
     
@@ -104,10 +112,14 @@ def main():
     error_count = 0
     
     for filename in failed_files:
-        if retry_failed_audio(filename, output_dir):
-            success_count += 1
-        else:
-            error_count += 1
+        try:
+            if retry_failed_audio(filename, output_dir):
+                success_count += 1
+            else:
+                error_count += 1
+        except CircuitOpenError as e:
+            print(f"🔌 {e} - stopping, the API looks unavailable")
+            break
     
     print("")
     print("🎉 Retry generation complete!")
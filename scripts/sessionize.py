@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Split message history into conversation sessions and precompute their stats.
+
+Each chat's messages are sorted by time and split wherever the gap between
+consecutive messages exceeds --gap (default 45 minutes). Splitting and the
+per-session stats are vectorized over the sorted timestamps with numpy:
+message count, duration, who sent what (and how balanced the exchange was),
+text volume, and emotion scores for messages that have been annotated
+(primary_emotion, emotion_intensity, emotion_confidence).
+
+Sessions go into an indexed SQLite table (data/conversation-sessions.db), so
+"our most intense conversations in 2019" is an index range scan:
+
+    python3 scripts/sessionize.py --top 10 --year 2019 --by intensity
+
+Each run also writes data/conversation-sessions.json with the top sessions
+per year by intensity and by length, for the app.
+
+Usage: python3 scripts/sessionize.py --messages data/messages.json [--gap 2700] [--min-messages 4]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+
+import numpy as np
+
+from audio_io import atomic_write_json
+from message_export import is_from_me, message_timestamp, read_message_export
+from profiling import add_profile_arguments, stage, staged, start_profiling
+
+SESSIONS_DB = "data/conversation-sessions.db"
+SESSIONS_EXPORT = "data/conversation-sessions.json"
+
+DEFAULT_GAP = 45 * 60
+DEFAULT_MIN_MESSAGES = 4
+EXPORT_TOP = 25
+
+# --by -> ORDER BY column (each has a matching (year, column) index)
+RANKINGS = {
+    "intensity": "emotion_intensity_mean",
+    "length": "message_count",
+    "duration": "duration_seconds",
+    "balance": "balance",
+}
+
+SCHEMA = """
+CREATE TABLE sessions (
+    id TEXT PRIMARY KEY,
+    chat TEXT,
+    year INTEGER,
+    start_ts REAL,
+    end_ts REAL,
+    start TEXT,
+    end TEXT,
+    duration_seconds REAL,
+    message_count INTEGER,
+    from_me_count INTEGER,
+    balance REAL,
+    chars INTEGER,
+    annotated_count INTEGER,
+    emotion_intensity_mean REAL,
+    emotion_intensity_max REAL,
+    emotion_confidence_mean REAL,
+    dominant_emotion TEXT,
+    first_message_id TEXT,
+    last_message_id TEXT
+);
+CREATE TABLE session_messages (
+    session_id TEXT,
+    position INTEGER,
+    message_id TEXT,
+    PRIMARY KEY (session_id, position)
+);
+CREATE INDEX session_messages_message ON session_messages (message_id);
+CREATE INDEX sessions_start ON sessions (start_ts);
+""" + "".join(
+    f"CREATE INDEX sessions_year_{name} ON sessions (year, {column} DESC);\n" for name, column in RANKINGS.items()
+)
+
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def message_arrays(messages):
+    """
+    Column arrays for the messages that have a timestamp, grouped by chat:
+    {chat: dict of numpy arrays sorted by time}
+    """
+    by_chat = {}
+    for message in messages:
+        timestamp = message_timestamp(message)
+        if timestamp is None:
+            continue
+        chat = message.get("chat_identifier") or message.get("chat_id") or "default"
+        by_chat.setdefault(chat, []).append((
+            timestamp,
+            str(message.get("message_id") or message.get("id")),
+            is_from_me(message),
+            len(message.get("text") or ""),
+            to_float(message.get("emotion_intensity")),
+            to_float(message.get("emotion_confidence")),
+            message.get("primary_emotion") or "",
+        ))
+
+    arrays = {}
+    for chat, rows in by_chat.items():
+        columns = list(zip(*rows))
+        order = np.argsort(np.asarray(columns[0], dtype=np.float64), kind="stable")
+        arrays[chat] = {
+            "ts": np.asarray(columns[0], dtype=np.float64)[order],
+            "id": np.asarray(columns[1], dtype=object)[order],
+            "from_me": np.asarray(columns[2], dtype=bool)[order],
+            "chars": np.asarray(columns[3], dtype=np.int64)[order],
+            "intensity": np.asarray(columns[4], dtype=np.float64)[order],
+            "confidence": np.asarray(columns[5], dtype=np.float64)[order],
+            "emotion": np.asarray(columns[6], dtype=object)[order],
+        }
+    return arrays
+
+
+def sessionize_chat(chat, a, gap=DEFAULT_GAP, min_messages=DEFAULT_MIN_MESSAGES):
+    """
+    Sessions for one chat's time-sorted arrays. Returns (session rows,
+    [(session_id, position, message_id)]).
+    """
+    n = len(a["ts"])
+    # A new session starts at the first message and after every long gap
+    starts = np.flatnonzero(np.concatenate(([True], np.diff(a["ts"]) > gap)))
+    ends = np.append(starts[1:], n)
+    counts = ends - starts
+    labels = np.repeat(np.arange(len(starts)), counts)
+
+    def per_session(values):
+        return np.bincount(labels, weights=values, minlength=len(starts))
+
+    from_me = per_session(a["from_me"].astype(np.float64))
+    chars = per_session(a["chars"].astype(np.float64))
+    annotated = ~np.isnan(a["intensity"])
+    annotated_counts = per_session(annotated.astype(np.float64))
+    intensity_sum = per_session(np.where(annotated, a["intensity"], 0.0))
+    has_confidence = ~np.isnan(a["confidence"])
+    confidence_sum = per_session(np.where(has_confidence, a["confidence"], 0.0))
+    confidence_counts = per_session(has_confidence.astype(np.float64))
+    intensity_max = np.maximum.reduceat(np.where(annotated, a["intensity"], -np.inf), starts)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        intensity_mean = intensity_sum / annotated_counts
+        confidence_mean = confidence_sum / confidence_counts
+    # 1.0 = both sides sent the same number of messages, 0.0 = a monologue
+    balance = 1.0 - np.abs(2.0 * from_me / counts - 1.0)
+
+    sessions = []
+    members = []
+    for i in np.flatnonzero(counts >= min_messages):
+        start, end = starts[i], ends[i]
+        emotions = Counter(e for e in a["emotion"][start:end] if e)
+        session_id = f"{chat}:{int(a['ts'][start])}"
+        started = datetime.fromtimestamp(a["ts"][start], timezone.utc)
+        sessions.append({
+            "id": session_id,
+            "chat": chat,
+            "year": started.year,
+            "start_ts": float(a["ts"][start]),
+            "end_ts": float(a["ts"][end - 1]),
+            "start": started.isoformat(),
+            "end": datetime.fromtimestamp(a["ts"][end - 1], timezone.utc).isoformat(),
+            "duration_seconds": float(a["ts"][end - 1] - a["ts"][start]),
+            "message_count": int(counts[i]),
+            "from_me_count": int(from_me[i]),
+            "balance": round(float(balance[i]), 3),
+            "chars": int(chars[i]),
+            "annotated_count": int(annotated_counts[i]),
+            "emotion_intensity_mean": None if np.isnan(intensity_mean[i]) else round(float(intensity_mean[i]), 4),
+            "emotion_intensity_max": None if np.isinf(intensity_max[i]) else float(intensity_max[i]),
+            "emotion_confidence_mean": None if np.isnan(confidence_mean[i]) else round(float(confidence_mean[i]), 4),
+            "dominant_emotion": emotions.most_common(1)[0][0] if emotions else None,
+            "first_message_id": a["id"][start],
+            "last_message_id": a["id"][end - 1],
+        })
+        members.extend((session_id, position, message_id)
+                       for position, message_id in enumerate(a["id"][start:end]))
+    return sessions, members
+
+
+def write_sessions(sessions, members, db_file=SESSIONS_DB):
+    """Build the session database next to the old one and swap it in atomically"""
+    tmp_file = f"{db_file}.tmp"
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+    os.makedirs(os.path.dirname(db_file) or ".", exist_ok=True)
+    db = sqlite3.connect(tmp_file)
+    db.executescript(SCHEMA)
+    if sessions:
+        columns = list(sessions[0])
+        db.executemany(f"INSERT INTO sessions ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                       [tuple(s[c] for c in columns) for s in sessions])
+    db.executemany("INSERT INTO session_messages (session_id, position, message_id) VALUES (?, ?, ?)", members)
+    db.commit()
+    db.close()
+    os.replace(tmp_file, db_file)
+
+
+def top_sessions(db, by="intensity", year=None, limit=10):
+    """Top sessions by a ranking, served from the (year, column) indexes"""
+    column = RANKINGS[by]
+    query = f"SELECT * FROM sessions WHERE {column} IS NOT NULL"
+    params = []
+    if year is not None:
+        query += " AND year = ?"
+        params.append(year)
+    query += f" ORDER BY {column} DESC LIMIT ?"
+    params.append(limit)
+    return [dict(row) for row in db.execute(query, params)]
+
+
+def export_rankings(db_file=SESSIONS_DB, export_file=SESSIONS_EXPORT, limit=EXPORT_TOP):
+    """Per-year top sessions by intensity and by length, for the app"""
+    db = sqlite3.connect(db_file)
+    db.row_factory = sqlite3.Row
+    years = [row[0] for row in db.execute("SELECT DISTINCT year FROM sessions ORDER BY year")]
+    export = {"generated_at": datetime.now().isoformat(), "years": {}}
+    for year in years:
+        export["years"][str(year)] = {
+            "intensity": top_sessions(db, "intensity", year, limit),
+            "length": top_sessions(db, "length", year, limit),
+        }
+    db.close()
+    atomic_write_json(export_file, export)
+
+
+def print_sessions(sessions):
+    for s in sessions:
+        intensity = f"{s['emotion_intensity_mean']:.2f}" if s["emotion_intensity_mean"] is not None else "-"
+        print(f"   {s['start'][:16]}  {s['message_count']:>4} msgs  {s['duration_seconds'] / 60:>6.0f} min  "
+              f"balance {s['balance']:.2f}  intensity {intensity}  {s['dominant_emotion'] or ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split messages into conversation sessions with precomputed stats")
+    parser.add_argument("--messages", help="Message export (JSON or CSV) to sessionize")
+    parser.add_argument("--gap", type=int, default=DEFAULT_GAP, help="Seconds of silence that end a session")
+    parser.add_argument("--min-messages", type=int, default=DEFAULT_MIN_MESSAGES, help="Smallest session kept")
+    parser.add_argument("--db", default=SESSIONS_DB, help="Session database")
+    parser.add_argument("--top", type=int, help="Show the top N sessions from the database")
+    parser.add_argument("--by", choices=list(RANKINGS), default="intensity", help="Ranking for --top")
+    parser.add_argument("--year", type=int, help="Year for --top")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args, "sessionize")
+
+    if args.top:
+        if not os.path.exists(args.db):
+            print(f"❌ No session database at {args.db} - run with --messages first")
+            sys.exit(1)
+        db = sqlite3.connect(args.db)
+        db.row_factory = sqlite3.Row
+        print(f"🏆 Top {args.top} sessions by {args.by}" + (f" in {args.year}" if args.year else ""))
+        print_sessions(top_sessions(db, args.by, args.year, args.top))
+        return
+
+    if not args.messages:
+        parser.error("--messages is required unless --top is given")
+
+    print("💬 Conversation Sessions")
+    print("=" * 50)
+    with stage("load"):
+        arrays = message_arrays(read_message_export(args.messages))
+    total = sum(len(a["ts"]) for a in arrays.values())
+    print(f"📝 {total} messages in {len(arrays)} chats (gap {args.gap / 60:.0f} min)")
+
+    sessions = []
+    members = []
+    for chat, a in staged("sessionize", arrays.items()):
+        chat_sessions, chat_members = sessionize_chat(chat, a, args.gap, args.min_messages)
+        sessions.extend(chat_sessions)
+        members.extend(chat_members)
+
+    with stage("disk_write"):
+        write_sessions(sessions, members, args.db)
+    with stage("serialization"):
+        export_rankings(args.db)
+    annotated = sum(1 for s in sessions if s["annotated_count"])
+    print(f"✅ {len(sessions)} sessions of {args.min_messages}+ messages ({annotated} with emotion scores)")
+    print(f"💾 Saved to: {args.db} and {SESSIONS_EXPORT}")
+
+
+if __name__ == "__main__":
+    main()
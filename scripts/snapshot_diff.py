@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Find messages that exist in older Messages backups but are gone from newer
+ones, i.e. messages deleted from the live database that a backup still has.
+
+Each chat.db gets a compact summary, cached in data/snapshot-summaries/:
+
+- a Bloom filter of its message GUIDs (--fp-rate, default one in a million)
+- its ROWID ranges as [first, last] runs; message ROWIDs are never reused
+  (AUTOINCREMENT), so a gap is a deleted message
+- a sparse ROWID -> GUID sample, to tell whether two snapshots are copies of
+  the same database (same ROWIDs) or come from different devices
+
+Diffing streams the older database in chunks and tests its GUIDs against the
+newer snapshot's summary, so the newer database never has to be loaded or
+even mounted: a summary file works in its place. A GUID the Bloom filter
+rejects is certainly missing. Between copies of the same database the ROWID
+runs also catch what a Bloom false positive would hide, so the result is
+exact; across devices --verify confirms Bloom hits against the newer
+database (when it is available) with index lookups.
+
+The diff covers every chat, but only messages from the direct Nitzan chats
+(the extractors' filter) are exported, in the extractors' format, to
+data/recovered-messages/<timestamp>.json. The merge
+(ultimate_comprehensive_with_davids_backup.py) reads everything there.
+
+Usage: python3 scripts/snapshot_diff.py old.db [label=older.db ...] newest.db [--against LABEL] [--verify]
+       python3 scripts/snapshot_diff.py --summarize label=chat.db
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import sys
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+from audio_io import atomic_write_json
+from extract_from_davids_backup import DIRECT_NITZAN_CHATS
+from message_export import APPLE_EPOCH
+
+SUMMARY_DIR = "data/snapshot-summaries"
+RECOVERED_DIR = "data/recovered-messages"
+SUMMARY_VERSION = 1
+
+DEFAULT_FP_RATE = 1e-6
+CHUNK_SIZE = 100000
+MAX_ANCHORS = 512
+LINEAGE_AGREEMENT = 0.9
+LOOKUP_BATCH = 500
+
+APPLE_EPOCH_UNIX = APPLE_EPOCH.timestamp()
+
+
+def guid_hashes(guids):
+    """Two independent 64-bit hashes per GUID, as an (n, 2) uint64 array"""
+    digests = b"".join(hashlib.blake2b(g.encode("utf-8"), digest_size=16).digest() for g in guids)
+    return np.frombuffer(digests, dtype="<u8").reshape(-1, 2)
+
+
+class BloomFilter:
+    """
+    Bloom filter over GUIDs with k positions per key from double hashing
+    (h1 + i * h2 mod m), vectorized over chunks of keys
+    """
+
+    def __init__(self, bits, hashes, data=None):
+        self.bits = bits
+        self.hashes = hashes
+        self.data = np.zeros((bits + 7) // 8, dtype=np.uint8) if data is None else data
+
+    @classmethod
+    def for_capacity(cls, count, fp_rate=DEFAULT_FP_RATE):
+        count = max(1, count)
+        bits = max(64, math.ceil(-count * math.log(fp_rate) / math.log(2) ** 2))
+        return cls(bits, max(1, round(bits / count * math.log(2))))
+
+    def _positions(self, guids):
+        h = guid_hashes(guids)
+        steps = np.arange(self.hashes, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            return (h[:, :1] + steps * h[:, 1:]) % np.uint64(self.bits)
+
+    def add(self, guids):
+        if not guids:
+            return
+        positions = self._positions(guids).ravel()
+        np.bitwise_or.at(self.data, positions >> np.uint64(3),
+                         np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+
+    def contains(self, guids):
+        """Boolean array: False means certainly absent"""
+        if not guids:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(guids)
+        hits = (self.data[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return hits.all(axis=1)
+
+    def false_positive_rate(self):
+        """Expected false-positive rate at the current fill"""
+        fill = np.unpackbits(self.data)[:self.bits].mean()
+        return float(fill ** self.hashes)
+
+    def to_json(self):
+        return {
+            "bits": self.bits,
+            "hashes": self.hashes,
+            "data": base64.b64encode(zlib.compress(self.data.tobytes(), 6)).decode("ascii"),
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        raw = np.frombuffer(zlib.decompress(base64.b64decode(data["data"])), dtype=np.uint8).copy()
+        return cls(data["bits"], data["hashes"], raw)
+
+
+def extend_runs(runs, rowids):
+    """Fold sorted ROWIDs into [first, last] runs, continuing the last run"""
+    if len(rowids) == 0:
+        return
+    breaks = np.flatnonzero(np.diff(rowids) != 1)
+    starts = np.concatenate(([rowids[0]], rowids[breaks + 1]))
+    ends = np.concatenate((rowids[breaks], [rowids[-1]]))
+    first = 0
+    if runs and runs[-1][1] + 1 == starts[0]:
+        runs[-1][1] = int(ends[0])
+        first = 1
+    runs.extend([int(s), int(e)] for s, e in zip(starts[first:], ends[first:]))
+
+
+def in_runs(rowids, runs):
+    """Boolean array: which ROWIDs fall inside the runs"""
+    if not runs:
+        return np.zeros(len(rowids), dtype=bool)
+    bounds = np.asarray(runs, dtype=np.int64)
+    index = np.searchsorted(bounds[:, 0], rowids, side="right") - 1
+    inside = index >= 0
+    inside[inside] = rowids[inside] <= bounds[index[inside], 1]
+    return inside
+
+
+def apple_to_unix(dates):
+    """Unix seconds for Apple dates in either encoding (nanoseconds or seconds)"""
+    dates = np.asarray(dates, dtype=np.float64)
+    return np.where(dates > 1e15, dates / 1e9, dates) + APPLE_EPOCH_UNIX
+
+
+def connect_readonly(db_path):
+    return sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+
+
+def stream_messages(db, columns="ROWID, guid"):
+    """Messages in ROWID order, CHUNK_SIZE rows at a time"""
+    cursor = db.execute(f"SELECT {columns} FROM message WHERE guid IS NOT NULL ORDER BY ROWID")
+    while True:
+        rows = cursor.fetchmany(CHUNK_SIZE)
+        if not rows:
+            return
+        yield rows
+
+
+def summarize(db_path, label, fp_rate=DEFAULT_FP_RATE):
+    """Bloom filter, ROWID runs, date range and ROWID/GUID sample for one database"""
+    db = connect_readonly(db_path)
+    count, max_rowid = db.execute("SELECT COUNT(*), MAX(ROWID) FROM message WHERE guid IS NOT NULL").fetchone()
+    # Power-of-two strides, so any two snapshots' samples share the coarser one's ROWIDs
+    stride = 1 << max(0, math.ceil(math.log2(max(1, (max_rowid or 0) / MAX_ANCHORS))))
+    bloom = BloomFilter.for_capacity(count, fp_rate)
+    runs = []
+    anchors = {}
+    date_min = date_max = None
+
+    for rows in stream_messages(db, "ROWID, guid, date"):
+        rowids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        guids = [r[1] for r in rows]
+        bloom.add(guids)
+        extend_runs(runs, rowids)
+        for i in np.flatnonzero(rowids % stride == 0):
+            anchors[str(rowids[i])] = guids[i]
+        dates = [r[2] for r in rows if r[2]]
+        if dates:
+            unix = apple_to_unix(dates)
+            date_min = min(date_min or unix.min(), unix.min())
+            date_max = max(date_max or unix.max(), unix.max())
+    db.close()
+
+    stat = os.stat(db_path)
+    return {
+        "version": SUMMARY_VERSION,
+        "label": label,
+        "path": os.path.abspath(db_path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "created_at": datetime.now().isoformat(),
+        "messages": count,
+        "rowid_min": runs[0][0] if runs else None,
+        "rowid_max": runs[-1][1] if runs else None,
+        "rowid_runs": runs,
+        "rowid_gaps": (runs[-1][1] - runs[0][0] + 1 - count) if runs else 0,
+        "date_min": float(date_min) if date_min is not None else None,
+        "date_max": float(date_max) if date_max is not None else None,
+        "anchors": anchors,
+        "fp_rate": fp_rate,
+        "bloom": bloom.to_json(),
+    }
+
+
+def summary_file(label, summary_dir=SUMMARY_DIR):
+    return os.path.join(summary_dir, f"{label}.json")
+
+
+def load_summary(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_summary(db_path, label, fp_rate=DEFAULT_FP_RATE, rebuild=False, summary_dir=SUMMARY_DIR):
+    """Cached summary for a database, rebuilt when the file or the settings changed"""
+    cache = summary_file(label, summary_dir)
+    if not rebuild and os.path.exists(cache):
+        summary = load_summary(cache)
+        stat = os.stat(db_path)
+        if (summary.get("version") == SUMMARY_VERSION and summary["path"] == os.path.abspath(db_path)
+                and summary["size"] == stat.st_size and summary["mtime"] == stat.st_mtime
+                and summary["fp_rate"] == fp_rate):
+            return summary
+    summary = summarize(db_path, label, fp_rate)
+    atomic_write_json(cache, summary, indent=None)
+    return summary
+
+
+def same_lineage(a, b):
+    """True if two snapshots are copies of one database (their ROWIDs name the same messages)"""
+    shared = set(a["anchors"]) & set(b["anchors"])
+    if not shared:
+        return False
+    agree = sum(1 for rowid in shared if a["anchors"][rowid] == b["anchors"][rowid])
+    return agree / len(shared) >= LINEAGE_AGREEMENT
+
+
+def present_in_db(db, guids):
+    """Boolean array: which GUIDs the database has (unique-index lookups)"""
+    found = set()
+    for i in range(0, len(guids), LOOKUP_BATCH):
+        batch = guids[i:i + LOOKUP_BATCH]
+        query = f"SELECT guid FROM message WHERE guid IN ({', '.join('?' for _ in batch)})"
+        found.update(row[0] for row in db.execute(query, batch))
+    return np.fromiter((g in found for g in guids), dtype=bool, count=len(guids))
+
+
+def diff_snapshot(older_db, older, newer, newer_db=None, verify=False):
+    """
+    ROWIDs of the older snapshot's messages that the newer one lacks, and
+    the stats of the comparison
+    """
+    lineage = same_lineage(older, newer)
+    bloom = BloomFilter.from_json(newer["bloom"])
+    runs = newer["rowid_runs"]
+    verify_db = connect_readonly(newer_db) if verify and newer_db and not lineage else None
+
+    missing = []
+    checked = 0
+    db = connect_readonly(older_db)
+    for rows in stream_messages(db):
+        rowids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        guids = [r[1] for r in rows]
+        absent = ~bloom.contains(guids)
+        if lineage:
+            absent |= ~in_runs(rowids, runs)
+        elif verify_db is not None:
+            maybe = np.flatnonzero(~absent)
+            absent[maybe] = ~present_in_db(verify_db, [guids[i] for i in maybe])
+        checked += len(rows)
+        missing.extend(int(r) for r in rowids[absent])
+    db.close()
+    if verify_db is not None:
+        verify_db.close()
+
+    exact = lineage or verify_db is not None
+    return missing, {
+        "against": newer["label"],
+        "checked": checked,
+        "missing": len(missing),
+        "same_database": lineage,
+        "exact": exact,
+        # Bloom false positives hide deleted messages at this expected count
+        "expected_undetected": 0 if exact else round((checked - len(missing)) * bloom.false_positive_rate(), 3),
+    }
+
+
+def fetch_messages(db_path, rowids, source):
+    """
+    Full rows for those of the given ROWIDs that belong to a direct Nitzan
+    chat, in the extractors' export format
+    """
+    db = connect_readonly(db_path)
+    messages = []
+    for i in range(0, len(rowids), LOOKUP_BATCH):
+        batch = rowids[i:i + LOOKUP_BATCH]
+        query = f"""
+            SELECT m.ROWID, m.guid, m.text, m.date, m.date_read, m.is_from_me, m.service, m.account,
+                   h.id, c.chat_identifier
+            FROM message m
+            LEFT JOIN handle h ON m.handle_id = h.ROWID
+            JOIN chat_message_join cmj ON cmj.message_id = m.ROWID
+            JOIN chat c ON c.ROWID = cmj.chat_id
+            WHERE m.ROWID IN ({', '.join('?' for _ in batch)})
+              AND {DIRECT_NITZAN_CHATS}
+            GROUP BY m.ROWID
+        """
+        for rowid, guid, text, date, date_read, from_me, service, account, handle, chat in db.execute(query, batch):
+            readable = datetime.fromtimestamp(float(apple_to_unix([date])[0])).isoformat() if date else None
+            messages.append({
+                "message_id": rowid,
+                "guid": guid,
+                "text": text or "",
+                "date": readable,
+                "date_read": datetime.fromtimestamp(float(apple_to_unix([date_read])[0])).isoformat() if date_read else None,
+                "is_from_me": "David" if from_me else "Nitzan",
+                "sender": "David" if from_me else (handle or "Nitzan"),
+                "recipient": (handle or "Nitzan") if from_me else "David",
+                "emojis": None,
+                "links": None,
+                "service": service,
+                "account": account,
+                "contact_id": "David" if from_me else (handle or "Nitzan"),
+                "readable_date": readable,
+                "apple_date": date,
+                "apple_date_read": date_read,
+                "source": source,
+                "chat_identifier": chat,
+            })
+    db.close()
+    return messages
+
+
+def parse_snapshot(arg):
+    """label=path or path (label from the file name); path may be a summary .json"""
+    label, sep, path = arg.partition("=")
+    if not sep:
+        path = arg
+        label = os.path.splitext(os.path.basename(os.path.dirname(os.path.abspath(path))
+                                                  if os.path.basename(path) == "chat.db" else path))[0]
+    return label, path
+
+
+def format_date(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d") if ts else "?"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recover messages deleted since older backups by diffing snapshots")
+    parser.add_argument("snapshots", nargs="+",
+                        help="chat.db files or cached summary .json files, as [label=]path")
+    parser.add_argument("--against", help="Label of the snapshot to diff against (default: the newest)")
+    parser.add_argument("--fp-rate", type=float, default=DEFAULT_FP_RATE, help="Bloom filter false-positive rate")
+    parser.add_argument("--verify", action="store_true",
+                        help="Confirm Bloom hits against the newer database when it comes from another device")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild cached summaries")
+    parser.add_argument("--summarize", action="store_true", help="Only build the summaries")
+    parser.add_argument("--output", help="Export file (default: data/recovered-messages/<timestamp>.json)")
+    args = parser.parse_args()
+
+    print("🗃️  Snapshot Diff")
+    print("=" * 50)
+
+    snapshots = []
+    for label, path in map(parse_snapshot, args.snapshots):
+        if path.endswith(".json"):
+            summary, db_path = load_summary(path), None
+            label = summary["label"]
+        elif os.path.exists(path):
+            summary, db_path = get_summary(path, label, args.fp_rate, args.rebuild), path
+        else:
+            print(f"❌ Not found: {path}")
+            sys.exit(1)
+        snapshots.append({"label": label, "db": db_path, "summary": summary})
+        print(f"📸 {label}: {summary['messages']:,} messages, {format_date(summary['date_min'])} → "
+              f"{format_date(summary['date_max'])}, ROWIDs {summary['rowid_min']}-{summary['rowid_max']} "
+              f"({summary['rowid_gaps']:,} gaps)" + ("" if db_path else "  [summary only]"))
+
+    if args.summarize:
+        print(f"💾 Summaries in {SUMMARY_DIR}")
+        return
+    if len(snapshots) < 2:
+        parser.error("need at least two snapshots to diff")
+
+    snapshots.sort(key=lambda s: (s["summary"]["date_max"] or 0, s["summary"]["rowid_max"] or 0))
+    target = snapshots[-1]
+    if args.against:
+        matches = [s for s in snapshots if s["label"] == args.against]
+        if not matches:
+            parser.error(f"no snapshot labelled {args.against}")
+        target = matches[0]
+    print(f"🎯 Diffing against {target['label']}")
+    print("")
+
+    recovered = {}
+    stats = []
+    for snapshot in snapshots:
+        if snapshot is target:
+            continue
+        if snapshot["db"] is None:
+            print(f"⚠️  {snapshot['label']}: summary only, its messages can't be exported - skipping")
+            continue
+        missing, result = diff_snapshot(snapshot["db"], snapshot["summary"], target["summary"],
+                                        target["db"], args.verify)
+        direct = fetch_messages(snapshot["db"], missing, snapshot["label"])
+        result["label"] = snapshot["label"]
+        result["direct_nitzan"] = len(direct)
+        stats.append(result)
+        mode = "same database, exact" if result["same_database"] else (
+            "other device, verified" if result["exact"] else
+            f"other device, ~{result['expected_undetected']} may be undetected")
+        print(f"🔍 {snapshot['label']}: {result['missing']:,} of {result['checked']:,} messages missing ({mode}), "
+              f"{len(direct):,} in direct Nitzan chats")
+        for message in direct:
+            if message["guid"] in recovered:
+                recovered[message["guid"]]["found_in"].append(snapshot["label"])
+                continue
+            message["found_in"] = [snapshot["label"]]
+            message["missing_from"] = target["label"]
+            recovered[message["guid"]] = message
+
+    messages = sorted(recovered.values(), key=lambda m: m["apple_date"] or 0)
+    by_year = {}
+    for message in messages:
+        year = (message["readable_date"] or "unknown")[:4]
+        by_year[year] = by_year.get(year, 0) + 1
+
+    output = args.output or os.path.join(RECOVERED_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    atomic_write_json(output, {
+        "generated_at": datetime.now().isoformat(),
+        "target": target["label"],
+        "snapshots": stats,
+        "messages": messages,
+    })
+
+    print("")
+    print(f"✅ {len(messages):,} unique direct Nitzan messages present in older snapshots but missing from {target['label']}")
+    for year, count in sorted(by_year.items()):
+        print(f"   {year}: {count:,}")
+    print(f"💾 Saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
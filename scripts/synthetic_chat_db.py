@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Generate a realistic synthetic Messages chat.db for benchmarks and tests.
+
+Writes the tables the extractors read (handle, chat, chat_handle_join,
+message, chat_message_join, attachment, message_attachment_join) with the
+same column names and date encodings as a real macOS/iOS database:
+
+- Dates are seconds since 2001-01-01 for the oldest messages (pre-High
+  Sierra databases) and nanoseconds for the rest, so readers must handle both.
+- Messages arrive in conversations: bursts of replies seconds to minutes
+  apart, separated by hours or days of silence.
+- The main chat is a direct chat with Nitzan's number, so the extractors'
+  chat filters pick it up; other direct and group chats add noise.
+- Some messages are long love notes, some are empty with an attachment.
+
+Generation is deterministic for a given --seed and streams rows in batches,
+so 5M messages take a few hundred MB of disk but little memory.
+
+Usage: python3 scripts/synthetic_chat_db.py OUTPUT.db [--messages 10000] [--seconds-fraction 0.2] [--seed 0]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+import uuid
+from array import array
+from datetime import datetime, timezone
+
+APPLE_EPOCH_UNIX = 978307200
+NITZAN_HANDLE = "+19172390518"
+DAVID_ACCOUNT = "e:david@steuer.com"
+BATCH_SIZE = 20000
+
+START_DATE = datetime(2015, 1, 1, tzinfo=timezone.utc)
+END_DATE = datetime(2025, 6, 1, tzinfo=timezone.utc)
+# Mean of the reply gaps inside a burst: uniform(2, 60) or uniform(60, 900)
+MEAN_REPLY_GAP = (31 + 480) / 2
+
+SCHEMA = """
+CREATE TABLE handle (
+    ROWID INTEGER PRIMARY KEY AUTOINCREMENT UNIQUE,
+    id TEXT NOT NULL,
+    country TEXT,
+    service TEXT NOT NULL,
+    uncanonicalized_id TEXT,
+    person_centric_id TEXT
+);
+CREATE TABLE chat (
+    ROWID INTEGER PRIMARY KEY AUTOINCREMENT,
+    guid TEXT UNIQUE NOT NULL,
+    style INTEGER,
+    state INTEGER,
+    account_id TEXT,
+    chat_identifier TEXT,
+    service_name TEXT,
+    room_name TEXT,
+    account_login TEXT,
+    is_archived INTEGER DEFAULT 0,
+    display_name TEXT,
+    group_id TEXT,
+    last_read_message_timestamp INTEGER DEFAULT 0
+);
+CREATE TABLE chat_handle_join (
+    chat_id INTEGER REFERENCES chat (ROWID) ON DELETE CASCADE,
+    handle_id INTEGER REFERENCES handle (ROWID) ON DELETE CASCADE,
+    UNIQUE (chat_id, handle_id)
+);
+CREATE TABLE message (
+    ROWID INTEGER PRIMARY KEY AUTOINCREMENT,
+    guid TEXT UNIQUE NOT NULL,
+    text TEXT,
+    replace INTEGER DEFAULT 0,
+    service_center TEXT,
+    handle_id INTEGER DEFAULT 0,
+    subject TEXT,
+    country TEXT,
+    attributedBody BLOB,
+    version INTEGER DEFAULT 0,
+    type INTEGER DEFAULT 0,
+    service TEXT,
+    account TEXT,
+    account_guid TEXT,
+    error INTEGER DEFAULT 0,
+    date INTEGER,
+    date_read INTEGER,
+    date_delivered INTEGER,
+    is_delivered INTEGER DEFAULT 0,
+    is_finished INTEGER DEFAULT 0,
+    is_from_me INTEGER DEFAULT 0,
+    is_read INTEGER DEFAULT 0,
+    is_sent INTEGER DEFAULT 0,
+    cache_has_attachments INTEGER DEFAULT 0,
+    associated_message_guid TEXT,
+    associated_message_type INTEGER DEFAULT 0,
+    thread_originator_guid TEXT
+);
+CREATE TABLE chat_message_join (
+    chat_id INTEGER REFERENCES chat (ROWID) ON DELETE CASCADE,
+    message_id INTEGER REFERENCES message (ROWID) ON DELETE CASCADE,
+    message_date INTEGER DEFAULT 0,
+    PRIMARY KEY (chat_id, message_id)
+);
+CREATE TABLE attachment (
+    ROWID INTEGER PRIMARY KEY AUTOINCREMENT,
+    guid TEXT UNIQUE NOT NULL,
+    created_date INTEGER DEFAULT 0,
+    start_date INTEGER DEFAULT 0,
+    filename TEXT,
+    uti TEXT,
+    mime_type TEXT,
+    transfer_state INTEGER DEFAULT 0,
+    is_outgoing INTEGER DEFAULT 0,
+    transfer_name TEXT,
+    total_bytes INTEGER DEFAULT 0
+);
+CREATE TABLE message_attachment_join (
+    message_id INTEGER REFERENCES message (ROWID) ON DELETE CASCADE,
+    attachment_id INTEGER REFERENCES attachment (ROWID) ON DELETE CASCADE,
+    UNIQUE (message_id, attachment_id)
+);
+CREATE INDEX chat_message_join_idx_message_id_only ON chat_message_join (message_id);
+CREATE INDEX chat_message_join_idx_message_date_id_chat_id ON chat_message_join (chat_id, message_date, message_id);
+CREATE INDEX message_idx_date ON message (date);
+CREATE INDEX message_idx_handle ON message (handle_id, date);
+CREATE INDEX message_attachment_join_idx_message_id ON message_attachment_join (message_id);
+"""
+
+WORDS = (
+    "love you miss today tonight dinner home work babe sweetheart call later soon morning "
+    "thinking about how was your day kids pick up at school coffee sleep well dream heart "
+    "beautiful always forever together weekend plans movie walk park happy proud grateful "
+    "sorry late meeting running train flight landed safe hug kiss laugh remember when we"
+).split()
+SHORT_REPLIES = ["ok", "❤️", "😂", "yes!", "on my way", "love you", "haha", "sounds good", "👍", "miss you", "🥰"]
+LOVE_NOTE_OPENERS = [
+    "I was just thinking about",
+    "Every day with you reminds me",
+    "I don't say it enough, but",
+    "Watching you with the kids today,",
+    "Ten years from now I want us to still",
+]
+ATTACHMENTS = [
+    ("public.jpeg", "image/jpeg", ".jpg", (400_000, 4_000_000)),
+    ("public.heic", "image/heic", ".HEIC", (800_000, 3_000_000)),
+    ("com.apple.quicktime-movie", "video/quicktime", ".MOV", (2_000_000, 60_000_000)),
+    ("public.png", "image/png", ".png", (100_000, 2_000_000)),
+]
+
+
+def apple_time(unix_seconds, nanoseconds):
+    """Apple Messages date value in either encoding"""
+    seconds = unix_seconds - APPLE_EPOCH_UNIX
+    return int(seconds * 1_000_000_000) if nanoseconds else int(seconds)
+
+
+def message_text(rng):
+    """A message body: mostly short, sometimes a paragraph-long love note"""
+    roll = rng.random()
+    if roll < 0.35:
+        return rng.choice(SHORT_REPLIES)
+    if roll < 0.97:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 25)))
+    words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(30, 120)))
+    return f"{rng.choice(LOVE_NOTE_OPENERS)} {words}. ❤️"
+
+
+def conversation_times(rng, count, start, end):
+    """
+    `count` ascending Unix timestamps between start and end, arriving in
+    conversational bursts
+    """
+    span = end - start
+    sessions = max(1, count // 12)
+    # Replies within a burst take MEAN_REPLY_GAP on average; squeeze them when
+    # a large count would otherwise need more than half the span, and share
+    # what's left between the bursts
+    reply_scale = min(1.0, 0.5 * span / (count * MEAN_REPLY_GAP)) if count else 1.0
+    gap = (span - count * MEAN_REPLY_GAP * reply_scale) / sessions
+    times = array("d")
+    t = start
+    while len(times) < count:
+        t += rng.expovariate(1.0 / gap) * 0.9
+        for _ in range(min(count - len(times), max(1, int(rng.expovariate(1.0 / 12))))):
+            t += rng.choice((rng.uniform(2, 60), rng.uniform(60, 900))) * reply_scale
+            times.append(t)
+    # Random variation can still run past the end: rescale rather than clamp
+    if times and times[-1] > end:
+        factor = span / (times[-1] - start)
+        for i, t in enumerate(times):
+            times[i] = start + (t - start) * factor
+    yield from times
+
+
+def create_chats(db, rng, group_chats=3, other_chats=6):
+    """
+    Handles and chats: the main Nitzan chat first, then other direct chats
+    and group chats. Returns [(chat_rowid, [handle rowids], weight)].
+    """
+    handles = [(NITZAN_HANDLE, "iMessage"), ("nitzan.pelman@icloud.com", "iMessage")]
+    handles += [(f"+1212555{1000 + i:04d}", "iMessage" if i % 3 else "SMS") for i in range(other_chats + group_chats * 2)]
+    db.executemany("INSERT INTO handle (id, country, service, uncanonicalized_id) VALUES (?, 'us', ?, ?)",
+                   [(h, s, h) for h, s in handles])
+
+    chats = []
+
+    def add_chat(identifier, handle_ids, style, display_name, weight):
+        guid = f"iMessage;{'+' if style == 43 else '-'};{identifier}"
+        cursor = db.execute(
+            "INSERT INTO chat (guid, style, state, chat_identifier, service_name, account_login, display_name, is_archived) "
+            "VALUES (?, ?, 3, ?, 'iMessage', ?, ?, ?)",
+            (guid, style, identifier, DAVID_ACCOUNT, display_name, int(rng.random() < 0.1)),
+        )
+        db.executemany("INSERT INTO chat_handle_join (chat_id, handle_id) VALUES (?, ?)",
+                       [(cursor.lastrowid, h) for h in handle_ids])
+        chats.append((cursor.lastrowid, handle_ids, weight))
+
+    add_chat(NITZAN_HANDLE, [1], 45, "", 0.7)
+    add_chat("nitzan.pelman@icloud.com", [2], 45, None, 0.05)
+    for i in range(other_chats):
+        add_chat(handles[2 + i][0], [3 + i], 45, None, 0.15 / other_chats)
+    for i in range(group_chats):
+        members = [1, 3 + other_chats + 2 * i, 4 + other_chats + 2 * i]
+        add_chat(f"chat{rng.randrange(10**17, 10**18)}", members, 43, f"Group {i + 1}", 0.1 / group_chats)
+    return chats
+
+
+def generate(path, messages=10000, seconds_fraction=0.2, attachment_rate=0.04, seed=0):
+    """Write a synthetic chat.db with `messages` messages. Returns a stats dict."""
+    rng = random.Random(seed)
+    if os.path.exists(path):
+        os.remove(path)
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA journal_mode=OFF")
+    db.execute("PRAGMA synchronous=OFF")
+    db.executescript(SCHEMA)
+
+    chats = create_chats(db, rng)
+    start, end = START_DATE.timestamp(), END_DATE.timestamp()
+    # Old databases stored seconds; messages before this point use them
+    seconds_until = start + (end - start) * seconds_fraction
+
+    # Split the total across chats by weight, then generate each chat's timeline
+    weights = [w for _, _, w in chats]
+    counts = [int(messages * w / sum(weights)) for w in weights]
+    counts[0] += messages - sum(counts)
+
+    message_rowid = attachment_rowid = 0
+    stats = {"messages": 0, "attachments": 0, "seconds_dates": 0, "nanosecond_dates": 0}
+    for (chat_id, handle_ids, _), count in zip(chats, counts):
+        message_rows, join_rows, attachment_rows, attachment_joins = [], [], [], []
+
+        def flush():
+            db.executemany(
+                "INSERT INTO message (ROWID, guid, text, handle_id, service, account, date, date_read, date_delivered, "
+                "is_delivered, is_finished, is_from_me, is_read, is_sent, cache_has_attachments) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1, 1, ?, ?, ?, ?)", message_rows)
+            db.executemany("INSERT INTO chat_message_join (chat_id, message_id, message_date) VALUES (?, ?, ?)", join_rows)
+            db.executemany(
+                "INSERT INTO attachment (ROWID, guid, created_date, filename, uti, mime_type, transfer_state, is_outgoing, "
+                "transfer_name, total_bytes) VALUES (?, ?, ?, ?, ?, ?, 5, ?, ?, ?)", attachment_rows)
+            db.executemany("INSERT INTO message_attachment_join (message_id, attachment_id) VALUES (?, ?)", attachment_joins)
+            for rows in (message_rows, join_rows, attachment_rows, attachment_joins):
+                rows.clear()
+
+        for t in conversation_times(rng, count, start, end):
+            message_rowid += 1
+            nanoseconds = t >= seconds_until
+            stats["nanosecond_dates" if nanoseconds else "seconds_dates"] += 1
+            from_me = rng.random() < 0.5
+            date = apple_time(t, nanoseconds)
+            date_read = apple_time(t + rng.uniform(1, 3600), nanoseconds)
+            has_attachment = rng.random() < attachment_rate
+            text = None if has_attachment and rng.random() < 0.6 else message_text(rng)
+            message_rows.append((
+                message_rowid, str(uuid.UUID(int=rng.getrandbits(128))).upper(), text,
+                0 if from_me else rng.choice(handle_ids), "iMessage", DAVID_ACCOUNT,
+                date, date_read, date, int(from_me), int(not from_me), int(from_me), int(has_attachment),
+            ))
+            join_rows.append((chat_id, message_rowid, date))
+            if has_attachment:
+                attachment_rowid += 1
+                uti, mime, extension, (low, high) = rng.choice(ATTACHMENTS)
+                name = f"IMG_{rng.randrange(10000):04d}{extension}"
+                attachment_rows.append((
+                    attachment_rowid, str(uuid.UUID(int=rng.getrandbits(128))).upper(), apple_time(t, False),
+                    f"~/Library/Messages/Attachments/{attachment_rowid % 256:02x}/{attachment_rowid:02d}/{name}",
+                    uti, mime, int(from_me), name, rng.randint(low, high),
+                ))
+                attachment_joins.append((message_rowid, attachment_rowid))
+                stats["attachments"] += 1
+            if len(message_rows) >= BATCH_SIZE:
+                flush()
+        flush()
+        stats["messages"] += count
+
+    db.commit()
+    db.close()
+    stats["bytes"] = os.path.getsize(path)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Messages chat.db")
+    parser.add_argument("output", help="Database file to write (replaced if it exists)")
+    parser.add_argument("--messages", type=int, default=10000, help="Number of messages (10k to 5M)")
+    parser.add_argument("--seconds-fraction", type=float, default=0.2,
+                        help="Share of the timeline (oldest first) stored with second-resolution dates")
+    parser.add_argument("--attachment-rate", type=float, default=0.04, help="Share of messages with an attachment")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if os.path.dirname(args.output) and not os.path.isdir(os.path.dirname(args.output)):
+        print(f"❌ Directory not found: {os.path.dirname(args.output)}")
+        sys.exit(1)
+
+    print(f"🧪 Generating {args.messages:,} synthetic messages → {args.output}")
+    started = time.perf_counter()
+    stats = generate(args.output, args.messages, args.seconds_fraction, args.attachment_rate, args.seed)
+    print(f"✅ {stats['messages']:,} messages, {stats['attachments']:,} attachments "
+          f"({stats['seconds_dates']:,} second / {stats['nanosecond_dates']:,} nanosecond dates), "
+          f"{stats['bytes'] / 1024 / 1024:.1f} MB in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 import os
-from hume import HumeClient
+from voice_registry import get_client
 
 def test_hume_simple():
     print("🎤 Testing Hume TTS with simple approach...")
@@ -12,7 +12,7 @@ def test_hume_simple():
     
     try:
         # Initialize the client
-        client = HumeClient(api_key=api_key)
+        client = get_client()
         print("✅ Client initialized successfully")
         
         # Test getting available voices
@@ -4,6 +4,7 @@ import os
 import sys
 from hume import HumeClient
 from hume.models.config import TTSConfig
+from voice_registry import get_registry
 
 def test_hume_tts():
     print("🎤 Testing Hume TTS with Python client...")
@@ -20,20 +21,20 @@ def test_hume_tts():
         
         # Test getting available voices
         print("\n🔍 Testing voice list...")
-        voices = client.tts.list_voices()
+        voices = get_registry(client)["voices"]
         print(f"✅ Found {len(voices)} voices:")
         
         for i, voice in enumerate(voices):
-            print(f"   {i+1}. {voice.name} (ID: {voice.voice_id})")
+            print(f"   {i+1}. {voice['name']} (ID: {voice['id']})")
             
             # Look for David2 voice
-            if voice.name == 'David2' or 'david2' in voice.name.lower():
-                print(f"   🎯 Found David2 voice: {voice.voice_id}")
+            if 'david2' in (voice['name'] or '').lower():
+                print(f"   🎯 Found David2 voice: {voice['id']}")
         
         # Test TTS generation
         print("\n🎤 Testing TTS generation...")
         config = TTSConfig(
-            voice_id=voices[0].voice_id if voices else "pNInz6obpgDQGcFmaJgB",
+            voice_id=voices[0]['id'] if voices else "pNInz6obpgDQGcFmaJgB",
             model_id="eleven_turbo_v2"
         )
         
@@ -3,19 +3,18 @@
 import os
 import base64
 from pathlib import Path
-from hume import HumeClient
 from hume.tts.types import PostedUtterance, PostedUtteranceVoiceWithId, FormatWav
+from voice_registry import get_client, resolve_voice
 
 def test_single_audio():
     print("🎤 Testing single audio generation...")
     
     # Initialize Hume client
-    api_key = os.getenv('HUME_API_KEY', '5sMy54ZASUGzlDJv8f2nOIliS5AqEJmYyhECrA6VqiwZVIFx')
-    client = HumeClient(api_key=api_key)
+    client = get_client()
     
     # Configure voice
     voice = PostedUtteranceVoiceWithId(
-        id="e61bbb66-9084-40b7-a4dc-ddd0c62592c9"  # David2 voice
+        id=resolve_voice("David2", client)
     )
     
     # Test text
@@ -34,8 +33,8 @@ def test_single_audio():
             format=FormatWav()
         )
         
-        # Save audio file
-        output_dir = "public/audio/love-notes"
+        # Save audio file outside the production audio directory
+        output_dir = "data/voice-comparison"
         Path(output_dir).mkdir(parents=True, exist_ok=True)
         
         output_path = os.path.join(output_dir, "test-david2-voice.wav")
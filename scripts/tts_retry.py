@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Shared retry policy for Hume TTS calls.
+
+Classifies errors (rate limited / transient / permanent), honors Retry-After,
+applies jittered exponential backoff and trips a process-wide circuit breaker
+so a run stops calling the API during an outage. Notes that fail permanently
+are appended to a dead-letter file instead of a per-run error log, once per
+note until it is resolved.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+DEAD_LETTER_FILE = "data/audio-dead-letter.jsonl"
+
+RATE_LIMITED = "rate_limited"
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+# Status codes worth retrying; every other 4xx means the request itself is bad
+TRANSIENT_STATUS_CODES = {408, 409, 425, 500, 502, 503, 504}
+
+# Exception class names raised by requests/httpx/urllib3 for network failures
+TRANSIENT_EXCEPTION_NAMES = {
+    "ConnectionError", "ConnectTimeout", "ReadTimeout", "Timeout", "TimeoutException",
+    "TransportError", "RemoteProtocolError", "ProtocolError", "ChunkedEncodingError",
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker is open and calls are being refused"""
+
+    def __init__(self, retry_in):
+        super().__init__(f"Circuit breaker open, retry in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+class RetryError(Exception):
+    """Raised when a call has failed permanently or exhausted its retries"""
+
+    def __init__(self, last_error, category, attempts):
+        super().__init__(f"{category} after {attempts} attempt(s): {last_error}")
+        self.last_error = last_error
+        self.category = category
+        self.attempts = attempts
+
+
+def get_status_code(error):
+    """Get the HTTP status code from an SDK or HTTP client exception, if any"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None) or getattr(response, "status", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def get_retry_after(error):
+    """
+    Get the Retry-After delay in seconds from an exception, if the server sent one
+    """
+    headers = getattr(error, "headers", None)
+    if headers is None:
+        headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    value = None
+    for key in headers:
+        if str(key).lower() == "retry-after":
+            value = headers[key]
+            break
+    if value is None:
+        return None
+
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    # HTTP-date form (email.utils is slow to import, and rarely needed)
+    from email.utils import parsedate_to_datetime
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(error):
+    """
+    Classify an exception as RATE_LIMITED, TRANSIENT or PERMANENT
+    """
+    status = get_status_code(error)
+    if status == 429:
+        return RATE_LIMITED
+    if status is not None:
+        if status in TRANSIENT_STATUS_CODES or status >= 500:
+            return TRANSIENT
+        if 400 <= status < 500:
+            return PERMANENT
+
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return TRANSIENT
+    if type(error).__name__ in TRANSIENT_EXCEPTION_NAMES:
+        return TRANSIENT
+    if isinstance(error, (ValueError, TypeError, KeyError)):
+        return PERMANENT
+
+    # Unknown failures get the benefit of the doubt, bounded by max_attempts
+    return TRANSIENT
+
+
+class RetryPolicy:
+    """Backoff schedule shared by all generators"""
+
+    def __init__(self, max_attempts=5, base_delay=1.0, max_delay=60.0, max_retry_after=300.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    def compute_delay(self, attempt, retry_after=None):
+        """
+        Delay before retrying after the given (0-based) failed attempt.
+        Uses full jitter; a server Retry-After is treated as a lower bound.
+        """
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = random.uniform(0, cap)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_retry_after))
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker.
+
+    Opens after `failure_threshold` consecutive transient failures, refuses calls
+    for `reset_timeout` seconds, then lets a single probe call through.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call should not go out"""
+        with self._lock:
+            if self.state == self.OPEN:
+                elapsed = time.monotonic() - self.opened_at
+                if elapsed < self.reset_timeout:
+                    raise CircuitOpenError(self.reset_timeout - elapsed)
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    raise CircuitOpenError(self.reset_timeout)
+                self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"   🔌 Circuit breaker opened after {self.consecutive_failures} consecutive failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+_circuit_breaker = CircuitBreaker()
+
+
+def get_circuit_breaker():
+    """Return the process-wide circuit breaker shared by all TTS calls"""
+    return _circuit_breaker
+
+
+def call_with_retry(func, policy=None, breaker=None, on_retry=None):
+    """
+    Call `func()` under the retry policy and circuit breaker.
+
+    Returns (result, attempts). Raises RetryError when the call fails permanently
+    or runs out of attempts, and CircuitOpenError when the breaker refuses it.
+    `on_retry(attempt, error, category, delay)` is called before each backoff sleep.
+    """
+    policy = policy or RetryPolicy()
+    breaker = breaker or get_circuit_breaker()
+
+    for attempt in range(policy.max_attempts):
+        breaker.before_call()
+        try:
+            result = func()
+        except Exception as e:
+            category = classify_error(e)
+            if category == PERMANENT:
+                # The API is healthy, the request is not; don't count it against the breaker
+                breaker.record_success()
+                raise RetryError(e, category, attempt + 1) from e
+
+            breaker.record_failure()
+            if breaker.state == breaker.OPEN:
+                # No point sleeping through a backoff the breaker will refuse anyway
+                raise CircuitOpenError(breaker.reset_timeout) from e
+            if attempt == policy.max_attempts - 1:
+                raise RetryError(e, category, attempt + 1) from e
+
+            delay = policy.compute_delay(attempt, get_retry_after(e))
+            if on_retry:
+                on_retry(attempt, e, category, delay)
+            time.sleep(delay)
+            continue
+
+        breaker.record_success()
+        return result, attempt + 1
+
+    raise RetryError("Max retries exceeded", TRANSIENT, policy.max_attempts)
+
+
+class AttemptTimer:
+    """
+    Times each attempt of a call_with_retry call separately from the backoff
+    sleeps between them, so request latency isn't inflated by retries:
+
+        timer = AttemptTimer(on_retry=print_retry)
+        result, attempts = call_with_retry(timer.wrap(func), on_retry=timer.on_retry)
+        timer.latency  # the last attempt
+    """
+
+    def __init__(self, on_retry=None):
+        self.attempt_latencies = []
+        self.backoff = 0.0
+        self._on_retry = on_retry
+
+    @property
+    def latency(self):
+        return self.attempt_latencies[-1] if self.attempt_latencies else 0.0
+
+    def wrap(self, func):
+        def attempt():
+            started = time.perf_counter()
+            try:
+                return func()
+            finally:
+                self.attempt_latencies.append(time.perf_counter() - started)
+        return attempt
+
+    def on_retry(self, attempt, error, category, delay):
+        self.backoff += delay
+        if self._on_retry:
+            self._on_retry(attempt, error, category, delay)
+
+
+def print_retry(attempt, error, category, delay):
+    """Default on_retry callback matching the generators' log style"""
+    print(f"   ⚠️  Attempt {attempt + 1} failed ({category}: {error}), retrying in {delay:.1f}s...")
+
+
+_dead_letter_lock = threading.Lock()
+
+
+def append_dead_letter(entry, dead_letter_file=DEAD_LETTER_FILE):
+    """
+    Append a permanently failed note to the dead-letter file (JSON lines)
+    """
+    record = dict(entry)
+    record.setdefault("failed_at", datetime.now().isoformat())
+    directory = os.path.dirname(dead_letter_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with _dead_letter_lock:
+        with open(dead_letter_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def mark_dead_letter_resolved(filename, dead_letter_file=DEAD_LETTER_FILE):
+    """
+    Record that a dead-lettered note has since been generated successfully
+    """
+    append_dead_letter({"filename": filename, "resolved": True}, dead_letter_file)
+
+
+def load_dead_letters(dead_letter_file=DEAD_LETTER_FILE):
+    """
+    Load unresolved dead-letter entries, keeping only the latest entry per filename
+    """
+    if not os.path.exists(dead_letter_file):
+        return []
+
+    latest = {}
+    with open(dead_letter_file, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            latest[record.get("filename")] = record
+    return [record for record in latest.values() if not record.get("resolved")]
+
+
+class DeadLetters:
+    """
+    One run's view of the dead-letter file. A note already dead-lettered for
+    the same category isn't appended again on every run, and a note that
+    generates (or turns out to have audio already) is marked resolved.
+    """
+
+    def __init__(self, dead_letter_file=DEAD_LETTER_FILE):
+        self.dead_letter_file = dead_letter_file
+        self.unresolved = {entry.get("filename"): entry for entry in load_dead_letters(dead_letter_file)}
+        self.added = 0
+        self.resolved = 0
+
+    def add(self, entry):
+        """Append an entry unless the note is already there for the same category; True if appended"""
+        previous = self.unresolved.get(entry["filename"])
+        if previous is not None and previous.get("category") == entry.get("category"):
+            return False
+        append_dead_letter(entry, self.dead_letter_file)
+        self.unresolved[entry["filename"]] = entry
+        self.added += 1
+        return True
+
+    def resolve(self, filename):
+        """Mark a note resolved if it has an unresolved entry"""
+        if self.unresolved.pop(filename, None) is not None:
+            mark_dead_letter_resolved(filename, self.dead_letter_file)
+            self.resolved += 1
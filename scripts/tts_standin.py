@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Hume TTS API, for load and failure testing.
+
+Implements the parts of the API the scripts use: POST /v0/tts (what
+client.tts.synthesize_json calls) and GET /v0/tts/voices (the voice
+registry). Responses are valid WAV payloads, a quiet tone whose duration
+follows the text length at --chars-per-second, so file sizes and durations
+look like real generations.
+
+Failures are injected at configurable rates:
+
+- latency from a distribution: fixed:S, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA
+  (seconds), plus --latency-per-audio-second for longer notes
+- rate limits: a token bucket of --rate-limit requests per minute and a cap of
+  --max-concurrent in-flight requests, answered with 429 and Retry-After
+- 5xx errors (500/502/503) at --error-rate
+- truncated responses at --truncate-rate: the WAV header promises the full
+  note but the audio stops partway
+
+Point the scripts at it with HUME_BASE_URL (see voice_registry.get_client):
+
+    python3 scripts/tts_standin.py --port 8900 --rate-limit 120 --error-rate 0.05
+    HUME_BASE_URL=http://127.0.0.1:8900 python3 scripts/generate-all-years-audio.py
+
+--load N starts the stand-in in the background and drives N synthesize_json
+calls through the SDK, the shared retry policy and telemetry at --concurrency,
+so retry and circuit-breaker behavior can be measured offline.
+
+Usage: python3 scripts/tts_standin.py [--port 8900] [--latency lognormal:1.5,0.5] [--rate-limit 60] [--error-rate 0.02] [--truncate-rate 0.01]
+       python3 scripts/tts_standin.py --load 500 --concurrency 32 [fault options]
+"""
+
+import argparse
+import array
+import base64
+import json
+import math
+import random
+import signal
+import struct
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from generation_plan import DEFAULT_CHARS_PER_AUDIO_SECOND
+
+DEFAULT_PORT = 8900
+SAMPLE_RATE = 48000
+TONE_HZ = 220
+ERROR_STATUS_CODES = (500, 502, 503)
+
+# Served by GET /v0/tts/voices, so names resolve without the real voice list
+STANDIN_VOICES = [
+    {"id": "e61bbb66-9084-40b7-a4dc-ddd0c62592c9", "name": "David2", "provider": "CUSTOM_VOICE"},
+    {"id": "3f7c2a1e-5d4b-4c8a-9e6f-0b1d2c3e4f5a", "name": "David5", "provider": "CUSTOM_VOICE"},
+    {"id": "7a9e3b2c-1d4f-4e6a-8b5c-2d3e4f5a6b7c", "name": "Ava Song", "provider": "HUME_AI"},
+]
+
+
+def parse_latency(spec):
+    """
+    Latency sampler from a spec: none, fixed:S, uniform:MIN,MAX or
+    lognormal:MEDIAN,SIGMA. Raises ValueError for anything else.
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",")] if params else []
+    if kind == "none" and not values:
+        return lambda rng: 0.0
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Bad latency spec {spec!r} (use none, fixed:S, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA)")
+
+
+def tone_samples(seconds, sample_rate=SAMPLE_RATE):
+    """One period-aligned block of a quiet sine tone, as 16-bit PCM bytes"""
+    count = int(seconds * sample_rate)
+    samples = array.array("h", (int(3000 * math.sin(2 * math.pi * TONE_HZ * i / sample_rate)) for i in range(count)))
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples.tobytes()
+
+
+_tone = tone_samples(1.0)
+
+
+def wav_payload(duration, truncate_to=None, sample_rate=SAMPLE_RATE):
+    """
+    Mono 16-bit WAV of `duration` seconds. With `truncate_to` (0-1) the header
+    still describes the full duration but only that fraction of the audio is
+    included, like a response cut off in transit.
+    """
+    data_size = int(duration * sample_rate) * 2
+    repeats = data_size // len(_tone) + 1
+    data = (_tone * repeats)[:data_size]
+    header = struct.pack("<4sI4s4sIHHIIHH4sI", b"RIFF", 36 + data_size, b"WAVE", b"fmt ", 16, 1, 1,
+                         sample_rate, sample_rate * 2, 2, 16, b"data", data_size)
+    if truncate_to is not None:
+        data = data[:int(len(data) * truncate_to) & ~1]
+    return header + data
+
+
+class TokenBucket:
+    """Requests-per-minute limit with a burst allowance"""
+
+    def __init__(self, per_minute, burst):
+        self.rate = per_minute / 60.0
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """0 if a token was taken, else seconds until one is available"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+class StandinState:
+    """Fault configuration and request counters shared by the handler threads"""
+
+    def __init__(self, args):
+        self.latency = parse_latency(args.latency)
+        self.latency_per_audio_second = args.latency_per_audio_second
+        self.chars_per_second = args.chars_per_second
+        self.error_rate = args.error_rate
+        self.truncate_rate = args.truncate_rate
+        self.max_concurrent = args.max_concurrent
+        self.bucket = TokenBucket(args.rate_limit, args.burst or max(1, args.rate_limit // 6)) if args.rate_limit else None
+        self.rng = random.Random(args.seed)
+        self.counts = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def roll(self):
+        with self._lock:
+            return self.rng.random()
+
+    def sample_latency(self):
+        with self._lock:
+            return self.latency(self.rng)
+
+    def count(self, outcome):
+        with self._lock:
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+
+    def enter(self):
+        """False if the request would exceed --max-concurrent"""
+        with self._lock:
+            if self.max_concurrent and self.in_flight >= self.max_concurrent:
+                return False
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "uptime_seconds": round(time.time() - self.started, 1),
+                "requests": sum(self.counts.values()),
+                "outcomes": dict(self.counts),
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+            }
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None  # set by make_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/stats":
+            self.send_json(200, self.state.stats())
+        elif url.path == "/v0/tts/voices":
+            query = parse_qs(url.query)
+            provider = query.get("provider", [None])[0]
+            page = int(query.get("page_number", ["0"])[0])
+            voices = [v for v in STANDIN_VOICES if provider in (None, v["provider"])] if page == 0 else []
+            self.send_json(200, {"page_number": page, "page_size": len(voices), "total_pages": 1,
+                                 "voices_page": voices})
+        else:
+            self.send_json(404, {"message": f"Not found: {url.path}"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        if urlparse(self.path).path != "/v0/tts":
+            self.send_json(404, {"message": f"Not found: {self.path}"})
+            return
+        if not self.headers.get("X-Hume-Api-Key"):
+            self.state.count("unauthorized")
+            self.send_json(401, {"message": "Missing X-Hume-Api-Key"})
+            return
+        try:
+            request = json.loads(body)
+            text = " ".join(u["text"] for u in request["utterances"])
+        except (ValueError, KeyError, TypeError):
+            self.state.count("bad_request")
+            self.send_json(400, {"message": "Expected a JSON body with utterances[].text"})
+            return
+
+        if self.state.bucket:
+            wait = self.state.bucket.take()
+            if wait:
+                self.state.count("rate_limited")
+                self.send_json(429, {"message": "Rate limit exceeded"}, {"Retry-After": str(math.ceil(wait))})
+                return
+        if not self.state.enter():
+            self.state.count("rate_limited")
+            self.send_json(429, {"message": "Too many concurrent requests"}, {"Retry-After": "1"})
+            return
+
+        try:
+            self.synthesize(text, request)
+        finally:
+            self.state.leave()
+
+    def synthesize(self, text, request):
+        state = self.state
+        duration = round(max(0.5, len(text) / state.chars_per_second), 3)
+        time.sleep(state.sample_latency() + duration * state.latency_per_audio_second)
+
+        if state.roll() < state.error_rate:
+            status = ERROR_STATUS_CODES[int(state.roll() * len(ERROR_STATUS_CODES))]
+            state.count(f"error_{status}")
+            self.send_json(status, {"message": "Injected server error"})
+            return
+
+        truncated = state.roll() < state.truncate_rate
+        audio = wav_payload(duration, truncate_to=0.3 + 0.6 * state.roll() if truncated else None)
+        state.count("truncated" if truncated else "ok")
+        generation_id = str(uuid.uuid4())
+        encoded = base64.b64encode(audio).decode("ascii")
+        self.send_json(200, {
+            "request_id": str(uuid.uuid4()),
+            "generations": [{
+                "generation_id": generation_id,
+                "duration": duration,
+                "file_size": len(audio),
+                "encoding": {"format": (request.get("format") or {}).get("type", "wav"), "sample_rate": SAMPLE_RATE},
+                "audio": encoded,
+                "snippets": [[{
+                    "id": str(uuid.uuid4()),
+                    "text": text,
+                    "generation_id": generation_id,
+                    "utterance_index": 0,
+                    "transcribed_text": text,
+                    "audio": encoded,
+                }]],
+            }],
+        })
+
+
+def make_server(args, port):
+    """Stand-in server on 127.0.0.1:port (0 for any free port)"""
+    handler = type("Handler", (StandinHandler,), {"state": StandinState(args)})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def run_load(args, base_url):
+    """
+    Drive --load synthesize_json calls at --concurrency through the SDK and
+    the generators' retry policy, recording them like a generation run
+    """
+    from hume.tts.types import FormatWav, PostedUtterance, PostedUtteranceVoiceWithId
+
+    from audio_io import check_wav_integrity, wav_info_from_bytes
+    from tts_retry import AttemptTimer, CircuitOpenError, RetryError, RetryPolicy, call_with_retry
+    from tts_telemetry import Telemetry
+    from voice_registry import KNOWN_VOICES, get_client
+
+    client = get_client(base_url)
+    voice = PostedUtteranceVoiceWithId(id=KNOWN_VOICES["David2"])
+    policy = RetryPolicy(base_delay=args.base_delay, max_delay=args.base_delay * 16)
+    telemetry = Telemetry("standin-load")
+    rng = random.Random(args.seed)
+    texts = [" ".join(["love"] * rng.randint(10, 120)) for _ in range(args.load)]
+
+    def synthesize(i, text):
+        timer = AttemptTimer()
+        filename = f"standin-{i + 1}.wav"
+        try:
+            response, attempts = call_with_retry(
+                timer.wrap(lambda: client.tts.synthesize_json(utterances=[PostedUtterance(text=text, voice=voice)],
+                                                              format=FormatWav())),
+                policy=policy,
+                on_retry=timer.on_retry,
+            )
+        except (RetryError, CircuitOpenError) as e:
+            category = getattr(e, "category", "circuit_open")
+            telemetry.record(filename, "failed", latency=timer.latency, chars=len(text),
+                             retries=getattr(e, "attempts", 1) - 1, backoff_seconds=timer.backoff, error=category)
+            return
+        generation = response.generations[0]
+        audio = base64.b64decode(generation.audio)
+        problems = check_wav_integrity(wav_info_from_bytes(audio), {"duration": generation.duration})
+        telemetry.record(filename, "failed" if problems else "ok", latency=timer.latency,
+                         chars=len(text), audio_seconds=generation.duration, retries=attempts - 1,
+                         backoff_seconds=timer.backoff, bytes_written=len(audio),
+                         error="truncated" if problems else None)
+
+    print(f"🚚 {args.load} requests at concurrency {args.concurrency}")
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for future in as_completed([pool.submit(synthesize, i, text) for i, text in enumerate(texts)]):
+            future.result()
+    telemetry.finish(args.prometheus)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Hume TTS API with injectable faults")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", default="lognormal:1.5,0.5",
+                        help="none, fixed:S, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA (seconds)")
+    parser.add_argument("--latency-per-audio-second", type=float, default=0.05,
+                        help="Extra latency per second of generated audio")
+    parser.add_argument("--chars-per-second", type=float, default=DEFAULT_CHARS_PER_AUDIO_SECOND,
+                        help="Speaking rate used for the generated durations")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Requests per minute before 429s (0: unlimited)")
+    parser.add_argument("--burst", type=int, help="Token bucket size (default: a tenth of a minute's requests)")
+    parser.add_argument("--max-concurrent", type=int, default=0, help="In-flight requests before 429s (0: unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 5xx")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="Share of responses with cut-off audio")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--load", type=int, help="Run N requests against a background stand-in, then exit")
+    parser.add_argument("--concurrency", type=int, default=16, help="Parallel requests for --load")
+    parser.add_argument("--base-delay", type=float, default=0.2, help="Retry backoff base for --load (seconds)")
+    parser.add_argument("--prometheus", help="Write --load metrics in Prometheus text-file format to this path")
+    args = parser.parse_args()
+
+    try:
+        parse_latency(args.latency)
+    except ValueError as e:
+        parser.error(str(e))
+
+    server = make_server(args, 0 if args.load else args.port)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    state = server.RequestHandlerClass.state
+
+    print("🎭 Hume TTS Stand-in")
+    print("=" * 50)
+    print(f"🌐 {base_url}  latency {args.latency}  rate limit {args.rate_limit or 'none'}/min  "
+          f"errors {args.error_rate:.0%}  truncated {args.truncate_rate:.0%}")
+
+    if args.load:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            run_load(args, base_url)
+        finally:
+            server.shutdown()
+    else:
+        print(f"👉 HUME_BASE_URL={base_url}  (stats: {base_url}/stats, Ctrl-C to stop)")
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
+
+    stats = state.stats()
+    print("")
+    print(f"📊 {stats['requests']} requests, max {stats['max_in_flight']} in flight")
+    for outcome, count in sorted(stats["outcomes"].items()):
+        print(f"   {outcome:<14}{count:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Structured telemetry for TTS generation runs.
+
+Each synthesis request is written as one JSON line (latency, characters,
+audio seconds, retries, bytes written, status) to data/telemetry/. At the end
+of a run the records are rolled up into latency percentiles, throughput and
+cost counters, and can optionally be exported in the Prometheus text-file
+format for node_exporter's textfile collector.
+
+Usage (roll up an existing log): python3 scripts/tts_telemetry.py LOG.jsonl [--prometheus FILE]
+"""
+
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime
+
+TELEMETRY_DIR = "data/telemetry"
+
+# Hume TTS is billed per character; override with the plan's actual rate
+PRICE_PER_1K_CHARS = float(os.getenv("HUME_TTS_PRICE_PER_1K_CHARS", "0.15"))
+
+# Latency histogram buckets (seconds) for the Prometheus export
+LATENCY_BUCKETS = [0.25, 0.5, 1, 2, 4, 8, 16, 32, 64]
+
+
+def estimate_cost(chars):
+    """Estimated API cost in dollars for synthesizing `chars` characters"""
+    return chars / 1000.0 * PRICE_PER_1K_CHARS
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Telemetry:
+    """Collects per-request records for one generation run"""
+
+    def __init__(self, run_name, log_dir=TELEMETRY_DIR):
+        self.run_name = run_name
+        self.started_at = time.time()
+        self.records = []
+        self._lock = threading.Lock()
+        os.makedirs(log_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.log_file = os.path.join(log_dir, f"{run_name}-{stamp}.jsonl")
+
+    def record(self, filename, status, latency=0.0, chars=0, audio_seconds=0.0,
+               retries=0, bytes_written=0, error=None, backoff_seconds=0.0, **extra):
+        """
+        Append one request record to the run's JSON lines log. `latency` is
+        the final attempt alone; time slept between retries is
+        `backoff_seconds`.
+        """
+        entry = {
+            "ts": time.time(),
+            "run": self.run_name,
+            "filename": filename,
+            "status": status,
+            "latency": round(latency, 4),
+            "chars": chars,
+            "audio_seconds": round(audio_seconds or 0.0, 3),
+            "retries": retries,
+            "backoff_seconds": round(backoff_seconds or 0.0, 3),
+            "bytes_written": bytes_written,
+        }
+        if error:
+            entry["error"] = str(error)
+        entry.update(extra)
+
+        with self._lock:
+            self.records.append(entry)
+            with open(self.log_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return entry
+
+    def summary(self):
+        """Roll the run's records up into percentiles and counters"""
+        with self._lock:
+            records = list(self.records)
+        return summarize(records, wall_seconds=time.time() - self.started_at)
+
+    def finish(self, prometheus_file=None):
+        """Print the summary, save it next to the log and optionally export it"""
+        summary = self.summary()
+        print_summary(summary)
+        summary_file = self.log_file.replace(".jsonl", "-summary.json")
+        with open(summary_file, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"📈 Telemetry: {self.log_file}")
+        if prometheus_file:
+            write_prometheus(summary, prometheus_file, self.run_name)
+            print(f"📈 Prometheus metrics: {prometheus_file}")
+        return summary
+
+
+def summarize(records, wall_seconds=None):
+    """
+    Summarize request records. Wall time defaults to the span of the records.
+    """
+    ok = [r for r in records if r["status"] == "ok"]
+    latencies = sorted(r["latency"] for r in ok)
+    chars = sum(r["chars"] for r in ok)
+    audio_seconds = sum(r["audio_seconds"] for r in ok)
+    busy_seconds = sum(latencies)
+
+    if wall_seconds is None:
+        if records:
+            first = min(r["ts"] - r["latency"] for r in records)
+            wall_seconds = max(r["ts"] for r in records) - first
+        else:
+            wall_seconds = 0.0
+
+    buckets = {str(b): sum(1 for l in latencies if l <= b) for b in LATENCY_BUCKETS}
+
+    return {
+        "requests": len(records),
+        "succeeded": len(ok),
+        "failed": len(records) - len(ok),
+        "retries": sum(r.get("retries", 0) for r in records),
+        "backoff_seconds": round(sum(r.get("backoff_seconds", 0.0) for r in records), 3),
+        "chars": chars,
+        "audio_seconds": round(audio_seconds, 2),
+        "bytes_written": sum(r.get("bytes_written", 0) for r in ok),
+        "wall_seconds": round(wall_seconds, 2),
+        "latency": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else None,
+            "sum": round(busy_seconds, 3),
+            "buckets": buckets,
+        },
+        # Throughput across the whole run vs. per in-flight request; the ratio
+        # between the two is the effective concurrency
+        "chars_per_second": round(chars / wall_seconds, 2) if wall_seconds else None,
+        "chars_per_request_second": round(chars / busy_seconds, 2) if busy_seconds else None,
+        "audio_seconds_per_second": round(audio_seconds / wall_seconds, 3) if wall_seconds else None,
+        "estimated_cost": round(estimate_cost(chars), 4),
+    }
+
+
+def print_summary(summary):
+    """Print a run summary in the generators' log style"""
+    latency = summary["latency"]
+
+    def fmt(value):
+        return f"{value:.2f}s" if value is not None else "-"
+
+    print("")
+    print("📈 Generation Telemetry")
+    print("=" * 50)
+    print(f"   Requests: {summary['requests']} ({summary['succeeded']} ok, {summary['failed']} failed, {summary['retries']} retries, "
+          f"{summary.get('backoff_seconds', 0):.1f}s backing off)")
+    print(f"   Latency: p50 {fmt(latency['p50'])} | p95 {fmt(latency['p95'])} | p99 {fmt(latency['p99'])} | max {fmt(latency['max'])}")
+    print(f"   Synthesized: {summary['chars']} chars → {summary['audio_seconds'] / 60:.1f} min of audio")
+    print(f"   Written: {summary['bytes_written'] / 1024 / 1024:.1f} MB")
+    if summary["chars_per_second"] is not None:
+        print(f"   Throughput: {summary['chars_per_second']} chars/s over {summary['wall_seconds']}s wall time")
+    print(f"   Estimated cost: ${summary['estimated_cost']:.2f}")
+
+
+def write_prometheus(summary, path, run_name="generation"):
+    """
+    Write the summary in the Prometheus text exposition format (atomically,
+    as the textfile collector requires)
+    """
+    labels = f'run="{run_name}"'
+    latency = summary["latency"]
+    lines = [
+        "# HELP lovenotes_tts_requests_total TTS requests by status.",
+        "# TYPE lovenotes_tts_requests_total counter",
+        f'lovenotes_tts_requests_total{{{labels},status="ok"}} {summary["succeeded"]}',
+        f'lovenotes_tts_requests_total{{{labels},status="failed"}} {summary["failed"]}',
+        "# HELP lovenotes_tts_retries_total Retried TTS attempts.",
+        "# TYPE lovenotes_tts_retries_total counter",
+        f"lovenotes_tts_retries_total{{{labels}}} {summary['retries']}",
+        "# HELP lovenotes_tts_backoff_seconds_total Time slept between TTS retries.",
+        "# TYPE lovenotes_tts_backoff_seconds_total counter",
+        f"lovenotes_tts_backoff_seconds_total{{{labels}}} {summary.get('backoff_seconds', 0)}",
+        "# HELP lovenotes_tts_chars_total Characters synthesized.",
+        "# TYPE lovenotes_tts_chars_total counter",
+        f"lovenotes_tts_chars_total{{{labels}}} {summary['chars']}",
+        "# HELP lovenotes_tts_audio_seconds_total Seconds of audio synthesized.",
+        "# TYPE lovenotes_tts_audio_seconds_total counter",
+        f"lovenotes_tts_audio_seconds_total{{{labels}}} {summary['audio_seconds']}",
+        "# HELP lovenotes_tts_bytes_written_total Audio bytes written to disk.",
+        "# TYPE lovenotes_tts_bytes_written_total counter",
+        f"lovenotes_tts_bytes_written_total{{{labels}}} {summary['bytes_written']}",
+        "# HELP lovenotes_tts_estimated_cost_dollars Estimated API cost.",
+        "# TYPE lovenotes_tts_estimated_cost_dollars gauge",
+        f"lovenotes_tts_estimated_cost_dollars{{{labels}}} {summary['estimated_cost']}",
+        "# HELP lovenotes_tts_request_latency_seconds TTS request latency.",
+        "# TYPE lovenotes_tts_request_latency_seconds histogram",
+    ]
+    for bucket in LATENCY_BUCKETS:
+        lines.append(f'lovenotes_tts_request_latency_seconds_bucket{{{labels},le="{bucket}"}} {latency["buckets"][str(bucket)]}')
+    lines.append(f'lovenotes_tts_request_latency_seconds_bucket{{{labels},le="+Inf"}} {summary["succeeded"]}')
+    lines.append(f"lovenotes_tts_request_latency_seconds_sum{{{labels}}} {latency['sum']}")
+    lines.append(f"lovenotes_tts_request_latency_seconds_count{{{labels}}} {summary['succeeded']}")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+
+
+def load_records(log_file):
+    """Load request records from a telemetry JSON lines log"""
+    records = []
+    with open(log_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll up a TTS telemetry log")
+    parser.add_argument("log_file", help="Telemetry JSON lines file")
+    parser.add_argument("--prometheus", help="Also write Prometheus text-file metrics here")
+    args = parser.parse_args()
+
+    summary = summarize(load_records(args.log_file))
+    print_summary(summary)
+    if args.prometheus:
+        # <run>-<YYYYmmdd_HHMMSS>.jsonl; run names may contain dashes themselves
+        run_name = os.path.basename(args.log_file).rsplit("-", 1)[0]
+        write_prometheus(summary, args.prometheus, run_name)
+        print(f"📈 Prometheus metrics: {args.prometheus}")
+
+
+if __name__ == "__main__":
+    main()
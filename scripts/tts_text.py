@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Batch validation and text normalization for TTS.
+
+Cleans note text before it is sent to the TTS API (emojis, URLs, chat
+abbreviations like "lol", repeated punctuation and stretched words), validates
+the cleaned text, and caches the result keyed by a hash of the original text
+in data/tts-text-cache.json. The pre-pass runs over every year CSV at once so
+bad rows are reported before any API spend; generators then read the
+normalized text from the cache.
+
+Usage: python3 scripts/tts_text.py [--strict]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+
+from audio_io import atomic_write_json
+from love_notes import DATA_DIR, find_year_csvs, load_year_rows, row_filename, validate_text_content
+
+TEXT_CACHE_FILE = "data/tts-text-cache.json"
+
+# Bump when normalization rules change so cached entries are recomputed
+NORMALIZER_VERSION = 3
+
+# Trailing sentence punctuation belongs to the sentence, not the URL
+URL_RE = re.compile(r"(https?://|www\.)\S*[^\s.,!?)]", re.IGNORECASE)
+EMOJI_RE = re.compile(
+    "["
+    "\U0001F000-\U0001FAFF"  # pictographs, emoticons, transport, symbols & pictographs ext.
+    "\U00002600-\U000027BF"  # misc symbols, dingbats
+    "\U0001F1E6-\U0001F1FF"  # regional indicators (flags)
+    "\U00002B00-\U00002BFF"  # arrows, stars
+    "\uFE0F\u200D\u20E3"  # variation selector, zero-width joiner, keycap
+    "]+"
+)
+REPEATED_PUNCTUATION_RE = re.compile(r"([!?,;:])\1+")
+MIXED_PUNCTUATION_RE = re.compile(r"[!?]{2,}")
+# Lowercase only, so roman numerals ("Chapter III") and acronyms survive
+STRETCHED_LETTERS_RE = re.compile(r"([a-z])\1{2,}")
+LAUGHTER_RE = re.compile(r"\b(?:ha){2,}h?\b|\b(?:he){2,}h?\b|\bhehe\b", re.IGNORECASE)
+WHITESPACE_RE = re.compile(r"\s+")
+# An emoticon's ":" or ";" keeps its space ("Cool :)")
+SPACE_BEFORE_PUNCTUATION_RE = re.compile(r"\s+([.,!?)]|[;:](?![()]))")
+
+# Chat abbreviations, lowercase only ("BC", "OMG" are left alone): None drops
+# the token, a string replaces it
+CHAT_TOKENS = {
+    "lol": None,
+    "lmao": None,
+    "lmfao": None,
+    "rofl": None,
+    "xoxo": None,
+    "omg": "oh my god",
+    "ily": "I love you",
+    "ilysm": "I love you so much",
+    "tbh": "to be honest",
+    "idk": "I don't know",
+    "btw": "by the way",
+    "bc": "because",
+    "thx": "thanks",
+    "pls": "please",
+    "plz": "please",
+}
+CHAT_TOKEN_RE = re.compile(r"\b(" + "|".join(sorted(CHAT_TOKENS, key=len, reverse=True)) + r")\b")
+
+# Single-letter shorthand only when lowercase, so "U.S." or "R" initials survive
+LOWERCASE_TOKENS_RE = re.compile(r"\b(u|ur)\b(?!\.)")
+LOWERCASE_TOKENS = {"u": "you", "ur": "your"}
+
+# Quoted text is read as written
+QUOTED_RE = re.compile(r'"[^"]*"|\u201c[^\u201d]*\u201d')
+
+
+def text_hash(text):
+    """Cache key for a note's original text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def outside_quotes(text, func):
+    """Apply func to the parts of text that aren't inside double quotes"""
+    parts = []
+    end = 0
+    for match in QUOTED_RE.finditer(text):
+        parts.append(func(text[end:match.start()]))
+        parts.append(match.group(0))
+        end = match.end()
+    parts.append(func(text[end:]))
+    return "".join(parts)
+
+
+def clean_chat_speak(text):
+    """Drop laughter and expand chat abbreviations"""
+    text = LAUGHTER_RE.sub(" ", text)
+    text = CHAT_TOKEN_RE.sub(lambda m: CHAT_TOKENS[m.group(1)] or " ", text)
+    return LOWERCASE_TOKENS_RE.sub(lambda m: LOWERCASE_TOKENS[m.group(1)], text)
+
+
+def normalize_tts_text(text):
+    """
+    Clean note text for speech synthesis
+    """
+    text = URL_RE.sub(" ", text)
+    text = EMOJI_RE.sub(" ", text)
+    text = outside_quotes(text, clean_chat_speak)
+    text = STRETCHED_LETTERS_RE.sub(r"\1", text)
+    text = MIXED_PUNCTUATION_RE.sub(lambda m: "?" if "?" in m.group(0) else "!", text)
+    text = REPEATED_PUNCTUATION_RE.sub(r"\1", text)
+    text = WHITESPACE_RE.sub(" ", text)
+    text = SPACE_BEFORE_PUNCTUATION_RE.sub(r"\1", text)
+    return text.strip()
+
+
+def load_text_cache(cache_file=TEXT_CACHE_FILE):
+    """Load the normalized text cache, keyed by original text hash"""
+    if not os.path.exists(cache_file):
+        return {}
+    with open(cache_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def prepare_text(text, cache):
+    """
+    Normalize and validate one note, using and updating `cache`.
+    Returns (cache_entry, was_cached).
+    """
+    key = text_hash(text)
+    entry = cache.get(key)
+    if entry and entry.get("version") == NORMALIZER_VERSION:
+        return entry, True
+
+    normalized = normalize_tts_text(text)
+    is_valid, message = validate_text_content(normalized)
+    entry = {
+        "version": NORMALIZER_VERSION,
+        "normalized": normalized,
+        "valid": is_valid,
+        "reason": None if is_valid else message,
+        "original_chars": len(text),
+        "chars": len(normalized),
+    }
+    cache[key] = entry
+    return entry, False
+
+
+def get_tts_text(text, cache):
+    """
+    Normalized text and validation result for a note: (text, is_valid, reason).
+    Computes and caches the entry if the pre-pass hasn't seen this text.
+    """
+    entry, _ = prepare_text(text.strip(), cache)
+    return entry["normalized"], entry["valid"], entry["reason"]
+
+
+def prepare_all_notes(data_dir=DATA_DIR, cache_file=TEXT_CACHE_FILE):
+    """
+    Validate and normalize every note in every year CSV, saving the cache.
+    Returns (cache, report).
+    """
+    cache = load_text_cache(cache_file)
+    report = {"notes": 0, "cached": 0, "computed": 0, "chars_before": 0, "chars_after": 0, "invalid": []}
+
+    for year, csv_file in find_year_csvs(data_dir):
+        for i, row in enumerate(load_year_rows(csv_file)):
+            text = row.get("text", "").strip()
+            entry, was_cached = prepare_text(text, cache)
+            report["notes"] += 1
+            report["cached" if was_cached else "computed"] += 1
+            report["chars_before"] += len(text)
+            report["chars_after"] += entry["chars"]
+            if not entry["valid"]:
+                report["invalid"].append({
+                    "year": year,
+                    "row": i + 1,
+                    "filename": row_filename(row, i),
+                    "reason": entry["reason"],
+                })
+
+    if report["computed"]:
+        atomic_write_json(cache_file, cache)
+    return cache, report
+
+
+def print_report(report, cache_file=TEXT_CACHE_FILE):
+    """Print the pre-pass report"""
+    saved = report["chars_before"] - report["chars_after"]
+    print(f"📝 Prepared {report['notes']} notes ({report['cached']} cached, {report['computed']} normalized now)")
+    print(f"🔤 Characters: {report['chars_before']} → {report['chars_after']} ({saved} removed before synthesis)")
+    if report["invalid"]:
+        print(f"❌ {len(report['invalid'])} notes failed validation:")
+        for note in report["invalid"]:
+            print(f"   {note['year']} row {note['row']}: {note['filename']} - {note['reason']}")
+    else:
+        print("✅ All notes passed validation")
+    print(f"💾 Cache: {cache_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate and normalize all love-note text before synthesis")
+    parser.add_argument("--strict", action="store_true", help="Exit with an error if any note fails validation")
+    args = parser.parse_args()
+
+    print("🧹 TTS Text Pre-Pass")
+    print("=" * 50)
+    _, report = prepare_all_notes()
+    print_report(report)
+
+    if args.strict and report["invalid"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 Create ultimate comprehensive dataset including David's backup
 """
 
+import argparse
 import sqlite3
 import json
 import csv
@@ -10,6 +11,9 @@ import os
 from datetime import datetime
 from pathlib import Path
 
+from message_export import read_message_export
+from profiling import add_profile_arguments, stage, start_profiling
+
 def load_previous_comprehensive_data():
     """Load the previous comprehensive dataset"""
     previous_file = "final_comprehensive_all_20250727_203716.json"
@@ -17,7 +21,7 @@ def load_previous_comprehensive_data():
     if os.path.exists(previous_file):
         print(f"📂 Loading previous comprehensive data: {previous_file}")
         try:
-            with open(previous_file, 'r') as f:
+            with open(previous_file, 'r') as f, stage("deserialization"):
                 data = json.load(f)
                 print(f"📊 Loaded {len(data)} messages from previous comprehensive dataset")
                 return data
@@ -33,7 +37,7 @@ def load_davids_backup_data():
     if os.path.exists(backup_file):
         print(f"📂 Loading David's backup data: {backup_file}")
         try:
-            with open(backup_file, 'r') as f:
+            with open(backup_file, 'r') as f, stage("deserialization"):
                 data = json.load(f)
                 print(f"📊 Loaded {len(data)} messages from David's backup")
                 return data
@@ -42,6 +46,23 @@ def load_davids_backup_data():
     
     return []
 
+def load_recovered_messages(recovered_dir="data/recovered-messages"):
+    """Load deleted messages recovered from older snapshots by snapshot_diff.py"""
+    messages = []
+    if os.path.isdir(recovered_dir):
+        for filename in sorted(os.listdir(recovered_dir)):
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(recovered_dir, filename)
+            try:
+                with stage("deserialization"):
+                    messages.extend(read_message_export(path))
+            except Exception as e:
+                print(f"❌ Error loading recovered messages from {path}: {e}")
+        if messages:
+            print(f"📊 Loaded {len(messages)} recovered deleted messages from {recovered_dir}")
+    return messages
+
 def merge_and_deduplicate(all_datasets):
     """Merge and deduplicate messages from all datasets"""
     print("🔄 Merging and deduplicating all datasets...")
@@ -141,7 +162,7 @@ def create_supabase_export(messages, year_filter=None):
         json_file = f"ultimate_comprehensive_all_{timestamp}.json"
         csv_file = f"ultimate_comprehensive_all_{timestamp}.csv"
     
-    with open(json_file, 'w') as f:
+    with open(json_file, 'w') as f, stage("serialization"):
         json.dump(messages, f, indent=2)
     
     # Save as CSV
@@ -151,7 +172,7 @@ def create_supabase_export(messages, year_filter=None):
         'contact_id', 'readable_date', 'apple_date', 'apple_date_read'
     ]
     
-    with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+    with open(csv_file, 'w', newline='', encoding='utf-8') as f, stage("serialization"):
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
         
@@ -169,24 +190,32 @@ def create_supabase_export(messages, year_filter=None):
 
 def main():
     """Main comprehensive extraction function"""
+    parser = argparse.ArgumentParser(description="Merge every message dataset into the ultimate comprehensive export")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args, "ultimate_comprehensive")
+
     print("🔍 CREATING ULTIMATE COMPREHENSIVE DATASET")
     print("=" * 60)
     
     # Load all datasets
     all_datasets = {
         'Previous_Comprehensive': load_previous_comprehensive_data(),
-        'Davids_Backup': load_davids_backup_data()
+        'Davids_Backup': load_davids_backup_data(),
+        'Recovered_Deleted': load_recovered_messages()
     }
     
     # Merge and deduplicate
-    merged_messages = merge_and_deduplicate(all_datasets)
+    with stage("merge"):
+        merged_messages = merge_and_deduplicate(all_datasets)
     
     if not merged_messages:
         print("❌ No messages found from any source")
         return
     
     # Analyze by year
-    analyze_by_year(merged_messages)
+    with stage("analysis"):
+        analyze_by_year(merged_messages)
     
     # Create comprehensive export (all years)
     json_file_all, csv_file_all = create_supabase_export(merged_messages)
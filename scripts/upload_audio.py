@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Sync love-note audio and manifests to Supabase Storage (or any S3-compatible
+store) through its S3 API.
+
+Uploads run in a thread pool; large files go up as multipart uploads. Each
+object carries its SHA-256 in x-amz-meta-sha256, so files whose content
+already matches the bucket are skipped without re-uploading. Audio keys are
+named by note, not by content, so regenerated audio lands under the same key:
+audio and manifests get a short, revalidating Cache-Control. Only packs,
+whose names carry their content hash, are cached as immutable.
+
+Required env (same as upload-to-supabase-s3.mjs):
+- SUPABASE_S3_ENDPOINT (e.g., https://<project-ref>.storage.supabase.co/storage/v1/s3)
+- SUPABASE_S3_REGION (e.g., us-east-2)
+- SUPABASE_S3_ACCESS_KEY_ID
+- SUPABASE_S3_SECRET_ACCESS_KEY
+- SUPABASE_BUCKET (e.g., love-notes)
+
+To test against a local MinIO stand-in:
+    docker run -p 9000:9000 minio/minio server /data
+    SUPABASE_S3_ACCESS_KEY_ID=minioadmin SUPABASE_S3_SECRET_ACCESS_KEY=minioadmin \\
+        python3 scripts/upload_audio.py --endpoint http://localhost:9000 --create-bucket
+
+Usage: python3 scripts/upload_audio.py [--only wav,mp3,manifests,packs,pack-indexes,peaks] [--workers N] [--dry-run] [--force]
+"""
+
+import argparse
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from audio_io import AUDIO_METADATA_FILE, file_sha256, load_audio_metadata
+from audio_manifest import MANIFEST_DIR
+from audio_pack import PACK_DIR, load_pack_index
+from audio_peaks import PEAKS_DIR
+
+AUDIO_CACHE_CONTROL = "public, max-age=300, must-revalidate"
+MANIFEST_CACHE_CONTROL = "public, max-age=300, must-revalidate"
+PACK_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Target -> (local directory, extension, key prefixes, content type, Cache-Control).
+# lib/supabase-storage.ts reads audio from the bucket root (getPublicAudioFileUrl;
+# the mp3/ variant is unused) and manifests both from the root and from
+# manifests/ (getManifestUrl/getS3ManifestUrl), so manifests go to both places.
+SYNC_TARGETS = {
+    "wav": ("public/audio/love-notes", ".wav", [""], "audio/wav", AUDIO_CACHE_CONTROL),
+    "mp3": ("public/audio/love-notes-mp3", ".mp3", [""], "audio/mpeg", AUDIO_CACHE_CONTROL),
+    "manifests": (MANIFEST_DIR, ".json", ["manifests/", ""], "application/json", MANIFEST_CACHE_CONTROL),
+    # Pack names include their content hash; the per-year index points at the current one
+    "packs": (PACK_DIR, ".pack", ["packs/"], "application/octet-stream", PACK_CACHE_CONTROL),
+    "pack-indexes": (PACK_DIR, ".json", ["packs/"], "application/json", MANIFEST_CACHE_CONTROL),
+    "peaks": (PEAKS_DIR, ".json", ["peaks/"], "application/json", MANIFEST_CACHE_CONTROL),
+}
+DEFAULT_TARGETS = "wav,mp3,manifests,packs,pack-indexes,peaks"
+
+
+def create_s3_client(endpoint=None, region=None, max_pool_connections=32):
+    """
+    S3 client for Supabase Storage or a local stand-in. Path-style addressing
+    is required by both Supabase and MinIO.
+    """
+    access_key = os.getenv("SUPABASE_S3_ACCESS_KEY_ID")
+    secret_key = os.getenv("SUPABASE_S3_SECRET_ACCESS_KEY")
+    endpoint = endpoint or os.getenv("SUPABASE_S3_ENDPOINT")
+    if not endpoint or not access_key or not secret_key:
+        raise ValueError("Missing S3 env. Need SUPABASE_S3_ENDPOINT, SUPABASE_S3_ACCESS_KEY_ID, "
+                         "SUPABASE_S3_SECRET_ACCESS_KEY")
+
+    return boto3.client(
+        "s3",
+        endpoint_url=endpoint,
+        region_name=region or os.getenv("SUPABASE_S3_REGION", "us-east-2"),
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+        config=Config(
+            s3={"addressing_style": "path"},
+            max_pool_connections=max_pool_connections,
+            retries={"max_attempts": 5, "mode": "adaptive"},
+        ),
+    )
+
+
+def ensure_bucket(s3, bucket):
+    """Create the bucket if it doesn't exist (for local stand-ins)"""
+    try:
+        s3.head_bucket(Bucket=bucket)
+    except ClientError:
+        region = s3.meta.region_name
+        if region and region != "us-east-1":
+            s3.create_bucket(Bucket=bucket, CreateBucketConfiguration={"LocationConstraint": region})
+        else:
+            s3.create_bucket(Bucket=bucket)
+        print(f"🪣 Created bucket: {bucket}")
+
+
+def list_remote_sizes(s3, bucket, prefix):
+    """
+    Sizes of every object under `prefix` directly (not in sub-folders), keyed
+    by object key. One paginated listing instead of a HEAD per file.
+    """
+    sizes = {}
+    paginator = s3.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter="/"):
+        for obj in page.get("Contents", []):
+            sizes[obj["Key"]] = obj["Size"]
+    return sizes
+
+
+def remote_sha256(s3, bucket, key):
+    """The SHA-256 an object was uploaded with, or None"""
+    try:
+        head = s3.head_object(Bucket=bucket, Key=key)
+    except ClientError:
+        return None
+    return head.get("Metadata", {}).get("sha256")
+
+
+def collect_uploads(targets, metadata):
+    """
+    Local files to sync: a list of (path, key, size, sha256, content_type,
+    cache_control). WAV hashes come from the generator's recorded metadata
+    when the size still matches; everything else is hashed here.
+    """
+    uploads = []
+    for target in targets:
+        local_dir, extension, prefixes, content_type, cache_control = SYNC_TARGETS[target]
+        if not os.path.isdir(local_dir):
+            print(f"⚠️  Directory not found, skipping {target}: {local_dir}")
+            continue
+        for filename in sorted(os.listdir(local_dir)):
+            if not filename.endswith(extension) or filename.startswith("."):
+                continue
+            path = os.path.join(local_dir, filename)
+            size = os.path.getsize(path)
+            entry = metadata.get(filename) if target == "wav" else None
+            if entry and entry.get("sha256") and entry.get("bytes") == size:
+                sha256 = entry["sha256"]
+            else:
+                sha256 = file_sha256(path)
+            for prefix in prefixes:
+                uploads.append((path, f"{prefix}{filename}", size, sha256, content_type, cache_control))
+    return uploads
+
+
+def needs_upload(s3, bucket, key, size, sha256, remote_sizes):
+    """
+    True unless the bucket already holds this exact content. A size mismatch
+    is decided from the listing; only same-size objects need a HEAD.
+    """
+    if key not in remote_sizes or remote_sizes[key] != size:
+        return True
+    return remote_sha256(s3, bucket, key) != sha256
+
+
+def prune_packs(s3, bucket, pack_dir=PACK_DIR, dry_run=False):
+    """
+    Delete packs in the bucket that no local pack index references any more
+    (superseded by an incremental update or a rebuild). Only safe once the
+    current indexes are live. Returns the deleted keys.
+    """
+    current = set()
+    for filename in os.listdir(pack_dir) if os.path.isdir(pack_dir) else []:
+        if filename.endswith(".json"):
+            index = load_pack_index(os.path.splitext(filename)[0], pack_dir)
+            if index and index.get("pack"):
+                current.add(f"packs/{index['pack']}")
+    stale = sorted(key for key in list_remote_sizes(s3, bucket, "packs/")
+                   if key.endswith(".pack") and key not in current)
+    if not dry_run:
+        # delete_objects takes at most 1000 keys per request
+        for i in range(0, len(stale), 1000):
+            s3.delete_objects(Bucket=bucket, Delete={"Objects": [{"Key": key} for key in stale[i:i + 1000]]})
+    return stale
+
+
+def upload_file(s3, bucket, path, key, sha256, content_type, cache_control, transfer_config):
+    """Upload one file; boto3 switches to multipart above the threshold"""
+    s3.upload_file(
+        path, bucket, key,
+        ExtraArgs={
+            "ContentType": content_type,
+            "CacheControl": cache_control,
+            "Metadata": {"sha256": sha256},
+        },
+        Config=transfer_config,
+    )
+
+
+def sync(s3, bucket, targets, workers=8, force=False, dry_run=False, metadata_file=AUDIO_METADATA_FILE):
+    """
+    Sync the given targets to the bucket. Returns a stats dict.
+    """
+    metadata = load_audio_metadata(metadata_file)
+    uploads = collect_uploads(targets, metadata)
+
+    remote_sizes = {}
+    if not force:
+        for prefix in {os.path.dirname(key) + "/" if "/" in key else "" for _, key, *_ in uploads}:
+            remote_sizes.update(list_remote_sizes(s3, bucket, prefix))
+
+    # Each file is its own task; parts of a multipart upload add a few more
+    # threads per task, so keep that small to avoid oversubscribing the pool
+    transfer_config = TransferConfig(
+        multipart_threshold=MULTIPART_THRESHOLD,
+        multipart_chunksize=MULTIPART_CHUNK_SIZE,
+        max_concurrency=4,
+    )
+
+    stats = {"files": len(uploads), "uploaded": 0, "skipped": 0, "failed": 0, "held_back": 0, "deleted": 0,
+             "bytes": 0, "errors": []}
+    stats_lock = threading.Lock()
+
+    def sync_one(path, key, size, sha256, content_type, cache_control):
+        if not force and not needs_upload(s3, bucket, key, size, sha256, remote_sizes):
+            return key, "skipped", size
+        if not dry_run:
+            upload_file(s3, bucket, path, key, sha256, content_type, cache_control, transfer_config)
+        return key, "uploaded", size
+
+    # Audio and packs go up before the manifests and indexes that reference
+    # them, so readers never see an index pointing at a missing object
+    referenced = {".wav", ".mp3", ".pack"}
+    phases = [
+        [u for u in uploads if os.path.splitext(u[1])[1] in referenced],
+        [u for u in uploads if os.path.splitext(u[1])[1] not in referenced],
+    ]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for n, phase in enumerate(phases):
+            if n and stats["failed"]:
+                # Some audio or packs didn't make it; publishing the indexes now
+                # would point readers at them
+                stats["held_back"] = len(phase)
+                print(f"   ⏸️  Holding back {len(phase)} manifests/indexes until every referenced file is uploaded")
+                break
+            futures = {pool.submit(sync_one, *upload): upload[1] for upload in phase}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    _, status, size = future.result()
+                except Exception as e:
+                    with stats_lock:
+                        stats["failed"] += 1
+                        stats["errors"].append({"key": key, "error": str(e)})
+                    print(f"   ❌ {key}: {e}")
+                    continue
+                with stats_lock:
+                    stats[status] += 1
+                    if status == "uploaded":
+                        stats["bytes"] += size
+                if status == "uploaded":
+                    print(f"   {'📝 Would upload' if dry_run else '⬆️  Uploaded'}: {key} ({size / 1024:.0f} KB)")
+
+    # The new pack indexes are live; packs they no longer reference can go
+    if "pack-indexes" in targets and not stats["failed"]:
+        for key in prune_packs(s3, bucket, dry_run=dry_run):
+            stats["deleted"] += 1
+            print(f"   {'📝 Would delete' if dry_run else '🗑️  Deleted'} superseded pack: {key}")
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync love-note audio and manifests to S3-compatible storage")
+    parser.add_argument("--only", default=DEFAULT_TARGETS, help=f"Comma-separated targets ({', '.join(SYNC_TARGETS)})")
+    parser.add_argument("--bucket", default=os.getenv("SUPABASE_BUCKET", "love-notes"))
+    parser.add_argument("--endpoint", help="S3 endpoint URL (default: SUPABASE_S3_ENDPOINT)")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent uploads")
+    parser.add_argument("--force", action="store_true", help="Upload even if the bucket already has the same content")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would be uploaded without uploading")
+    parser.add_argument("--create-bucket", action="store_true", help="Create the bucket if missing (local testing)")
+    args = parser.parse_args()
+
+    targets = [t.strip() for t in args.only.split(",") if t.strip()]
+    unknown = [t for t in targets if t not in SYNC_TARGETS]
+    if unknown:
+        print(f"❌ Unknown target(s): {', '.join(unknown)}")
+        sys.exit(1)
+
+    try:
+        s3 = create_s3_client(args.endpoint, max_pool_connections=args.workers * 4)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print("☁️  Love Notes Storage Sync")
+    print("=" * 50)
+    print(f"🪣 Bucket: {args.bucket}")
+    print(f"🎯 Targets: {', '.join(targets)}")
+    if args.dry_run:
+        print("📝 Dry run - nothing will be uploaded")
+    print("")
+
+    if args.create_bucket and not args.dry_run:
+        ensure_bucket(s3, args.bucket)
+
+    stats = sync(s3, args.bucket, targets, workers=args.workers, force=args.force, dry_run=args.dry_run)
+
+    print("")
+    print("🎉 Sync complete!")
+    print(f"⬆️  {'Would upload' if args.dry_run else 'Uploaded'}: {stats['uploaded']} objects "
+          f"({stats['bytes'] / 1024 / 1024:.1f} MB)")
+    print(f"⏭️  Unchanged: {stats['skipped']} objects")
+    if stats["deleted"]:
+        print(f"🗑️  {'Would delete' if args.dry_run else 'Deleted'}: {stats['deleted']} superseded packs")
+    print(f"❌ Failed: {stats['failed']} objects")
+    if stats["held_back"]:
+        print(f"⏸️  Held back: {stats['held_back']} manifests/indexes (re-run once the failed uploads succeed)")
+    if stats["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
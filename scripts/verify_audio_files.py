@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Verify generated love-note audio files.
+
+Scans public/audio/love-notes in parallel, reading only the RIFF/WAVE chunk
+headers of each file, and flags files whose header length, data chunk or
+duration disagree with the file on disk or with what the generator recorded
+in data/audio-metadata.json.
+
+Usage: python3 scripts/verify_audio_files.py [--dir DIR] [--workers N] [--report FILE]
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from audio_io import AUDIO_METADATA_FILE, check_wav_integrity, load_audio_metadata, read_wav_header
+
+
+def verify_file(path, expected):
+    """Check a single file; returns (filename, info, problems)"""
+    filename = os.path.basename(path)
+    try:
+        info = read_wav_header(path)
+    except OSError as e:
+        return filename, None, [f"Could not read file: {e}"]
+    return filename, info, check_wav_integrity(info, expected)
+
+
+def verify_audio_dir(audio_dir, metadata_file=AUDIO_METADATA_FILE, workers=16):
+    """
+    Verify every WAV in `audio_dir`. Returns a report dict.
+    """
+    metadata = load_audio_metadata(metadata_file)
+    filenames = sorted(f for f in os.listdir(audio_dir) if f.endswith(".wav"))
+    leftover_temp = sorted(f for f in os.listdir(audio_dir) if f.startswith(".") and f.endswith(".tmp"))
+
+    # Header reads are I/O bound, so threads overlap them well
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(
+            lambda f: verify_file(os.path.join(audio_dir, f), metadata.get(f)),
+            filenames
+        ))
+
+    problems = {}
+    total_duration = 0.0
+    unrecorded = []
+    for filename, info, file_problems in results:
+        if file_problems:
+            problems[filename] = file_problems
+        elif info and info["duration"]:
+            total_duration += info["duration"]
+        if filename not in metadata:
+            unrecorded.append(filename)
+
+    on_disk = set(filenames)
+    missing = sorted(f for f in metadata if f.endswith(".wav") and f not in on_disk)
+
+    return {
+        "audio_dir": audio_dir,
+        "files_checked": len(filenames),
+        "ok": len(filenames) - len(problems),
+        "total_duration": round(total_duration, 2),
+        "problems": problems,
+        "missing": missing,
+        "unrecorded": unrecorded,
+        "leftover_temp_files": leftover_temp,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify generated love-note audio files")
+    parser.add_argument("--dir", default="public/audio/love-notes", help="Audio directory to scan")
+    parser.add_argument("--metadata", default=AUDIO_METADATA_FILE, help="Recorded audio metadata file")
+    parser.add_argument("--workers", type=int, default=16, help="Parallel header readers")
+    parser.add_argument("--report", help="Write the full report as JSON to this file")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dir):
+        print(f"❌ Audio directory not found: {args.dir}")
+        sys.exit(1)
+
+    print("🔍 Verifying audio files")
+    print("=" * 50)
+    print(f"📁 Directory: {args.dir}")
+
+    report = verify_audio_dir(args.dir, args.metadata, args.workers)
+
+    for filename, file_problems in sorted(report["problems"].items()):
+        print(f"❌ {filename}")
+        for problem in file_problems:
+            print(f"   - {problem}")
+    for filename in report["missing"]:
+        print(f"⚠️  Recorded but missing on disk: {filename}")
+    for filename in report["leftover_temp_files"]:
+        print(f"🧹 Leftover temp file from an interrupted write: {filename}")
+
+    print("")
+    print(f"📊 Checked: {report['files_checked']} files")
+    print(f"✅ OK: {report['ok']} files ({report['total_duration'] / 60:.1f} min of audio)")
+    print(f"❌ Damaged: {len(report['problems'])} files")
+    print(f"⚠️  Missing: {len(report['missing'])} files")
+    print(f"📝 Not in metadata (generated before tracking): {len(report['unrecorded'])} files")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to: {args.report}")
+
+    if report["problems"] or report["missing"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Compare TTS voices on a sample of real love notes.
+
+Renders the same sample of notes with every voice ID concurrently into a
+scratch area (data/voice-comparison, never the production audio directory),
+and reports duration and speaking-rate statistics per voice. Renders are
+cached by (normalized text, voice ID), so re-running with another voice or a
+bigger sample only pays for what's new.
+
+The sample is spread across years and text lengths (short, medium and long
+notes) and is reproducible for a given --seed.
+
+Usage: python3 scripts/voice_compare.py --voices David2,David5[,...] [--sample 12] [--years 2022,2023] [--workers 4]
+"""
+
+import argparse
+import base64
+import hashlib
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from hume.tts.types import PostedUtterance, PostedUtteranceVoiceWithId, FormatWav
+
+from audio_io import (
+    atomic_write_bytes, atomic_write_json, check_wav_integrity, is_complete_audio, read_wav_header,
+    wav_info_from_bytes,
+)
+from love_notes import find_year_csvs, load_year_rows, row_filename
+from tts_retry import CircuitOpenError, RetryError, RetryPolicy, call_with_retry, print_retry
+from tts_telemetry import percentile
+from tts_text import get_tts_text, load_text_cache
+from voice_registry import DEFAULT_VOICE, get_client, resolve_voice
+
+SCRATCH_DIR = "data/voice-comparison"
+
+
+def render_key(text, voice_id):
+    """Cache key for one render"""
+    return hashlib.sha256(f"{voice_id}\0{text}".encode("utf-8")).hexdigest()
+
+
+def render_path(text, voice_id, scratch_dir=SCRATCH_DIR):
+    """Cached render location, grouped by voice"""
+    return os.path.join(scratch_dir, "renders", voice_id, f"{render_key(text, voice_id)[:16]}.wav")
+
+
+def pick_sample(sample_size, years=None, seed=0):
+    """
+    A reproducible sample of valid notes, spread evenly over years and over
+    short/medium/long text. Returns a list of dicts with year, filename, text.
+    """
+    text_cache = load_text_cache()
+    candidates = []
+    for year, csv_file in find_year_csvs():
+        if years and year not in years:
+            continue
+        for i, row in enumerate(load_year_rows(csv_file)):
+            text, is_valid, _ = get_tts_text(row.get("text", ""), text_cache)
+            if is_valid:
+                candidates.append({"year": year, "filename": row_filename(row, i), "text": text})
+    if not candidates:
+        return []
+
+    # Three length bands, then round-robin over years within each band
+    candidates.sort(key=lambda c: len(c["text"]))
+    band_size = -(-len(candidates) // 3)
+    bands = [candidates[i:i + band_size] for i in range(0, len(candidates), band_size)]
+
+    rng = random.Random(seed)
+    sample = []
+    per_band = -(-sample_size // len(bands))
+    for band in bands:
+        by_year = {}
+        for candidate in band:
+            by_year.setdefault(candidate["year"], []).append(candidate)
+        for notes in by_year.values():
+            rng.shuffle(notes)
+        picked = []
+        while len(picked) < per_band and any(by_year.values()):
+            for year in sorted(by_year):
+                if by_year[year] and len(picked) < per_band:
+                    picked.append(by_year[year].pop())
+        sample.extend(picked)
+    return sample[:sample_size]
+
+
+def render(client, text, voice_id, scratch_dir=SCRATCH_DIR, policy=None):
+    """
+    Render one note with one voice, or reuse the cached render.
+    Returns a dict with duration, latency and whether it was cached.
+    """
+    path = render_path(text, voice_id, scratch_dir)
+    if is_complete_audio(path):
+        return {"path": path, "duration": read_wav_header(path)["duration"], "latency": None, "cached": True}
+
+    started = time.monotonic()
+    audio_data, _ = call_with_retry(
+        lambda: client.tts.synthesize_json(
+            utterances=[PostedUtterance(text=text, voice=PostedUtteranceVoiceWithId(id=voice_id))],
+            format=FormatWav()
+        ),
+        policy=policy or RetryPolicy(max_attempts=3),
+        on_retry=print_retry
+    )
+    latency = time.monotonic() - started
+
+    audio_bytes = base64.b64decode(audio_data.generations[0].audio)
+    info = wav_info_from_bytes(audio_bytes)
+    problems = check_wav_integrity(info)
+    if problems:
+        raise ValueError(f"API returned an invalid WAV payload: {'; '.join(problems)}")
+    atomic_write_bytes(path, audio_bytes)
+    return {"path": path, "duration": info["duration"], "latency": latency, "cached": False}
+
+
+def voice_stats(results):
+    """Duration and speaking-rate statistics for one voice's renders"""
+    ok = [r for r in results if r.get("duration")]
+    if not ok:
+        return {"renders": 0, "failed": len(results)}
+    durations = sorted(r["duration"] for r in ok)
+    chars_per_second = sorted(r["chars"] / r["duration"] for r in ok)
+    words_per_minute = sorted(r["words"] * 60.0 / r["duration"] for r in ok)
+    latencies = sorted(r["latency"] for r in ok if r["latency"] is not None)
+    return {
+        "renders": len(ok),
+        "failed": len(results) - len(ok),
+        "cached": sum(1 for r in ok if r["cached"]),
+        "total_audio_seconds": round(sum(durations), 2),
+        "duration_mean": round(statistics.mean(durations), 2),
+        "duration_p50": round(percentile(durations, 50), 2),
+        "duration_max": round(durations[-1], 2),
+        "chars_per_second": round(statistics.mean(chars_per_second), 2),
+        # Spread of speaking rate across notes: lower means more consistent pacing
+        "chars_per_second_stdev": round(statistics.pstdev(chars_per_second), 2),
+        "words_per_minute": round(statistics.mean(words_per_minute), 1),
+        "words_per_minute_p10": round(percentile(words_per_minute, 10), 1),
+        "words_per_minute_p90": round(percentile(words_per_minute, 90), 1),
+        "latency_mean": round(statistics.mean(latencies), 2) if latencies else None,
+    }
+
+
+def compare_voices(voice_ids, sample, workers=4, scratch_dir=SCRATCH_DIR):
+    """
+    Render every (note, voice) pair concurrently. Returns the report dict.
+    """
+    client = get_client()
+
+    results = {voice_id: [] for voice_id in voice_ids}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(render, client, note["text"], voice_id, scratch_dir): (note, voice_id)
+            for note in sample
+            for voice_id in voice_ids
+        }
+        for future in as_completed(futures):
+            note, voice_id = futures[future]
+            result = {
+                "filename": note["filename"],
+                "year": note["year"],
+                "chars": len(note["text"]),
+                "words": len(note["text"].split()),
+            }
+            if future.cancelled():
+                result["error"] = "skipped: circuit open"
+                results[voice_id].append(result)
+                continue
+            try:
+                result.update(future.result())
+                status = "cached" if result["cached"] else f"{result['latency']:.1f}s"
+                print(f"   ✅ {voice_id[:8]} {note['filename']}: {result['duration']:.2f}s audio ({status})")
+            except CircuitOpenError as e:
+                # Remaining renders would fail the same way
+                for pending in futures:
+                    pending.cancel()
+                result["error"] = str(e)
+                print(f"   🛑 {e} - skipping the remaining renders")
+            except (RetryError, ValueError) as e:
+                result["error"] = str(e)
+                print(f"   ❌ {voice_id[:8]} {note['filename']}: {e}")
+            results[voice_id].append(result)
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "sample": [{"year": n["year"], "filename": n["filename"], "chars": len(n["text"])} for n in sample],
+        "voices": {voice_id: voice_stats(results[voice_id]) for voice_id in voice_ids},
+        "renders": results,
+    }
+
+
+def print_comparison(report):
+    """Per-voice table"""
+    print("")
+    print(f"{'Voice':<38}{'OK':>4}{'Mean s':>8}{'Chars/s':>9}{'±':>6}{'WPM':>7}{'WPM p10-p90':>14}{'Latency':>9}")
+    for voice_id, stats in report["voices"].items():
+        if not stats["renders"]:
+            print(f"{voice_id:<38}{0:>4}   all {stats['failed']} renders failed")
+            continue
+        latency = f"{stats['latency_mean']:.1f}s" if stats["latency_mean"] is not None else "cached"
+        spread = f"{stats['words_per_minute_p10']:.0f}-{stats['words_per_minute_p90']:.0f}"
+        print(f"{voice_id:<38}{stats['renders']:>4}{stats['duration_mean']:>8.2f}{stats['chars_per_second']:>9.2f}"
+              f"{stats['chars_per_second_stdev']:>6.2f}{stats['words_per_minute']:>7.1f}{spread:>14}{latency:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a sample of love notes across several voices and compare them")
+    parser.add_argument("--voices", default=DEFAULT_VOICE, help="Comma-separated voice names or IDs")
+    parser.add_argument("--sample", type=int, default=12, help="Number of notes to render per voice")
+    parser.add_argument("--years", help="Comma-separated years to sample from (default: all)")
+    parser.add_argument("--seed", type=int, default=0, help="Sample seed")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent API requests")
+    parser.add_argument("--scratch", default=SCRATCH_DIR, help="Scratch directory for renders and reports")
+    args = parser.parse_args()
+
+    try:
+        voice_ids = [resolve_voice(v.strip()) for v in args.voices.split(",") if v.strip()]
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        sys.exit(1)
+    years = {int(y) for y in args.years.split(",")} if args.years else None
+
+    print("🎙️  Voice Comparison")
+    print("=" * 50)
+    sample = pick_sample(args.sample, years, args.seed)
+    if not sample:
+        print("❌ No valid notes to sample")
+        sys.exit(1)
+    print(f"📝 {len(sample)} notes × {len(voice_ids)} voices = {len(sample) * len(voice_ids)} renders")
+    print(f"📁 Scratch: {args.scratch}")
+    print("")
+
+    report = compare_voices(voice_ids, sample, args.workers, args.scratch)
+    print_comparison(report)
+
+    report_file = os.path.join(args.scratch, f"report-{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    atomic_write_json(report_file, report)
+    print("")
+    print(f"🎧 Renders: {os.path.join(args.scratch, 'renders')}/<voice id>/")
+    print(f"💾 Report: {report_file}")
+
+
+if __name__ == "__main__":
+    main()
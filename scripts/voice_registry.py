@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Cached registry of Hume TTS voices with name -> ID resolution.
+
+Lists CUSTOM_VOICE and HUME_AI voices once and caches them in
+data/voice-registry.json for VOICE_CACHE_TTL seconds, so generators can take
+a voice name ("David2", "David5") instead of a hardcoded ID without a voice
+list round trip on every start. Voice IDs pass through untouched and never
+touch the network, so the generators' default stays pinned to an ID: a
+renamed or duplicated voice can't change which voice reads the notes.
+
+Usage: python3 scripts/voice_registry.py [--refresh] [NAME ...]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+from audio_io import atomic_write_json
+
+VOICE_CACHE_FILE = "data/voice-registry.json"
+VOICE_CACHE_TTL = int(os.getenv("HUME_VOICE_CACHE_TTL", 24 * 3600))
+PROVIDERS = ("CUSTOM_VOICE", "HUME_AI")
+
+# Used when the voice list can't be fetched or no longer has the name
+KNOWN_VOICES = {
+    "David2": "e61bbb66-9084-40b7-a4dc-ddd0c62592c9",
+}
+
+DEFAULT_VOICE = KNOWN_VOICES["David2"]
+
+UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE)
+
+_registry_lock = threading.Lock()
+_resolved = {}
+
+
+def get_client(base_url=None):
+    """
+    Hume client from the environment. HUME_BASE_URL (or `base_url`) points it
+    somewhere other than the production API, e.g. scripts/tts_standin.py.
+    """
+    # Imported here so name lookups served from the cache never load the SDK
+    from hume import HumeClient
+
+    api_key = os.getenv('HUME_API_KEY', '5sMy54ZASUGzlDJv8f2nOIliS5AqEJmYyhECrA6VqiwZVIFx')
+    base_url = base_url or os.getenv("HUME_BASE_URL")
+    if base_url:
+        return HumeClient(api_key=api_key, base_url=base_url)
+    return HumeClient(api_key=api_key)
+
+
+def fetch_voices(client):
+    """
+    List every voice from every provider. The SDK pager fetches further pages
+    as it is iterated.
+    """
+    voices = []
+    for provider in PROVIDERS:
+        for voice in client.tts.voices.list(provider=provider):
+            voices.append({"id": voice.id, "name": voice.name, "provider": provider})
+    return voices
+
+
+def load_registry(cache_file=VOICE_CACHE_FILE):
+    """Cached registry, or None if there isn't one"""
+    if not os.path.exists(cache_file):
+        return None
+    with open(cache_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def refresh_registry(client=None, cache_file=VOICE_CACHE_FILE):
+    """Fetch the voice list and cache it"""
+    registry = {"fetched_at": time.time(), "voices": fetch_voices(client or get_client())}
+    atomic_write_json(cache_file, registry)
+    return registry
+
+
+def get_registry(client=None, cache_file=VOICE_CACHE_FILE, ttl=VOICE_CACHE_TTL, refresh=False):
+    """
+    The voice registry, refreshed from the API only when the cache is missing,
+    older than `ttl` or `refresh` is set
+    """
+    with _registry_lock:
+        registry = load_registry(cache_file)
+        if refresh or registry is None or time.time() - registry.get("fetched_at", 0) > ttl:
+            registry = refresh_registry(client, cache_file)
+        return registry
+
+
+def find_voice(registry, name):
+    """
+    Case-insensitive exact name match, or None. Raises KeyError if several
+    voices share the name, rather than picking one of them.
+    """
+    matches = [v for v in registry["voices"] if (v["name"] or "").lower() == name.lower()]
+    if len(matches) > 1:
+        ids = ", ".join(f"{v['id']} ({v['provider']})" for v in matches)
+        raise KeyError(f"Voice name '{name}' is ambiguous: {ids}. Pass the voice ID instead.")
+    return matches[0] if matches else None
+
+
+def resolve_voice(name_or_id, client=None, cache_file=VOICE_CACHE_FILE, ttl=VOICE_CACHE_TTL):
+    """
+    Voice ID for a voice name or ID. A stale or missing cache is refreshed;
+    a name missing from a fresh cache triggers one more refresh in case the
+    voice was just created. A name the API doesn't know (any more) falls back
+    to KNOWN_VOICES; the fallback is memoized too, so the list isn't
+    refetched on every call. Raises KeyError if the name is unknown or
+    ambiguous.
+    """
+    if UUID_RE.match(name_or_id):
+        return name_or_id
+    if name_or_id in _resolved:
+        return _resolved[name_or_id]
+
+    try:
+        registry = get_registry(client, cache_file, ttl)
+        voice = find_voice(registry, name_or_id)
+        if voice is None:
+            registry = get_registry(client, cache_file, ttl, refresh=True)
+            voice = find_voice(registry, name_or_id)
+    except KeyError:
+        raise
+    except Exception as e:
+        if name_or_id in KNOWN_VOICES:
+            print(f"⚠️  Could not list voices ({e}), using known ID for {name_or_id}")
+            _resolved[name_or_id] = KNOWN_VOICES[name_or_id]
+            return _resolved[name_or_id]
+        raise
+
+    if voice is None and name_or_id in KNOWN_VOICES:
+        print(f"⚠️  No voice named {name_or_id} in the voice list, using known ID {KNOWN_VOICES[name_or_id]}")
+        _resolved[name_or_id] = KNOWN_VOICES[name_or_id]
+        return _resolved[name_or_id]
+    if voice is None:
+        similar = [v["name"] for v in registry["voices"] if name_or_id.lower() in (v["name"] or "").lower()]
+        hint = f" Similar: {', '.join(similar)}" if similar else ""
+        raise KeyError(f"Unknown voice '{name_or_id}'.{hint}")
+
+    _resolved[name_or_id] = voice["id"]
+    return voice["id"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List cached Hume TTS voices or resolve voice names to IDs")
+    parser.add_argument("names", nargs="*", help="Voice names to resolve")
+    parser.add_argument("--refresh", action="store_true", help="Refetch the voice list even if the cache is fresh")
+    args = parser.parse_args()
+
+    registry = get_registry(refresh=args.refresh)
+    age = (time.time() - registry["fetched_at"]) / 60
+
+    if args.names:
+        for name in args.names:
+            try:
+                print(f"🎤 {name}: {resolve_voice(name)}")
+            except KeyError as e:
+                print(f"❌ {e.args[0]}")
+                sys.exit(1)
+        return
+
+    print(f"🎤 {len(registry['voices'])} voices (cached {age:.0f} min ago in {VOICE_CACHE_FILE})")
+    for provider in PROVIDERS:
+        voices = [v for v in registry["voices"] if v["provider"] == provider]
+        print(f"\n{provider} ({len(voices)}):")
+        for voice in sorted(voices, key=lambda v: (v["name"] or "").lower()):
+            print(f"   - {voice['name']} (ID: {voice['id']})")
+
+
+if __name__ == "__main__":
+    main()